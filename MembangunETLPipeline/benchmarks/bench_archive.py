@@ -0,0 +1,58 @@
+"""
+Benchmark arsip HTML mentah: crawl server palsu sambil mengarsipkan setiap
+halaman, lalu bandingkan ukuran arsip per codec dan waktu replay dari arsip
+dengan waktu crawl lewat jaringan.
+
+    python -m benchmarks.bench_archive --pages 500 --cards 20 --latency 0.01
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.fake_server import FakeFashionStudio  # noqa: E402
+from utils import extract  # noqa: E402
+from utils.archive import CODEC_ZLIB, CODEC_ZSTD, PageArchive  # noqa: E402
+from utils.plugins import is_installed  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--cards", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.01, help="Latency server per respons (detik)")
+    parser.add_argument("--concurrency", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.disable(logging.ERROR)
+    codecs = [CODEC_ZLIB] + ([CODEC_ZSTD] if is_installed("zstandard") else [])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        for codec in codecs:
+            archive = PageArchive(os.path.join(tmp, f"pages.{codec}.archive"), codec=codec)
+            with FakeFashionStudio(pages=args.pages, cards=args.cards, delay=args.latency) as server:
+                extract.BASE_URL = server.url
+                start = time.perf_counter()
+                crawled = extract.scrape_all_pages(max_pages=None, concurrency=args.concurrency,
+                                                   requests_per_second=None, archive=archive)
+                crawl_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            replayed = extract.replay_all_pages(archive)
+            replay_seconds = time.perf_counter() - start
+
+            crawl = archive.crawls()[-1]
+            archive.close()
+            print(f"{codec:5s}: {crawl['raw_bytes'] / 1024:9,.0f} KiB HTML -> {crawl['bytes'] / 1024:7,.0f} KiB "
+                  f"({crawl['raw_bytes'] / crawl['bytes']:4.1f}x)  crawl {crawl_seconds:6.2f} s  "
+                  f"replay {replay_seconds:6.2f} s  ({len(crawled)} vs {len(replayed)} produk)")
+
+
+if __name__ == "__main__":
+    main()
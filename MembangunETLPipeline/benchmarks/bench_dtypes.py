@@ -0,0 +1,51 @@
+"""
+Benchmark memori dan kecepatan frame hasil transform: schema standar vs compact.
+
+    python -m benchmarks.bench_dtypes --rows 1000000
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_transform import make_raw_frame  # noqa: E402
+from utils.transform import compact_dtypes, transform_data  # noqa: E402
+
+
+def best_of(func, repeat):
+    seconds = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        seconds = min(seconds, time.perf_counter() - start)
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    standard = transform_data(make_raw_frame(args.rows))
+    # make_raw_frame memakai satu timestamp; crawl asli punya timestamp per kartu
+    standard["timestamp"] = (standard["timestamp"].str[:19] + "."
+                             + (standard.index.to_series() % 1000000).map("{:06d}".format).to_numpy())
+    frames = {"standard": standard, "compact": compact_dtypes(standard)}
+    print(f"{len(standard)} baris bersih")
+
+    for name, df in frames.items():
+        memory = df.memory_usage(deep=True).sum()
+        dedup = best_of(lambda: df.drop_duplicates(subset=["Title", "Size", "Gender", "Colors"]), args.repeat)
+        groupby = best_of(lambda: df.groupby(["Gender", "Size"], observed=True)["Price"].mean(), args.repeat)
+        print(f"{name:9s}: {memory / 1024 ** 2:8.1f} MiB  drop_duplicates {dedup * 1000:7.1f} ms  "
+              f"groupby {groupby * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
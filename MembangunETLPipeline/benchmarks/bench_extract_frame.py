@@ -0,0 +1,58 @@
+"""
+Benchmark perakitan DataFrame hasil extract: halaman diarsipkan dulu lalu
+di-replay (tanpa jaringan), sehingga yang diukur hanya parsing dan
+penyusunan frame. Dicatat waktu, peak alokasi Python (tracemalloc), dan
+ukuran frame akhir.
+
+    python -m benchmarks.bench_extract_frame --pages 2000 --cards 20
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.fake_server import make_page_html  # noqa: E402
+from utils.archive import PageArchive  # noqa: E402
+from utils.extract import DEFAULT_PARSER_BACKEND, replay_all_pages  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--cards", type=int, default=20)
+    parser.add_argument("--backend", default=DEFAULT_PARSER_BACKEND)
+    parser.add_argument("--repeat", type=int, default=3, help="Ambil waktu terbaik dari beberapa percobaan")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        archive = PageArchive(os.path.join(tmp, "pages.archive"))
+        for page in range(2, args.pages + 2):
+            archive.append("bench", page, make_page_html(page, cards=args.cards))
+
+        seconds = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            df = replay_all_pages(archive, parser_backend=args.backend)
+            seconds = min(seconds, time.perf_counter() - start)
+
+        tracemalloc.start()
+        df = replay_all_pages(archive, parser_backend=args.backend)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        archive.close()
+
+    print(f"{len(df):,} baris, {args.pages:,} halaman, backend {args.backend}")
+    print(f"waktu {seconds:6.2f} s ({len(df) / seconds:,.0f} baris/s)  "
+          f"peak alokasi {peak / 2**20:7.1f} MiB  frame {df.memory_usage(deep=True).sum() / 2**20:6.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Benchmark format file antar-tahap: CSV vs Parquet vs Arrow IPC (memory-map).
+Data berasal dari make_raw_frame di bench_transform yang dibersihkan dengan transform_data.
+
+    python -m benchmarks.bench_formats --rows 100000
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_transform import make_raw_frame  # noqa: E402
+from utils.load import read_intermediate, write_intermediate  # noqa: E402
+from utils.transform import transform_data  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3, help="Ambil waktu terbaik dari beberapa percobaan")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    df = transform_data(make_raw_frame(args.rows))
+    print(f"{len(df)} baris bersih")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for ext in ("csv", "parquet", "arrow"):
+            path = os.path.join(tmp, f"cleaned_products.{ext}")
+            write_seconds = read_seconds = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                write_intermediate(df, path)
+                write_seconds = min(write_seconds, time.perf_counter() - start)
+
+                start = time.perf_counter()
+                loaded = read_intermediate(path)
+                read_seconds = min(read_seconds, time.perf_counter() - start)
+
+            dtypes = "sama" if loaded.dtypes.equals(df.dtypes) else "BERBEDA"
+            print(f"{ext:8s}: {os.path.getsize(path) / 1024:9,.0f} KiB  "
+                  f"tulis {write_seconds * 1000:7.1f} ms  baca {read_seconds * 1000:7.1f} ms  dtypes {dtypes}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark tahap parsing multiprocess atas ribuan halaman tersimpan.
+
+Halaman dibuat dengan menyalin fixture di tests/fixtures sebanyak --pages.
+
+    python -m benchmarks.bench_parse_workers --pages 2000 --workers 1 2 4 8
+"""
+
+import argparse
+import glob
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.extract import DEFAULT_PARSER_BACKEND, extract_page_columns, parse_pages_in_processes  # noqa: E402
+
+FIXTURE_GLOB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            "tests", "fixtures", "*.html")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--chunksize", type=int, default=8)
+    parser.add_argument("--backend", default=DEFAULT_PARSER_BACKEND)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    fixtures = []
+    for path in sorted(glob.glob(FIXTURE_GLOB)):
+        with open(path, encoding="utf-8") as f:
+            fixtures.append(f.read())
+    # Halaman ke-1 tidak dipakai agar debug_page_1.html tidak ditulis
+    pages = [(page, fixtures[page % len(fixtures)]) for page in range(2, args.pages + 2)]
+
+    baseline = None
+    for workers in sorted(set(args.workers)):
+        start = time.perf_counter()
+        if workers <= 1:
+            cards = sum(len(extract_page_columns(html, backend=args.backend)["Title"]) for _, html in pages)
+        else:
+            cards = sum(len(columns["Title"]) for _, columns in
+                        parse_pages_in_processes(iter(pages), workers, args.chunksize, args.backend))
+        seconds = time.perf_counter() - start
+        baseline = baseline or seconds
+        print(f"workers={workers:2d}: {len(pages) / seconds:8,.0f} pages/s, {cards / seconds:10,.0f} cards/s, "
+              f"speedup {baseline / seconds:4.1f}x")
+
+    print(f"cpu_count={os.cpu_count()} backend={args.backend} chunksize={args.chunksize}")
+
+
+if __name__ == "__main__":
+    main()
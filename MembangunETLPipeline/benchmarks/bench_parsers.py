@@ -0,0 +1,58 @@
+"""
+Benchmark backend parser HTML atas fixture halaman yang tersimpan.
+
+    python -m benchmarks.bench_parsers --repeat 50
+"""
+
+import argparse
+import glob
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.extract import PARSER_BACKENDS, extract_products_from_page  # noqa: E402
+
+FIXTURE_GLOB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            "tests", "fixtures", "*.html")
+
+
+def strip_timestamp(products):
+    return [{k: v for k, v in product.items() if k != "timestamp"} for product in products]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=50, help="Berapa kali setiap fixture di-parse")
+    parser.add_argument("--fixtures", default=FIXTURE_GLOB)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    pages = []
+    for path in sorted(glob.glob(args.fixtures)):
+        with open(path, encoding="utf-8") as f:
+            pages.append(f.read())
+    if not pages:
+        sys.exit(f"Tidak ada fixture di {args.fixtures}")
+
+    reference = None
+    for backend in PARSER_BACKENDS:
+        results = [extract_products_from_page(html, backend=backend) for html in pages]
+        if reference is None:
+            reference = [strip_timestamp(products) for products in results]
+        elif [strip_timestamp(products) for products in results] != reference:
+            print(f"{backend:6s}: HASIL BERBEDA dengan backend {list(PARSER_BACKENDS)[0]}")
+
+        cards = 0
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for html in pages:
+                cards += len(extract_products_from_page(html, backend=backend))
+        seconds = time.perf_counter() - start
+        print(f"{backend:6s}: {cards / seconds:10,.0f} cards/s ({cards} cards in {seconds:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Benchmark pipeline end-to-end secara offline: server Fashion Studio palsu
+(tests/fake_server.py) di localhost, lalu extract, transform, dan setiap
+loader dijalankan pada beberapa skala. Hasilnya ditulis ke file JSON yang
+bisa dibandingkan antar commit dengan --compare.
+
+    python -m benchmarks.bench_pipeline --scales 1k,10k,100k --latency 0.005 --error-rate 0.01
+    python -m benchmarks.bench_pipeline --scales 1m --cards 100 --output after.json --compare before.json
+
+Loader PostgreSQL hanya dijalankan dengan --postgres (koneksi dari PGDATABASE,
+PGUSER, PGPASSWORD, PGHOST, PGPORT). Google Sheets tidak ikut karena butuh jaringan.
+
+Setiap tahap berjalan di proses baru (spawn) dan hasilnya diteruskan ke tahap
+berikutnya lewat file pickle, sehingga peak_rss_bytes adalah puncak memori
+tahap itu sendiri, bukan puncak kumulatif seluruh benchmark.
+"""
+
+import argparse
+import json
+import logging
+import math
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.fake_server import FakeFashionStudio  # noqa: E402
+from utils import extract  # noqa: E402
+from utils.load import PostgresLoader, load_to_csv, load_to_parquet  # noqa: E402
+from utils.metrics import METRICS, peak_rss_bytes  # noqa: E402
+from utils.plugins import is_installed  # noqa: E402
+from utils.transform import transform_data  # noqa: E402
+
+
+def parse_scale(value: str) -> int:
+    value = value.strip().lower()
+    multiplier = {"k": 1000, "m": 1000000}.get(value[-1:], 1)
+    return int(float(value.rstrip("km")) * multiplier)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def measure(name: str, rows_func, func):
+    start = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start
+    rows = rows_func(result)
+    entry = {
+        "seconds": seconds,
+        "rows": rows,
+        "rows_per_second": rows / seconds if seconds > 0 else None,
+        "peak_rss_bytes": peak_rss_bytes(),
+    }
+    peak_mib = (entry["peak_rss_bytes"] or 0) / 2 ** 20
+    print(f"  {name:12s} {seconds:8.2f} s  {entry['rows_per_second'] or 0:12,.0f} rows/s  {peak_mib:8.1f} MiB",
+          flush=True)
+    return result, entry
+
+
+# Data antar tahap (di folder kerja sementara benchmark)
+RAW_PATH = "raw.pkl"
+CLEANED_PATH = "cleaned.pkl"
+
+
+def run_extract(base_url: str, args) -> dict:
+    original_url = extract.BASE_URL
+    extract.BASE_URL = base_url
+    try:
+        controller = extract.FetchController(extract.AdaptiveRateLimiter(None), backoff_base=0.01)
+        raw_df, entry = measure("extract", len, lambda: extract.scrape_all_pages(
+            max_pages=None, concurrency=args.concurrency, requests_per_second=None,
+            max_per_host=args.concurrency, parser_backend=args.parser,
+            parse_workers=args.parse_workers, controller=controller))
+    finally:
+        extract.BASE_URL = original_url
+    raw_df.to_pickle(RAW_PATH)
+
+    fetch = METRICS.timings.get("extract.fetch", {})
+    entry.update({
+        "fetch_mean_seconds": fetch["total_seconds"] / fetch["count"] if fetch.get("count") else None,
+        "fetch_max_seconds": fetch.get("max_seconds"),
+        "retries": METRICS.counters.get("extract.fetch.retries", 0),
+    })
+    return entry
+
+
+def run_transform() -> dict:
+    raw_df = pd.read_pickle(RAW_PATH)
+    cleaned_df, entry = measure("transform", len, lambda: transform_data(raw_df))
+    cleaned_df.to_pickle(CLEANED_PATH)
+    return entry
+
+
+def run_load(name: str) -> dict:
+    cleaned_df = pd.read_pickle(CLEANED_PATH)
+    if name == "postgresql":
+        with PostgresLoader.from_env() as postgres:
+            return measure("load.postgresql", lambda ok: len(cleaned_df) if ok else 0,
+                           lambda: postgres.load(cleaned_df))[1]
+    loaders = {
+        "csv": lambda df: load_to_csv(df, output_path="products.csv", raise_on_error=True),
+        "parquet": lambda df: load_to_parquet(df, output_path="products.parquet", raise_on_error=True),
+    }
+    return measure(f"load.{name}", lambda ok: len(cleaned_df) if ok else 0, lambda: loaders[name](cleaned_df))[1]
+
+
+def run_stage(func, *args) -> dict:
+    """Jalankan satu tahap di proses baru agar ru_maxrss-nya hanya milik tahap itu."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=logging.disable, initargs=(logging.ERROR,)) as executor:
+        return executor.submit(func, *args).result()
+
+
+def run_scale(products: int, args) -> dict:
+    pages = math.ceil(products / args.cards)
+    print(f"\n{products:,} produk ({pages:,} halaman x {args.cards} kartu)", flush=True)
+    stages = {}
+
+    with FakeFashionStudio(pages=pages, cards=args.cards, delay=args.latency,
+                           error_rate=args.error_rate) as server:
+        stages["extract"] = run_stage(run_extract, server.url, args)
+        stages["extract"]["requests"] = len(server.requests)
+
+    stages["transform"] = run_stage(run_transform)
+
+    loaders = ["csv"]
+    if is_installed("pyarrow"):
+        loaders.append("parquet")
+    if args.postgres:
+        loaders.append("postgresql")
+    for name in loaders:
+        stages[f"load.{name}"] = run_stage(run_load, name)
+
+    return {"products": products, "pages": pages, "stages": stages}
+
+
+def compare(report: dict, baseline_path: str) -> None:
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    previous = {run["products"]: run["stages"] for run in baseline["runs"]}
+    print(f"\nDibandingkan dengan {baseline_path} (commit {baseline.get('commit')}): waktu lama / waktu baru")
+    for run in report["runs"]:
+        old = previous.get(run["products"])
+        if not old:
+            continue
+        for stage, entry in run["stages"].items():
+            if stage in old and entry["seconds"] > 0:
+                print(f"  {run['products']:>9,} {stage:16s} {old[stage]['seconds'] / entry['seconds']:6.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", default="1k,10k,100k", help="Jumlah produk, dipisah koma (mis. 1k,10k,1m)")
+    parser.add_argument("--cards", type=int, default=20, help="Kartu produk per halaman")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latency server per respons (detik)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Peluang respons 503 per request")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--parser", default=extract.DEFAULT_PARSER_BACKEND, choices=sorted(extract.PARSER_BACKENDS))
+    parser.add_argument("--parse-workers", type=int, default=0)
+    parser.add_argument("--postgres", action="store_true", help="Ikutkan loader PostgreSQL")
+    parser.add_argument("--output", default="bench_report.json")
+    parser.add_argument("--compare", default=None, help="Report JSON dari commit lain sebagai pembanding")
+    args = parser.parse_args()
+    output = os.path.abspath(args.output)
+
+    # 503 dari --error-rate memang disengaja; jangan sampai log-nya menutupi tabel hasil
+    logging.disable(logging.ERROR)
+    report = {
+        "commit": git_commit(),
+        "started_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "params": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        "runs": [],
+    }
+
+    # File keluaran loader (dan debug_page_1.html) ditulis ke folder sementara
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            for scale in args.scales.split(","):
+                report["runs"].append(run_scale(parse_scale(scale), args))
+        finally:
+            os.chdir(cwd)
+
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport ditulis ke {output}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark load PostgreSQL: INSERT per baris vs COPY FROM STDIN.
+
+Butuh PostgreSQL lokal. Koneksi diatur lewat environment variable
+PGDATABASE, PGUSER, PGPASSWORD, PGHOST, PGPORT.
+
+    python -m benchmarks.bench_postgres_load --rows 100000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import psycopg2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.load import load_to_postgresql  # noqa: E402
+
+
+def make_frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "Title": [f"T-shirt {i}" for i in range(rows)],
+        "Price": rng.uniform(1, 500, rows).round(2) * 16000,
+        "Rating": rng.uniform(1, 5, rows).round(1),
+        "Colors": rng.integers(1, 6, rows),
+        "Size": rng.choice(["S", "M", "L", "XL", "XXL"], rows),
+        "Gender": rng.choice(["Men", "Women", "Unisex"], rows),
+        "timestamp": pd.Timestamp("2025-05-14").isoformat(),
+    })
+
+
+def insert_row_by_row(df: pd.DataFrame, params: dict) -> None:
+    # Implementasi lama (satu INSERT per baris) sebagai pembanding
+    conn = psycopg2.connect(**params)
+    cursor = conn.cursor()
+    cursor.execute("TRUNCATE TABLE products RESTART IDENTITY")
+    for _, row in df.iterrows():
+        cursor.execute("""
+            INSERT INTO products (title, price, rating, colors, size, gender, timestamp)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """, (row["Title"], row["Price"], row["Rating"], int(row["Colors"]),
+              row["Size"], row["Gender"], row["timestamp"]))
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    params = {
+        "dbname": os.getenv("PGDATABASE", "etl_fashion"),
+        "user": os.getenv("PGUSER", "postgres"),
+        "password": os.getenv("PGPASSWORD", ""),
+        "host": os.getenv("PGHOST", "localhost"),
+        "port": os.getenv("PGPORT", "5432"),
+    }
+    df = make_frame(args.rows)
+
+    start = time.perf_counter()
+    ok = load_to_postgresql(df, params["dbname"], params["user"], params["password"],
+                            params["host"], params["port"], chunk_size=args.chunk_size)
+    copy_seconds = time.perf_counter() - start
+    if not ok:
+        sys.exit("COPY load gagal, cek koneksi PostgreSQL")
+
+    start = time.perf_counter()
+    insert_row_by_row(df, params)
+    insert_seconds = time.perf_counter() - start
+
+    print(f"rows={args.rows} chunk_size={args.chunk_size}")
+    print(f"INSERT per baris : {insert_seconds:8.2f}s ({args.rows / insert_seconds:,.0f} rows/s)")
+    print(f"COPY FROM STDIN  : {copy_seconds:8.2f}s ({args.rows / copy_seconds:,.0f} rows/s)")
+    print(f"speedup          : {insert_seconds / copy_seconds:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark transform_data: versi lama (banyak pass .str) vs versi satu pass.
+
+Waktu diukur tanpa tracemalloc; peak memori diukur di run terpisah
+dengan tracemalloc. Porsi tahap validasi (transform.validate) terhadap
+seluruh transform dibaca dari METRICS.
+
+    python -m benchmarks.bench_transform --rows 1000000
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.metrics import METRICS  # noqa: E402
+from utils.transform import EXCHANGE_RATE, transform_data  # noqa: E402
+
+
+def legacy_transform_data(df: pd.DataFrame) -> pd.DataFrame:
+    # Salinan implementasi lama sebagai pembanding
+    df = df[
+        (df['Title'].str.lower() != 'unknown product') &
+        (df['Price'].str.lower() != 'price unavailable') &
+        (df['Rating'].str.lower() != 'invalid rating')
+    ].copy()
+    df.dropna(inplace=True)
+    df.drop_duplicates(inplace=True)
+    df['Price'] = df['Price'].astype(str).str.replace(r'[^0-9.]', '', regex=True)
+    df = df[df['Price'] != '']
+    df['Price'] = df['Price'].astype(float) * EXCHANGE_RATE
+    df['Rating'] = df['Rating'].astype(str).str.extract(r'(\d+\.\d+)')
+    df['Rating'] = df['Rating'].astype(float)
+    df['Colors'] = df['Colors'].astype(str).str.extract(r'(\d+)')
+    df['Colors'] = df['Colors'].astype(int)
+    df['Size'] = df['Size'].astype(str).str.replace("Size:", "").str.strip()
+    df['Gender'] = df['Gender'].astype(str).str.replace("Gender:", "").str.strip()
+    return df.astype({"Title": "object", "Price": "float64", "Rating": "float64",
+                      "Colors": "int64", "Size": "object", "Gender": "object"})
+
+
+def make_raw_frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    titles = np.array([f"T-shirt {i}" for i in range(rows)], dtype=object)
+    titles[::50] = "Unknown Product"
+    prices = np.array([f"${p:.2f}" for p in rng.uniform(1, 500, rows)], dtype=object)
+    prices[::37] = "Price Unavailable"
+    ratings = np.array([f"⭐ {r:.1f} / 5" for r in rng.uniform(1, 5, rows)], dtype=object)
+    ratings[::41] = "Invalid Rating"
+    return pd.DataFrame({
+        "Title": titles,
+        "Price": prices,
+        "Rating": ratings,
+        "Colors": [f"{c} Colors" for c in rng.integers(1, 8, rows)],
+        "Size": ["Size: " + s for s in rng.choice(["S", "M", "L", "XL", "XXL"], rows)],
+        "Gender": ["Gender: " + g for g in rng.choice(["Men", "Women", "Unisex"], rows)],
+        "timestamp": pd.Timestamp("2025-05-24T09:19:31").isoformat(),
+    })
+
+
+def measure(func, df):
+    start = time.perf_counter()
+    result = func(df)
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    func(df)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000000)
+    args = parser.parse_args()
+
+    df = make_raw_frame(args.rows)
+    old, old_seconds, old_peak = measure(legacy_transform_data, df)
+    new, new_seconds, new_peak = measure(transform_data, df)
+    pd.testing.assert_frame_equal(old, new)
+
+    print(f"rows={args.rows} (output {len(new)} rows, identical)")
+    print(f"multi-pass  : {old_seconds:6.2f}s  peak {old_peak / 2**20:7.1f} MiB")
+    print(f"single-pass : {new_seconds:6.2f}s  peak {new_peak / 2**20:7.1f} MiB")
+    print(f"speedup {old_seconds / new_seconds:.1f}x, peak memory -{1 - new_peak / old_peak:.0%}")
+
+    METRICS.reset()
+    transform_data(df)
+    timings = METRICS.report()["timings"]
+    validate = timings["transform.validate"]["total_seconds"]
+    print(f"validation  : {validate:6.2f}s ({validate / timings['transform']['total_seconds']:.1%} of transform)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,66 +1,349 @@
+import argparse
+import logging
+import signal
+from functools import partial
+from itertools import chain, repeat
 import pandas as pd
-from utils.extract import scrape_all_pages
-from utils.transform import transform_data
-from utils.load import load_to_csv, load_to_gsheet, load_to_postgresql
+from utils.extract import (scrape_all_pages, iter_page_batches, replay_all_pages, create_session,
+                           AdaptiveRateLimiter, FetchController, DEFAULT_PARSER_BACKEND, LOG_FORMAT, PARSER_BACKENDS)
+from utils.transform import transform_with_quarantine
+from utils.validate import REASON_COLUMN
+from utils.load import (PostgresLoader, gsheet_client, load_to_csv, load_to_gsheet, load_to_parquet,
+                        sync_to_gsheet, write_intermediate)
+from utils.pipeline import run_streaming_pipeline
+from utils.sinks import Sink, run_sinks
+from utils.archive import PageArchive, DEFAULT_ARCHIVE_PATH
+from utils.cache import ParseCache, ResponseCache, DEFAULT_HTTP_CACHE_DIR, DEFAULT_PARSE_CACHE_PATH
+from utils.checkpoint import CrawlJournal, DEFAULT_JOURNAL_PATH
+from utils.cdc import capture_changes, DEFAULT_INDEX_PATH
+from utils.metrics import METRICS
+from utils.scheduler import CronSchedule, IntervalSchedule, PipelineDaemon, RunLock, DEFAULT_LOCK_PATH
+
+# Sink yang dijalankan secara default; library sink yang tidak dipilih tidak pernah di-import
+SINK_NAMES = ("csv", "gsheet", "postgresql")
+GSHEET_KEYFILE = "google-sheets-api.json"
+
+
+class PipelineResources:
+    """
+    Objek yang mahal dibuat ulang: session HTTP, controller fetch (rate
+    hasil adaptasi dan circuit breaker), cache, jurnal, arsip HTML, pool
+    PostgreSQL, dan client Google Sheets. Run biasa membuatnya sekali per run; mode
+    daemon memakai satu instance untuk semua run agar tetap hangat.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_HTTP_CACHE_DIR, parse_cache_path=DEFAULT_PARSE_CACHE_PATH,
+                 journal_path=DEFAULT_JOURNAL_PATH, archive_path=None):
+        self.session = create_session()
+        self.controller = FetchController(AdaptiveRateLimiter())
+        self.cache = ResponseCache(cache_dir) if cache_dir else None
+        self.parse_cache = ParseCache(parse_cache_path) if parse_cache_path else None
+        self.journal = CrawlJournal(journal_path) if journal_path else None
+        self.archive = PageArchive(archive_path) if archive_path else None
+        # Kredensial PostgreSQL dibaca dari PGDATABASE/PGUSER/PGPASSWORD/PGHOST/PGPORT
+        self.postgres = PostgresLoader.from_env()
+        self._gsheet_client = None
+
+    def gsheet_client(self, json_keyfile=GSHEET_KEYFILE):
+        # Diotorisasi saat sink gsheet pertama kali jalan, lalu dipakai ulang
+        if self._gsheet_client is None:
+            self._gsheet_client = gsheet_client(json_keyfile)
+        return self._gsheet_client
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.session.close()
+        self.postgres.close()
+        if self.journal:
+            self.journal.close()
+        if self.archive:
+            self.archive.close()
+
+
+def daemon_run(run, resources, resume=False):
+    """
+    run() untuk PipelineDaemon. resume hanya berlaku di run pertama: setelah
+    itu jurnal berisi crawl yang sudah selesai, sehingga run terjadwal
+    berikutnya harus crawl ulang agar perubahan katalog ikut terambil.
+    """
+    resumes = chain([resume], repeat(False))
+    return lambda: run(resources=resources, resume=next(resumes))
+
+
+def main(pg_mode="replace", cache_dir=DEFAULT_HTTP_CACHE_DIR, parse_cache_path=DEFAULT_PARSE_CACHE_PATH,
+         parser_backend=DEFAULT_PARSER_BACKEND, parse_workers=0, intermediate="csv",
+         journal_path=DEFAULT_JOURNAL_PATH, resume=False, max_pages=None, gsheet_key=None,
+         cdc_index_path=DEFAULT_INDEX_PATH, compact=False, sinks=SINK_NAMES, resources=None,
+         archive_path=None, replay=None):
+    # replay: ID crawl di arsip (atau "latest") yang di-parse ulang sebagai pengganti crawl ke situs
+    if resources is None:
+        with PipelineResources(cache_dir, parse_cache_path, journal_path, archive_path) as resources:
+            return main(pg_mode, parser_backend=parser_backend, parse_workers=parse_workers,
+                        intermediate=intermediate, resume=resume, max_pages=max_pages, gsheet_key=gsheet_key,
+                        cdc_index_path=cdc_index_path, compact=compact, sinks=sinks, resources=resources,
+                        replay=replay)
 
-def main():
     print("\nMemulai ETL Pipeline...")
+    raw_path = f"raw_products.{intermediate}"
+    cleaned_path = f"cleaned_products.{intermediate}"
+    quarantine_path = f"quarantine.{intermediate}"
 
     # 1. Extract
     print("\nTahap Extract...")
     try:
-        raw_df = scrape_all_pages(max_pages=50)
-        raw_df.to_csv("raw_products.csv", index=False)
-        print(f"Data mentah disimpan ke raw_products.csv (total {len(raw_df)} data)")
+        with METRICS.stage("extract"):
+            if replay:
+                if resources.archive is None:
+                    raise ValueError("replay membutuhkan arsip HTML (--archive)")
+                raw_df = replay_all_pages(resources.archive, None if replay == "latest" else replay,
+                                          parser_backend=parser_backend, parse_workers=parse_workers)
+            else:
+                raw_df = scrape_all_pages(max_pages=max_pages, concurrency=5, cache=resources.cache,
+                                          parse_cache=resources.parse_cache, parser_backend=parser_backend,
+                                          parse_workers=parse_workers, journal=resources.journal, resume=resume,
+                                          controller=resources.controller, session=resources.session,
+                                          archive=resources.archive)
+            write_intermediate(raw_df, raw_path)
+        print(f"Data mentah disimpan ke {raw_path} (total {len(raw_df)} data)")
     except Exception as e:
         print(f"Gagal extract data: {e}")
-        return
+        return False
 
     # 2. Transform
     print("\nTransform...")
     try:
-        cleaned_df = transform_data(raw_df)
-        cleaned_df.to_csv("cleaned_products.csv", index=False)
-        print(f"Data sudah dibersihkan dan disimpan ke cleaned_products.csv (total {len(cleaned_df)} data)")
+        with METRICS.stage("transform"):
+            cleaned_df, quarantined_df = transform_with_quarantine(raw_df, compact=compact)
+            write_intermediate(cleaned_df, cleaned_path)
+            # Selalu ditulis agar file karantina run sebelumnya tidak tertinggal
+            write_intermediate(quarantined_df, quarantine_path)
+        print(f"Data sudah dibersihkan dan disimpan ke {cleaned_path} (total {len(cleaned_df)} data)")
+        if len(quarantined_df):
+            counts = quarantined_df[REASON_COLUMN].value_counts().to_dict()
+            print(f"{len(quarantined_df)} data tidak lolos validasi, disimpan ke {quarantine_path}: {counts}")
     except Exception as e:
         print(f"Gagal transform data: {e}")
-        return
+        return False
+
+    # Perubahan dibanding run sebelumnya (inserted/updated/deleted)
+    if cdc_index_path:
+        try:
+            changes_path = f"changes.{intermediate}"
+            with METRICS.stage("cdc"):
+                changes = capture_changes(cleaned_df, cdc_index_path)
+                write_intermediate(changes, changes_path)
+            counts = changes["change"].value_counts().to_dict()
+            print(f"Perubahan sejak run sebelumnya disimpan ke {changes_path}: {counts}")
+        except Exception as e:
+            print(f"Gagal menghitung perubahan data: {e}")
 
     # 3. Load
     print("\nLoading...")
+    if gsheet_key:
+        # Spreadsheet yang sama diperbarui di tempat, hanya baris yang berubah yang dikirim
+        def gsheet_load(df):
+            return sync_to_gsheet(df, gsheet_key, GSHEET_KEYFILE, client=resources.gsheet_client())
+    else:
+        def gsheet_load(df):
+            return load_to_gsheet(df, "ETL-Fashion-Studio", GSHEET_KEYFILE, client=resources.gsheet_client())
+
+    postgres = resources.postgres
     try:
-        # Load ke CSV
-        load_to_csv(cleaned_df, output_path="products.csv")
-        print("Disimpan ke products.csv")
-
-        # Load ke Google Sheets
-        json_key = "google-sheets-api.json"
-        gsheet_url = load_to_gsheet(cleaned_df, "ETL-Fashion-Studio", json_key)
-        if gsheet_url:
-            print(f"Google Sheets URL: {gsheet_url}")
-        else:
-            print("Gagal menyimpan ke Google Sheets")
-
-        # Load ke PostgreSQL
-        pg_status = load_to_postgresql(
-            cleaned_df,
-            db_name="etl_fashion",
-            user="postgres",
-            password="new_password",
-            host="localhost",
-            port="5432"
-        )
-        if pg_status:
-            print("Data berhasil disimpan ke PostgreSQL")
-        else:
-            print("Gagal menyimpan ke PostgreSQL")
+        with METRICS.stage("load"):
+            # Semua sink berjalan paralel; kegagalan satu sink tidak menghentikan yang lain
+            enabled = [sink for sink in [
+                Sink("csv", lambda df: load_to_csv(df, output_path="products.csv", raise_on_error=True)),
+                # load_to_gsheet membuat spreadsheet baru setiap percobaan, jadi hanya sync
+                # ke sheet yang sudah ada (idempoten) yang boleh diulang
+                Sink("gsheet", gsheet_load, timeout=120, retries=1 if gsheet_key else 0),
+                # Satu run berisi seluruh katalog: upsert juga menghapus produk yang sudah hilang
+                Sink("postgresql", lambda df: postgres.load(df, mode=pg_mode, snapshot=True),
+                     timeout=300, retries=2),
+            ] if sink.name in sinks]
+            if intermediate != "csv":
+                enabled.append(Sink("parquet", lambda df: load_to_parquet(
+                    df, output_path="products.parquet", raise_on_error=True)))
+            results = run_sinks(cleaned_df, enabled)
+
+        for result in results:
+            if not result.ok:
+                print(f"Gagal menyimpan ke {result.name}: {result.error}")
+            elif result.name == "gsheet":
+                url = result.value["url"] if isinstance(result.value, dict) else result.value
+                print(f"Google Sheets URL: {url}")
+            elif isinstance(result.value, dict):
+                print(f"Disimpan ke {result.name} dalam {result.duration:.2f} detik: {result.value}")
+            else:
+                print(f"Disimpan ke {result.name} ({result.rows} data, {result.duration:.2f} detik)")
 
     except Exception as e:
         print(f"Gagal load data: {e}")
-        return
+        return False
 
     print("\nETL Pipeline selesai")
+    return True
+
+
+def main_streaming(pg_mode="replace", cache_dir=DEFAULT_HTTP_CACHE_DIR,
+                   parse_cache_path=DEFAULT_PARSE_CACHE_PATH, parser_backend=DEFAULT_PARSER_BACKEND,
+                   parse_workers=0, journal_path=DEFAULT_JOURNAL_PATH, resume=False, max_pages=None,
+                   compact=False, sinks=SINK_NAMES, resources=None, archive_path=None):
+    if resources is None:
+        with PipelineResources(cache_dir, parse_cache_path, journal_path, archive_path) as resources:
+            return main_streaming(pg_mode, parser_backend=parser_backend, parse_workers=parse_workers,
+                                  resume=resume, max_pages=max_pages, compact=compact, sinks=sinks,
+                                  resources=resources)
+
+    print("\nMemulai ETL Pipeline (mode streaming)...")
+
+    def raw_sink(batch, first):
+        load_to_csv(batch, output_path="raw_products.csv", raise_on_error=True, append=not first)
+
+    def csv_sink(batch, first):
+        load_to_csv(batch, output_path="products.csv", raise_on_error=True, append=not first)
+
+    # Baris yang tidak lolos validasi ditambahkan ke file karantina per batch
+    first_quarantine = True
+
+    def transform_batch(batch):
+        nonlocal first_quarantine
+        cleaned, quarantined = transform_with_quarantine(batch, compact=compact)
+        load_to_csv(quarantined, output_path="quarantine.csv", raise_on_error=True, append=not first_quarantine)
+        first_quarantine = False
+        return cleaned
+
+    # Satu pool koneksi untuk semua batch, bukan satu handshake per batch
+    postgres = resources.postgres
+
+    def postgres_sink(batch, first):
+        # Batch lanjutan selalu di-upsert agar produk yang sama tidak bentrok di product_key
+        mode = "replace" if first and pg_mode == "replace" else "upsert"
+        if not postgres.load(batch, mode=mode):
+            print("Gagal menyimpan batch ke PostgreSQL")
+
+    try:
+        with METRICS.stage("streaming"):
+            stats = run_streaming_pipeline(
+                iter_page_batches(max_pages=max_pages, concurrency=5, cache=resources.cache,
+                                  parse_cache=resources.parse_cache, parser_backend=parser_backend,
+                                  parse_workers=parse_workers, journal=resources.journal, resume=resume,
+                                  controller=resources.controller, session=resources.session,
+                                  archive=resources.archive),
+                transform_batch,
+                sinks=[sink for name, sink in [("csv", csv_sink), ("postgresql", postgres_sink)]
+                       if name in sinks],
+                raw_sink=raw_sink
+            )
+    except Exception as e:
+        print(f"Gagal menjalankan pipeline streaming: {e}")
+        return False
+
+    # Google Sheets tidak mendukung penulisan per batch, jadi dilewati di mode ini
+    print(f"Total {stats['clean_rows']} data dimuat dalam {stats['batches']} batch")
+    print("\nETL Pipeline selesai")
+    return True
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="ETL Pipeline Fashion Studio")
+    parser.add_argument("--stream", action="store_true",
+                        help="Jalankan extract, transform, dan load per halaman (memori terbatas)")
+    parser.add_argument("--pg-mode", choices=["replace", "upsert"], default="replace",
+                        help="replace: TRUNCATE lalu muat ulang; upsert: hanya tulis produk baru/berubah "
+                             "(dan hapus produk yang hilang, kecuali di mode --stream)")
+    parser.add_argument("--cache-dir", default=DEFAULT_HTTP_CACHE_DIR,
+                        help="Folder cache respons HTTP (ETag/Last-Modified)")
+    parser.add_argument("--parse-cache", default=DEFAULT_PARSE_CACHE_PATH,
+                        help="File SQLite cache hasil parsing halaman")
+    parser.add_argument("--no-cache", action="store_true", help="Nonaktifkan cache respons HTTP dan cache parsing")
+    parser.add_argument("--parser", default=DEFAULT_PARSER_BACKEND, choices=sorted(PARSER_BACKENDS),
+                        help="Backend parser HTML (default lxml jika terpasang)")
+    parser.add_argument("--parse-workers", type=int, default=0,
+                        help="Jumlah proses untuk parsing HTML (0 = parsing di proses utama)")
+    parser.add_argument("--report", default="run_report.json",
+                        help="File JSON berisi waktu dan memori per tahap")
+    parser.add_argument("--prometheus", default=None,
+                        help="Opsional: tulis metrik dalam format teks Prometheus ke file ini")
+    parser.add_argument("--max-pages", type=int, default=None,
+                        help="Batas atas jumlah halaman (default: semua halaman sesuai pagination situs)")
+    parser.add_argument("--gsheet-key", default=None,
+                        help="Key spreadsheet yang sudah ada; jika diisi, sheet diperbarui di tempat")
+    parser.add_argument("--cdc-index", default=DEFAULT_INDEX_PATH,
+                        help="File index hash run sebelumnya untuk menghasilkan changes.<format>")
+    parser.add_argument("--no-cdc", action="store_true", help="Jangan hitung perubahan dibanding run sebelumnya")
+    parser.add_argument("--compact", action="store_true",
+                        help="Simpan frame hasil transform dengan dtype hemat memori (category, string Arrow, int8)")
+    parser.add_argument("--journal", default=DEFAULT_JOURNAL_PATH,
+                        help="File SQLite jurnal crawl per halaman (checkpoint)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Lanjutkan crawl sebelumnya: hanya ambil halaman yang belum selesai atau gagal")
+    parser.add_argument("--intermediate", choices=["csv", "parquet", "arrow"], default="csv",
+                        help="Format file raw_products/cleaned_products (parquet/arrow butuh pyarrow)")
+    parser.add_argument("--sinks", default=",".join(SINK_NAMES),
+                        help=f"Sink yang dijalankan, dipisah koma (pilihan: {', '.join(SINK_NAMES)})")
+    parser.add_argument("--archive", nargs="?", const=DEFAULT_ARCHIVE_PATH, default=None,
+                        help=f"Arsipkan HTML setiap halaman (terkompresi) ke file ini (default {DEFAULT_ARCHIVE_PATH})")
+    parser.add_argument("--replay", nargs="?", const="latest", default=None,
+                        help="Parse ulang crawl dari arsip (ID crawl, default terbaru) tanpa mengakses situs")
+    schedule_group = parser.add_mutually_exclusive_group()
+    schedule_group.add_argument("--every", type=float, default=None,
+                                help="Mode daemon: jalankan pipeline setiap N detik dalam satu proses")
+    schedule_group.add_argument("--cron", default=None,
+                                help="Mode daemon: jadwal cron lima kolom, mis. '*/30 * * * *'")
+    parser.add_argument("--max-runs", type=int, default=None, help="Mode daemon: berhenti setelah N run")
+    parser.add_argument("--history", default="run_history.jsonl",
+                        help="Mode daemon: metrik setiap run ditambahkan ke file JSON Lines ini")
+    parser.add_argument("--lock-file", default=DEFAULT_LOCK_PATH,
+                        help="Lock agar dua run pipeline tidak berjalan bersamaan")
+    args = parser.parse_args()
+    sinks = tuple(name.strip() for name in args.sinks.split(",") if name.strip())
+    unknown = set(sinks) - set(SINK_NAMES)
+    if unknown:
+        parser.error(f"sink tidak dikenal: {', '.join(sorted(unknown))}")
+    if args.replay and args.stream:
+        parser.error("--replay belum didukung di mode --stream")
+    if args.replay and not args.archive:
+        args.archive = DEFAULT_ARCHIVE_PATH
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+    cache_dir = None if args.no_cache else args.cache_dir
+    parse_cache_path = None if args.no_cache else args.parse_cache
+
+    if args.stream:
+        run = partial(main_streaming, pg_mode=args.pg_mode, parser_backend=args.parser,
+                      parse_workers=args.parse_workers, max_pages=args.max_pages,
+                      compact=args.compact, sinks=sinks)
+    else:
+        run = partial(main, pg_mode=args.pg_mode, parser_backend=args.parser, parse_workers=args.parse_workers,
+                      intermediate=args.intermediate, max_pages=args.max_pages,
+                      gsheet_key=args.gsheet_key, cdc_index_path=None if args.no_cdc else args.cdc_index,
+                      compact=args.compact, sinks=sinks, replay=args.replay)
+
+    lock = RunLock(args.lock_file)
+    with PipelineResources(cache_dir, parse_cache_path, args.journal, args.archive) as resources:
+        if args.every or args.cron:
+            # Session, pool koneksi, client Sheets, dan cache dipakai ulang oleh semua run
+            daemon = PipelineDaemon(daemon_run(run, resources, resume=args.resume),
+                                    CronSchedule(args.cron) if args.cron else IntervalSchedule(args.every),
+                                    lock=lock, run_immediately=args.cron is None, max_runs=args.max_runs,
+                                    report_path=args.report, prometheus_path=args.prometheus,
+                                    history_path=args.history)
+            signal.signal(signal.SIGTERM, lambda *_: daemon.stop())
+            try:
+                daemon.serve()
+            except KeyboardInterrupt:
+                pass
+        else:
+            if not lock.acquire():
+                parser.exit(1, f"Pipeline lain sedang berjalan (lock {args.lock_file})\n")
+            try:
+                run(resources=resources, resume=args.resume)
+            finally:
+                lock.release()
+            METRICS.write_json(args.report)
+            if args.prometheus:
+                METRICS.write_prometheus(args.prometheus)
@@ -0,0 +1,150 @@
+"""
+Server HTTP lokal pengganti Fashion Studio untuk test (tanpa internet)
+"""
+
+import hashlib
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from email.utils import formatdate
+
+
+SIZES = ["S", "M", "L", "XL", "XXL"]
+GENDERS = ["Men", "Women", "Unisex"]
+
+
+def make_page_html(page, cards=2, total=None):
+    # Nilai kartu bervariasi tapi deterministik dari (page, i) agar ETag stabil
+    items = "".join(
+        f"""
+        <div class="collection-card">
+            <div class="product-details">
+                <h3>Item {page}-{i}</h3>
+                <div class="price-container"><span class="price">${10 + (page * 7 + i * 13) % 490}.{i % 100:02d}</span></div>
+                <p>Rating: ⭐ {1 + (page + i) % 40 / 10:.1f} / 5</p>
+                <p>{1 + (page + i) % 5} Colors</p>
+                <p>Size: {SIZES[(page + i) % len(SIZES)]}</p>
+                <p>Gender: {GENDERS[(page * 3 + i) % len(GENDERS)]}</p>
+            </div>
+        </div>"""
+        for i in range(cards)
+    )
+    pagination = ""
+    if total:
+        # Meniru pagination situs asli: "Page x of N" dan tautan Next
+        next_link = f'<li class="page-item next"><a class="page-link" href="/page{page + 1}">Next</a></li>' \
+            if page < total else ""
+        pagination = f"""
+        <div class="pagination"><ul class="pagination">
+            <li class="page-item current"><span class="page-link">Page {page} of {total}</span></li>
+            {next_link}
+        </ul></div>"""
+    return f"<html><body>{items}{pagination}</body></html>"
+
+
+class FakeFashionStudio:
+    """
+    Menyajikan halaman / dan /pageN seperti situs asli, lengkap dengan
+    ETag dan Last-Modified. Dipakai sebagai context manager; atribut url
+    berisi base URL server.
+
+    Gangguan bisa disuntikkan: faults={page: [503, 429]} membalas status
+    tersebut berurutan sebelum halaman normal, retry_after mengisi header
+    Retry-After, down=True membuat semua request dibalas 503, dan delay
+    menahan setiap respons sekian detik. pagination=False menghilangkan
+    blok "Page x of N" sehingga jumlah halaman harus ditebak dari 404.
+    error_rate membalas 503 secara acak (seed tetap) untuk sebagian request.
+
+    HTML dibuat saat diminta, jadi katalog besar tidak disimpan di memori.
+    """
+
+    def __init__(self, pages=3, cards=2, faults=None, retry_after=None, delay=0.0, pagination=True,
+                 error_rate=0.0, seed=0):
+        self.page_count = pages
+        self.cards = cards
+        self.total = pages if pagination else None
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self.faults = {page: list(statuses) for page, statuses in (faults or {}).items()}
+        self.retry_after = retry_after
+        self.down = False
+        self.delay = delay
+        self.last_modified = formatdate(usegmt=True)
+        self.requests = []
+        self.request_times = []  # time.monotonic() setiap request, urut sesuai requests
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def page_html(self, page):
+        return make_page_html(page, self.cards, self.total)
+
+    def etag(self, html):
+        return '"' + hashlib.md5(html.encode("utf-8")).hexdigest() + '"'
+
+    def _make_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                try:
+                    page = 1 if self.path in ("", "/") else int(self.path.strip("/").replace("page", ""))
+                except ValueError:
+                    page = 0
+                with fake._lock:
+                    fake.requests.append((self.path, dict(self.headers)))
+                    fake.request_times.append(time.monotonic())
+                    statuses = fake.faults.get(page)
+                    fault = 503 if fake.down else (statuses.pop(0) if statuses else None)
+                    if not fault and fake.error_rate and fake._random.random() < fake.error_rate:
+                        fault = 503
+
+                if fake.delay:
+                    time.sleep(fake.delay)
+                if fault:
+                    self.send_response(fault)
+                    if fake.retry_after is not None:
+                        self.send_header("Retry-After", str(fake.retry_after))
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                if not 1 <= page <= fake.page_count:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+
+                html = fake.page_html(page)
+                etag = fake.etag(html)
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+
+                body = html.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", fake.last_modified)
+                self.end_headers()
+                self.wfile.write(body)
+                with fake._lock:
+                    fake.bytes_sent += len(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,75 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import pandas as pd
+from main import PipelineResources, main
+from utils.archive import CODEC_ZLIB, PageArchive
+from utils.extract import CARD_FIELDS, replay_all_pages, scrape_all_pages
+from tests.fake_server import FakeFashionStudio, make_page_html
+
+
+class TestPageArchive(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "pages.archive")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_pages_survive_reopen_and_torn_writes(self):
+        archive = PageArchive(self.path, codec=CODEC_ZLIB)
+        archive.append("crawl-1", 2, make_page_html(2))
+        archive.append("crawl-1", 1, make_page_html(1))
+        archive.append("crawl-2", 1, make_page_html(1, cards=5))
+        archive.close()
+        with open(self.path, "ab") as f:
+            f.write(b"frame tanpa baris index")  # proses mati di tengah append
+
+        archive = PageArchive(self.path)
+        self.assertEqual([crawl["crawl_id"] for crawl in archive.crawls()], ["crawl-1", "crawl-2"])
+        self.assertEqual(list(archive.iter_pages("crawl-1")), [(1, make_page_html(1)), (2, make_page_html(2))])
+        self.assertEqual(archive.read("crawl-2", 1), make_page_html(1, cards=5))
+        self.assertIsNone(archive.read("crawl-2", 2))
+
+        # Halaman yang ditambahkan setelah mmap dibuat tetap terbaca
+        archive.append("crawl-3", 1, make_page_html(3))
+        self.assertEqual(list(archive.iter_pages()), [(1, make_page_html(3))])
+        archive.close()
+
+    def test_replay_reproduces_crawl_without_network(self):
+        archive = PageArchive(self.path)
+        with FakeFashionStudio(pages=3, cards=4) as server, patch("utils.extract.BASE_URL", server.url), \
+                patch("utils.extract.open", create=True):
+            crawled = scrape_all_pages(max_pages=None, archive=archive)
+
+        with patch("utils.extract.get_page_content") as get, patch("utils.extract.open", create=True):
+            replayed = replay_all_pages(archive)
+        get.assert_not_called()
+        archive.close()
+
+        self.assertEqual(len(replayed), 12)
+        self.assertTrue(replayed.drop(columns="timestamp").equals(crawled.drop(columns="timestamp")))
+
+    def test_replay_ignores_stale_parse_cache(self):
+        archive = PageArchive(self.path)
+        archive.append("crawl-1", 1, make_page_html(1))
+        archive.close()
+        cwd = os.getcwd()
+        os.chdir(self.tmp_dir)
+        try:
+            with PipelineResources(None, "parsed.sqlite", None, self.path) as resources:
+                # Hasil parser versi lama untuk HTML yang sama
+                resources.parse_cache.put(make_page_html(1), {field: ["lama"] for field in CARD_FIELDS})
+                self.assertTrue(main(sinks=("csv",), cdc_index_path=None, resources=resources, replay="latest"))
+            raw = pd.read_csv("raw_products.csv")
+        finally:
+            os.chdir(cwd)
+
+        self.assertEqual(raw["Title"].tolist(), ["Item 1-0", "Item 1-1"])
+
+
+if __name__ == '__main__':
+    unittest.main()
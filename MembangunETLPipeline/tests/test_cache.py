@@ -0,0 +1,104 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from utils import extract
+from utils.cache import ParseCache, ResponseCache
+from tests.fake_server import FakeFashionStudio, make_page_html
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_put_and_get_roundtrip(self):
+        cache = ResponseCache(self.cache_dir)
+        cache.put("http://x/page2", "<html></html>", etag='"abc"', last_modified="Wed, 14 May 2025 10:00:00 GMT")
+        entry = cache.get("http://x/page2")
+        self.assertEqual(entry["body"], "<html></html>")
+        self.assertEqual(cache.conditional_headers(entry), {
+            "If-None-Match": '"abc"',
+            "If-Modified-Since": "Wed, 14 May 2025 10:00:00 GMT"
+        })
+
+    def test_expired_entry_is_dropped(self):
+        cache = ResponseCache(self.cache_dir, ttl=0.01)
+        cache.put("http://x/", "body")
+        time.sleep(0.05)
+        self.assertIsNone(cache.get("http://x/"))
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+    def test_eviction_keeps_total_size_bounded(self):
+        cache = ResponseCache(self.cache_dir, max_bytes=1000)
+        for i in range(10):
+            cache.put(f"http://x/page{i}", "x" * 300)
+        total = sum(os.path.getsize(os.path.join(self.cache_dir, name)) for name in os.listdir(self.cache_dir))
+        self.assertLessEqual(total, 1000)
+        # Entri terbaru tetap ada
+        self.assertIsNotNone(cache.get("http://x/page9"))
+
+
+class TestParseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = ParseCache(os.path.join(self.cache_dir, "parsed.sqlite"), max_entries=2)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_unchanged_page_skips_beautifulsoup(self):
+        html = make_page_html(1, cards=3)
+        first = extract.extract_products_from_page(html, parse_cache=self.cache, backend="bs4")
+
+        with patch("bs4.BeautifulSoup") as mock_soup:
+            second = extract.extract_products_from_page(html, parse_cache=self.cache, backend="bs4")
+            mock_soup.assert_not_called()
+
+        strip = lambda rows: [{k: v for k, v in row.items() if k != "timestamp"} for row in rows]
+        self.assertEqual(strip(first), strip(second))
+        self.assertEqual(list(second[0].keys()), list(first[0].keys()))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_lru_eviction(self):
+        pages = [make_page_html(page) for page in range(1, 4)]
+        for html in pages:
+            extract.extract_products_from_page(html, parse_cache=self.cache)
+        self.assertIsNone(self.cache.get(pages[0]))
+        self.assertIsNotNone(self.cache.get(pages[2]))
+
+
+class TestConditionalFetch(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_second_run_is_served_by_304(self):
+        with FakeFashionStudio(pages=3) as server, \
+                patch("utils.extract.BASE_URL", server.url), \
+                patch("utils.extract.open", create=True), patch("utils.extract.time.sleep"):
+            first = extract.scrape_all_pages(max_pages=3, cache=ResponseCache(self.cache_dir))
+            sent_after_first = server.bytes_sent
+
+            cache = ResponseCache(self.cache_dir)
+            second = extract.scrape_all_pages(max_pages=3, cache=cache)
+
+        self.assertEqual(len(first), 6)
+        self.assertEqual(first["Title"].tolist(), second["Title"].tolist())
+        self.assertEqual(server.bytes_sent, sent_after_first)
+        self.assertEqual(cache.hits, 3)
+        self.assertIn("If-None-Match", server.requests[-1][1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+from utils.cdc import capture_changes, load_index
+
+
+class TestCaptureChanges(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.index_path = os.path.join(self.tmp_dir, "index.npz")
+        self.df = pd.DataFrame({
+            "Title": ["T-shirt", "Hoodie", "Pants"],
+            "Price": [1600000.0, 3200000.0, 800000.0],
+            "Rating": [4.5, 4.0, 3.5],
+            "Colors": [3, 2, 1],
+            "Size": ["M", "L", "S"],
+            "Gender": ["Women", "Men", "Unisex"],
+            "timestamp": ["2025-05-14 10:00:00"] * 3
+        })
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_first_run_reports_everything_as_inserted(self):
+        changes = capture_changes(self.df, self.index_path)
+        self.assertEqual(changes["change"].tolist(), ["inserted"] * 3)
+        self.assertEqual(len(load_index(self.index_path)[0]), 3)
+
+    def test_second_run_emits_only_the_delta(self):
+        capture_changes(self.df, self.index_path)
+
+        current = self.df.copy()
+        current.loc[1, "Price"] = 2900000.0  # Hoodie turun harga
+        current.loc[0, "timestamp"] = "2025-05-15 10:00:00"  # hanya timestamp, bukan perubahan
+        current = pd.concat([current.drop(index=2), pd.DataFrame([{
+            "Title": "Jacket", "Price": 4800000.0, "Rating": 4.8, "Colors": 5,
+            "Size": "XL", "Gender": "Men", "timestamp": "2025-05-15 10:00:00"
+        }])], ignore_index=True)
+
+        changes = capture_changes(current, self.index_path)
+
+        self.assertEqual(changes["change"].tolist(), ["updated", "inserted", "deleted"])
+        self.assertEqual(changes["Title"].tolist()[:2], ["Hoodie", "Jacket"])
+        self.assertTrue(changes["product_key"].str.fullmatch("[0-9a-f]{16}").all())
+        self.assertTrue(capture_changes(current, self.index_path).empty)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from utils.checkpoint import CrawlJournal
+from utils.extract import extract_page_columns, make_page_batch, scrape_all_pages
+from tests.fake_server import make_page_html
+
+
+class TestCrawlJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "crawl.sqlite")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_journal_survives_reopen(self):
+        journal = CrawlJournal(self.path)
+        journal.record_done(1, [{"Title": "A"}])
+        journal.record_failed(2, "timeout")
+        journal.close()
+
+        journal = CrawlJournal(self.path)
+        self.assertEqual(journal.completed(), {1: [{"Title": "A"}]})
+        self.assertEqual(journal.failed(), {2: "timeout"})
+        self.assertEqual(journal.completed(max_pages=0), {})
+        journal.close()
+
+    def test_resume_refetches_only_missing_and_failed_pages(self):
+        def crashing_get(session, page, **kwargs):
+            if page == 2:
+                return None
+            if page == 4:
+                raise RuntimeError("crawler crashed")
+            return make_page_html(page)
+
+        journal = CrawlJournal(self.path)
+        with patch("utils.extract.get_page_content", side_effect=crashing_get), \
+                patch("utils.extract.open", create=True), patch("utils.extract.time.sleep"):
+            partial_df = scrape_all_pages(max_pages=5, journal=journal)
+        self.assertEqual(len(partial_df), 4)
+        self.assertEqual(sorted(journal.completed()), [1, 3])
+        self.assertEqual(list(journal.failed()), [2])
+
+        with patch("utils.extract.get_page_content", side_effect=lambda s, page, **kw: make_page_html(page)) as get, \
+                patch("utils.extract.open", create=True), patch("utils.extract.time.sleep"):
+            df = scrape_all_pages(max_pages=5, journal=journal, resume=True)
+        self.assertEqual([call.args[1] for call in get.call_args_list], [2, 4, 5])
+        self.assertEqual(df["Title"].tolist(), [f"Item {page}-{i}" for page in range(1, 6) for i in range(2)])
+        # Halaman dari jurnal dan halaman baru tetap satu crawl
+        self.assertEqual(df["crawl_id"].unique().tolist(), partial_df["crawl_id"].unique().tolist())
+        self.assertEqual(journal.failed(), {})
+        journal.close()
+
+
+    def test_resume_fetches_page_1_missing_from_journal(self):
+        # Crawl mati saat halaman 1 masih di parse worker: page_count sudah tercatat, halaman 1 belum
+        journal = CrawlJournal(self.path)
+        journal.set_meta("page_count", 3)
+        journal.set_meta("crawl_id", "crawl-1")
+        for page in (2, 3):
+            journal.record_done(page, make_page_batch(extract_page_columns(make_page_html(page)), page, "crawl-1"))
+
+        with patch("utils.extract.get_page_content", side_effect=lambda s, page, **kw: make_page_html(page)) as get, \
+                patch("utils.extract.open", create=True), patch("utils.extract.time.sleep"):
+            df = scrape_all_pages(max_pages=None, journal=journal, resume=True)
+        journal.close()
+
+        self.assertEqual([call.args[1] for call in get.call_args_list], [1])
+        self.assertEqual(df["page"].unique().tolist(), [1, 2, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,19 @@
+import os
+import threading
+import time
 import unittest
 import pandas as pd
 from utils import extract
 from unittest.mock import patch
+from tests.fake_server import FakeFashionStudio, make_page_html
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def without_timestamp(products):
+    return [{k: v for k, v in product.items() if k != "timestamp"} for product in products]
+
+
 
 class TestExtract(unittest.TestCase):
 
@@ -30,5 +42,183 @@ class TestExtract(unittest.TestCase):
         df = extract.scrape_all_pages(max_pages=1)
         self.assertTrue(df.empty)
 
+    def test_concurrent_scrape_keeps_page_order(self):
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def fake_get(session, page, **kwargs):
+            with lock:
+                active.append(page)
+                peak.append(len(active))
+            # Halaman awal sengaja lebih lambat agar selesai paling akhir
+            time.sleep(0.05 if page <= 2 else 0.01)
+            with lock:
+                active.remove(page)
+            return make_page_html(page)
+
+        with patch("utils.extract.get_page_content", side_effect=fake_get), \
+                patch("utils.extract.open", create=True):
+            df = extract.scrape_all_pages(max_pages=6, concurrency=4,
+                                          requests_per_second=None, max_per_host=3)
+
+        expected = [f"Item {page}-{i}" for page in range(1, 7) for i in range(2)]
+        self.assertEqual(df["Title"].tolist(), expected)
+        self.assertGreater(max(peak), 1)
+        self.assertLessEqual(max(peak), 3)
+
+    def test_iter_page_batches_yields_one_frame_per_page(self):
+        with patch("utils.extract.get_page_content", side_effect=lambda s, page, **kw: make_page_html(page, cards=3)), \
+                patch("utils.extract.open", create=True), patch("utils.extract.time.sleep"):
+            batches = list(extract.iter_page_batches(max_pages=3))
+
+        self.assertEqual(len(batches), 3)
+        self.assertTrue(all(len(batch) == 3 for batch in batches))
+        self.assertEqual(batches[1]["Title"].iloc[0], "Item 2-0")
+
+    def test_batches_share_page_timestamp_and_metadata(self):
+        with patch("utils.extract.get_page_content", side_effect=lambda s, page, **kw: make_page_html(page, cards=3)), \
+                patch("utils.extract.open", create=True), patch("utils.extract.time.sleep"):
+            df = extract.scrape_all_pages(max_pages=3)
+
+        self.assertEqual(list(df.columns), list(extract.BATCH_FIELDS))
+        self.assertEqual(df["page"].tolist(), [page for page in range(1, 4) for _ in range(3)])
+        self.assertEqual(df["crawl_id"].nunique(), 1)
+        self.assertTrue((df.groupby("page")["timestamp"].nunique() == 1).all())
+
+    @unittest.skipUnless("lxml" in extract.PARSER_BACKENDS, "lxml tidak terpasang")
+    def test_lxml_backend_matches_bs4(self):
+        with open(os.path.join(FIXTURE_DIR, "fashion_studio_page1.html"), encoding="utf-8") as f:
+            html = f.read()
+
+        bs4_products = extract.extract_products_from_page(html, backend="bs4")
+        lxml_products = extract.extract_products_from_page(html, backend="lxml")
+
+        self.assertEqual(len(bs4_products), 20)
+        self.assertEqual(without_timestamp(lxml_products), without_timestamp(bs4_products))
+        self.assertEqual([list(p) for p in lxml_products], [list(p) for p in bs4_products])
+
+    def test_unknown_backend_falls_back_to_bs4(self):
+        products = extract.extract_products_from_page(make_page_html(1), backend="selectolax")
+        self.assertEqual(len(products), 2)
+
+    def test_parse_pages_in_processes_keeps_order(self):
+        pages = [(page, make_page_html(page, cards=3)) for page in range(1, 8)]
+
+        with patch("utils.extract.open", create=True):
+            parsed = list(extract.parse_pages_in_processes(iter(pages), workers=2, chunksize=2, backend="bs4"))
+
+        self.assertEqual([page for page, _ in parsed], list(range(1, 8)))
+        expected = [extract.extract_page_columns(html, backend="bs4") for _, html in pages]
+        self.assertEqual([columns for _, columns in parsed], expected)
+        self.assertEqual(list(parsed[0][1]), list(extract.CARD_FIELDS))
+
+    def test_parse_workers_are_not_forked(self):
+        with patch("utils.extract.ProcessPoolExecutor", wraps=extract.ProcessPoolExecutor) as pool, \
+                patch("utils.extract.open", create=True):
+            list(extract.parse_pages_in_processes(iter([(1, make_page_html(1))]), workers=1, backend="bs4"))
+        self.assertNotEqual(pool.call_args.kwargs["mp_context"].get_start_method(), "fork")
+
+    def test_scrape_with_parse_workers(self):
+        with patch("utils.extract.get_page_content", side_effect=lambda s, page, **kw: make_page_html(page)), \
+                patch("utils.extract.open", create=True), patch("utils.extract.time.sleep"):
+            df = extract.scrape_all_pages(max_pages=4, parse_workers=2, parse_chunksize=3)
+
+        self.assertEqual(df["Title"].tolist(), [f"Item {page}-{i}" for page in range(1, 5) for i in range(2)])
+
+    def test_rate_limiter_spaces_requests(self):
+        limiter = extract.RateLimiter(requests_per_second=50)
+        start = time.monotonic()
+        for _ in range(6):
+            limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+    def test_aimd_rate_limiter_adapts(self):
+        limiter = extract.AdaptiveRateLimiter(requests_per_second=4, max_rate=10)
+        limiter.on_success(0.1)
+        self.assertEqual(limiter.rate, 4.5)
+        limiter.on_error()
+        self.assertEqual(limiter.rate, 2.25)
+        # Latency melonjak jauh di atas rata-rata dianggap tanda server kewalahan
+        limiter.on_success(1.0)
+        self.assertEqual(limiter.rate, 1.125)
+
+    def test_requested_rate_is_the_ceiling(self):
+        limiter = extract.AdaptiveRateLimiter(requests_per_second=4)
+        for _ in range(5):
+            limiter.on_success(0.1)
+        self.assertEqual(limiter.rate, 4)
+        limiter.on_error()
+        limiter.on_success(0.1)
+        self.assertEqual(limiter.rate, 2.5)
+
+    def test_crawl_never_exceeds_requested_rate(self):
+        rate = 8
+        with FakeFashionStudio(pages=16) as server, patch("utils.extract.BASE_URL", server.url):
+            df = extract.scrape_all_pages(max_pages=16, concurrency=4, requests_per_second=rate)
+
+        self.assertEqual(len(df), 32)
+        times = server.request_times
+        # Request ke-i paling cepat i/rate detik setelah request pertama (toleransi jitter scheduler)
+        for i, at in enumerate(times):
+            self.assertGreaterEqual(at - times[0], i / rate - 0.02)
+
+    def test_retry_after_is_honored(self):
+        with FakeFashionStudio(pages=1, faults={1: [429, 503]}, retry_after=0.3) as server, \
+                patch("utils.extract.BASE_URL", server.url):
+            session = extract.create_session()
+            start = time.monotonic()
+            html_content = extract.fetch_page_with_retry(session, 1, controller=extract.FetchController(
+                extract.AdaptiveRateLimiter(None), backoff_base=10))
+            elapsed = time.monotonic() - start
+            session.close()
+
+        self.assertIn("Item 1-0", html_content)
+        self.assertEqual(len(server.requests), 3)
+        self.assertGreaterEqual(elapsed, 0.6)
+        self.assertLess(elapsed, 5)
+
+    def test_missing_page_is_not_retried(self):
+        with FakeFashionStudio(pages=1) as server, patch("utils.extract.BASE_URL", server.url):
+            session = extract.create_session()
+            self.assertIsNone(extract.fetch_page_with_retry(session, 7))
+            session.close()
+        self.assertEqual(len(server.requests), 1)
+
+    def test_circuit_breaker_stops_crawl_of_dead_site(self):
+        controller = extract.FetchController(extract.AdaptiveRateLimiter(None),
+                                             extract.CircuitBreaker(failure_threshold=3), backoff_base=0.01)
+        with FakeFashionStudio(pages=20) as server, patch("utils.extract.BASE_URL", server.url):
+            server.down = True
+            start = time.monotonic()
+            df = extract.scrape_all_pages(max_pages=20, controller=controller)
+
+        self.assertTrue(df.empty)
+        self.assertEqual(len(server.requests), 3)
+        self.assertLess(time.monotonic() - start, 2)
+
+    def test_discover_pages_from_pagination(self):
+        with open(os.path.join(FIXTURE_DIR, "fashion_studio_page1.html"), encoding="utf-8") as f:
+            self.assertEqual(extract.discover_pages(f.read()), (50, 2))
+        self.assertEqual(extract.discover_pages(make_page_html(1)), (None, 1))
+
+    def test_page_count_is_discovered_from_first_page(self):
+        with FakeFashionStudio(pages=4) as server, patch("utils.extract.BASE_URL", server.url), \
+                patch("utils.extract.open", create=True):
+            df = extract.scrape_all_pages(max_pages=None, concurrency=3, requests_per_second=None)
+
+        self.assertEqual(len(df), 8)
+        self.assertEqual(sorted(path for path, _ in server.requests), ["/", "/page2", "/page3", "/page4"])
+
+    def test_crawl_stops_after_consecutive_missing_pages(self):
+        with FakeFashionStudio(pages=3, pagination=False) as server, patch("utils.extract.BASE_URL", server.url), \
+                patch("utils.extract.open", create=True):
+            df = extract.scrape_all_pages(max_pages=None, requests_per_second=None)
+
+        self.assertEqual(df["Title"].tolist(), [f"Item {page}-{i}" for page in range(1, 4) for i in range(2)])
+        # Dua 404 berturut-turut menandai akhir katalog, tanpa retry
+        self.assertEqual([path for path, _ in server.requests], ["/", "/page2", "/page3", "/page4", "/page5"])
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
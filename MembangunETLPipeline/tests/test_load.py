@@ -1,8 +1,18 @@
 import unittest
 import pandas as pd
 import os
+import subprocess
+import sys
 from unittest.mock import patch, MagicMock
-from utils.load import load_to_csv, load_to_postgresql, load_to_gsheet
+import gspread
+import psycopg2.extensions
+from utils.load import (PostgresLoader, load_to_csv, load_to_parquet, load_to_postgresql, load_to_gsheet,
+                        read_intermediate, sync_to_gsheet)
+from utils.extract import scrape_all_pages
+from utils.transform import compact_dtypes, product_keys, transform_data
+from tests.fake_server import FakeFashionStudio
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 
 class TestLoad(unittest.TestCase):
@@ -20,7 +30,8 @@ class TestLoad(unittest.TestCase):
         })
 
     def tearDown(self):
-        for file in ["test_output.csv", "test_existing.csv", "error.csv"]:
+        for file in ["test_output.csv", "test_existing.csv", "error.csv", "test_output.parquet",
+                     "test_output.arrow"]:
             if os.path.exists(file):
                 os.remove(file)
 
@@ -44,6 +55,13 @@ class TestLoad(unittest.TestCase):
         self.assertTrue(result)
         self.assertTrue(os.path.exists(path))
 
+    def test_load_to_csv_append_batches(self):
+        load_to_csv(self.df, output_path=self.test_file)
+        load_to_csv(self.df, output_path=self.test_file, append=True)
+        df_loaded = pd.read_csv(self.test_file)
+        self.assertEqual(len(df_loaded), 2)
+        self.assertEqual(list(df_loaded.columns), list(self.df.columns))
+
     def test_load_to_csv_with_invalid_df(self):
         with self.assertRaises(Exception):
             load_to_csv("bukan_df", output_path="error.csv", raise_on_error=True)
@@ -71,6 +89,172 @@ class TestLoad(unittest.TestCase):
         mock_cursor.close.assert_called_once()
         mock_conn.close.assert_called_once()
 
+    @patch("utils.load.psycopg2.connect")
+    def test_load_to_postgresql_without_truncate(self, mock_connect):
+        mock_cursor = MagicMock()
+        mock_connect.return_value.cursor.return_value = mock_cursor
+
+        load_to_postgresql(self.df, "test_db", "user", "pass", "localhost", "5432", truncate=False)
+
+        statements = [call.args[0] for call in mock_cursor.execute.call_args_list]
+        self.assertFalse(any("TRUNCATE" in sql for sql in statements))
+
+    @patch("utils.load.psycopg2.connect")
+    def test_load_to_postgresql_uses_chunked_copy(self, mock_connect):
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        df = pd.concat([self.df] * 5, ignore_index=True)
+        df["Title"] = [f"T-shirt {i}" for i in range(5)]
+        df.loc[4, "timestamp"] = None
+
+        copied = []
+        mock_cursor.copy_expert.side_effect = lambda sql, buffer: copied.append(buffer.getvalue())
+
+        result = load_to_postgresql(df, "test_db", "user", "pass", "localhost", "5432", chunk_size=2)
+
+        self.assertTrue(result)
+        self.assertEqual(mock_cursor.copy_expert.call_count, 3)
+        self.assertIn("COPY products", mock_cursor.copy_expert.call_args.args[0])
+        self.assertTrue(copied[0].startswith("T-shirt 0,1600000.0,4.5,3,M,Women,2025-05-14 10:00:00,"))
+        self.assertEqual(sum(len(chunk.splitlines()) for chunk in copied), 5)
+        self.assertNotIn(",,", copied[2])
+        mock_conn.commit.assert_called_once()
+
+    @patch("utils.load.psycopg2.connect")
+    def test_load_to_postgresql_upsert_reports_counts(self, mock_connect):
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchone.return_value = (1, 1)
+
+        df = pd.concat([self.df] * 3, ignore_index=True)
+        df["Title"] = ["T-shirt", "Hoodie", "Pants"]
+
+        result = load_to_postgresql(df, "test_db", "user", "pass", "localhost", "5432", mode="upsert")
+
+        self.assertEqual(result, {"inserted": 1, "updated": 1, "unchanged": 1})
+        statements = [call.args[0] for call in mock_cursor.execute.call_args_list]
+        self.assertFalse(any("TRUNCATE" in sql for sql in statements))
+        self.assertTrue(any("ON CONFLICT (product_key)" in sql for sql in statements))
+        self.assertIn("products_stage", mock_cursor.copy_expert.call_args.args[0])
+        mock_conn.commit.assert_called_once()
+
+    @patch("utils.load.psycopg2.connect")
+    def test_postgres_loader_reuses_pooled_connection(self, mock_connect):
+        mock_conn = MagicMock(closed=0)
+        mock_conn.info.transaction_status = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchone.return_value = (1, 0)
+
+        with PostgresLoader("test_db", "user", "pass") as loader:
+            results = [loader.load(self.df, mode="upsert") for _ in range(3)]
+
+        self.assertEqual(results, [{"inserted": 1, "updated": 0, "unchanged": 0}] * 3)
+        statements = [call.args[0] for call in mock_cursor.execute.call_args_list]
+        self.assertEqual(sum("CREATE TABLE IF NOT EXISTS products" in sql for sql in statements), 1)
+        self.assertEqual(sum(sql.startswith("PREPARE products_upsert") for sql in statements), 1)
+        self.assertEqual(statements.count("EXECUTE products_upsert"), 3)
+        mock_connect.assert_called_once()
+        self.assertEqual(mock_conn.commit.call_count, 3)
+        mock_conn.close.assert_called_once()
+
+    @patch("utils.load.psycopg2.connect")
+    def test_postgres_loader_prepares_each_new_connection(self, mock_connect):
+        connections = []
+
+        def connect(**kwargs):
+            conn = MagicMock(closed=0)
+            conn.info.transaction_status = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+            conn.cursor.return_value.fetchone.return_value = (1, 0)
+            connections.append(conn)
+            return conn
+
+        mock_connect.side_effect = connect
+        with PostgresLoader("test_db", "user", "pass") as loader:
+            loader.load(self.df, mode="upsert")
+            # Koneksi putus: dibuang dari pool setelah dipakai, koneksi pengganti harus disiapkan ulang
+            connections[0].closed = 2
+            loader.load(self.df, mode="upsert")
+            loader.load(self.df, mode="upsert")
+            self.assertEqual(len(loader._prepared), 1)
+            self.assertIn(connections[1], loader._prepared)
+
+        for conn in connections:
+            statements = [call.args[0] for call in conn.cursor.return_value.execute.call_args_list]
+            self.assertEqual(sum(sql.startswith("PREPARE products_upsert") for sql in statements), 1)
+
+    @patch("utils.load.psycopg2.connect")
+    def test_snapshot_upsert_deletes_missing_products(self, mock_connect):
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.fetchone.return_value = (0, 1)
+        mock_cursor.rowcount = 2
+
+        result = load_to_postgresql(self.df, "test_db", "user", "pass", "localhost", "5432", mode="upsert",
+                                    snapshot=True)
+
+        self.assertEqual(result, {"inserted": 0, "updated": 1, "unchanged": 0, "deleted": 2})
+        statements = [call.args[0] for call in mock_cursor.execute.call_args_list]
+        delete = next(sql for sql in statements if "DELETE FROM products\n" in sql)
+        self.assertIn("NOT EXISTS", delete)
+        self.assertGreater(statements.index(delete), statements.index("EXECUTE products_upsert"))
+
+    @patch("utils.load.psycopg2.connect")
+    def test_legacy_rows_get_product_key_instead_of_being_deleted(self, mock_connect):
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.fetchone.return_value = (1, 0)
+        # Baris lama tanpa product_key: produk 1 tercatat dua kali, produk 3 sudah punya baris ber-key
+        legacy = [(1, "T-shirt", "M", "Women", 3), (2, "T-shirt", "M", "Women", 3), (3, "Hoodie", "L", "Men", None)]
+        hoodie_key = product_keys(pd.DataFrame({"Title": ["Hoodie"], "Size": ["L"], "Gender": ["Men"],
+                                                "Colors": pd.array([None], dtype="Int64")})).iloc[0]
+        mock_cursor.__iter__.side_effect = [iter(legacy), iter([(hoodie_key,)])]
+
+        load_to_postgresql(self.df, "test_db", "user", "pass", "localhost", "5432", mode="upsert")
+
+        statements = [call.args[0] for call in mock_cursor.execute.call_args_list]
+        self.assertFalse(any("product_key IS NULL" in sql and sql.startswith("DELETE") for sql in statements))
+        updates = mock_cursor.executemany.call_args.args[1]
+        self.assertEqual(updates, [(product_keys(self.df).iloc[0], 2)])
+
+    def test_product_keys_are_stable_and_ignore_price(self):
+        other = self.df.copy()
+        other["Price"] = [999.0]
+        other["timestamp"] = ["2025-06-01 00:00:00"]
+        self.assertEqual(product_keys(self.df).iloc[0], product_keys(other).iloc[0])
+
+        other["Size"] = ["L"]
+        self.assertNotEqual(product_keys(self.df).iloc[0], product_keys(other).iloc[0])
+
+    def test_compact_frame_is_written_with_standard_schema(self):
+        self.df["timestamp"] = ["2025-05-14T10:00:00.500000"]
+        load_to_csv(self.df, output_path="test_existing.csv")
+        load_to_csv(compact_dtypes(self.df), output_path=self.test_file)
+        with open("test_existing.csv") as expected, open(self.test_file) as actual:
+            self.assertEqual(actual.read(), expected.read())
+
+    def test_parquet_round_trip_keeps_dtypes(self):
+        self.assertTrue(load_to_parquet(self.df, output_path="test_output.parquet"))
+        df_loaded = read_intermediate("test_output.parquet")
+        pd.testing.assert_frame_equal(self.df, df_loaded)
+        self.assertEqual(df_loaded["Colors"].dtype, "int64")
+
+    def test_parquet_keeps_raw_strings(self):
+        raw = pd.DataFrame({"Title": ["T-shirt"], "Price": ["$100.00"], "Rating": ["Invalid Rating"],
+                            "Colors": ["3 Colors"], "page": [1]})
+        self.assertTrue(load_to_parquet(raw, output_path="test_output.parquet"))
+        pd.testing.assert_frame_equal(raw, read_intermediate("test_output.parquet"))
+
+    def test_arrow_file_read_through_memory_map(self):
+        self.df["Colors"] = self.df["Colors"].astype("int32")
+        self.assertTrue(load_to_parquet(self.df, output_path="test_output.arrow"))
+        df_loaded = read_intermediate("test_output.arrow")
+        self.assertEqual(df_loaded["Colors"].dtype, "int64")
+        self.assertEqual(df_loaded["Title"].tolist(), ["T-shirt"])
+
     @patch("utils.load.psycopg2.connect", side_effect=Exception("DB Error"))
     def test_load_to_postgresql_failure(self, mock_connect):
         result = load_to_postgresql(
@@ -83,7 +267,7 @@ class TestLoad(unittest.TestCase):
         )
         self.assertFalse(result)
 
-    @patch("utils.load.set_with_dataframe")
+    @patch("gspread_dataframe.set_with_dataframe")
     @patch("utils.load.gspread.authorize")
     @patch("utils.load.Credentials.from_service_account_file")
     def test_load_to_gsheet_success(self, mock_creds, mock_authorize, mock_set_with_df):
@@ -102,11 +286,86 @@ class TestLoad(unittest.TestCase):
         self.assertIn("http", result)
         mock_set_with_df.assert_called_once()
 
+    def test_load_to_gsheet_with_client_resolves_lazy_imports(self):
+        # Interpreter baru: set_with_dataframe belum pernah di-resolve oleh test lain
+        code = ("from unittest.mock import MagicMock, patch; import pandas as pd; "
+                "from utils.load import load_to_gsheet; "
+                "client = MagicMock(); client.create.return_value.url = 'https://sheet'; "
+                "patch('gspread_dataframe.set_with_dataframe').start(); "
+                "print(load_to_gsheet(pd.DataFrame({'Title': ['A']}), 'S', 'missing.json', client=client))")
+        result = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_DIR, capture_output=True,
+                                text=True, check=True)
+        self.assertEqual(result.stdout.strip(), "https://sheet")
+
     @patch("utils.load.gspread.authorize", side_effect=Exception("GS Error"))
     def test_load_to_gsheet_failure(self, mock_authorize):
         result = load_to_gsheet(self.df, "FailSheet", "google-sheets-api.json")
         self.assertIsNone(result)
 
+    def _mock_worksheet(self, mock_authorize, current):
+        worksheet = MagicMock(row_count=1000, col_count=26)
+        worksheet.get_all_values.return_value = current
+        mock_authorize.return_value.open_by_key.return_value.sheet1 = worksheet
+        return worksheet
+
+    @patch("utils.load.Credentials.from_service_account_file")
+    @patch("utils.load.gspread.authorize")
+    def test_sync_to_gsheet_sends_only_changed_rows(self, mock_authorize, mock_creds):
+        df = pd.DataFrame({"Title": ["A", "B", "C"], "Price": [1600000.0, 3200000.0, 4.5]})
+        # Sheets mengembalikan angka bulat sebagai int; baris B berubah, baris lama D harus dikosongkan
+        worksheet = self._mock_worksheet(mock_authorize, [
+            ["Title", "Price"], ["A", 1600000], ["B", 1], ["C", 4.5], ["D", 9],
+        ])
+
+        result = sync_to_gsheet(df, "sheet-key", "google-sheets-api.json")
+
+        mock_authorize.return_value.open_by_key.assert_called_once_with("sheet-key")
+        worksheet.batch_update.assert_called_once()
+        self.assertEqual(worksheet.batch_update.call_args.args[0], [{"range": "A3:B3", "values": [["B", 3200000.0]]}])
+        worksheet.batch_clear.assert_called_once_with(["A5:B5"])
+        self.assertEqual(result["changed_rows"], 1)
+        self.assertEqual(result["cleared_rows"], 1)
+
+    @patch("utils.load.Credentials.from_service_account_file")
+    @patch("utils.load.gspread.authorize")
+    def test_sync_to_gsheet_chunks_rows_and_retries_quota_errors(self, mock_authorize, mock_creds):
+        df = pd.DataFrame({"Title": [f"T{i}" for i in range(2500)], "Colors": range(2500)})
+        worksheet = self._mock_worksheet(mock_authorize, [])
+        quota = MagicMock()
+        quota.json.return_value = {"error": {"code": 429, "message": "Quota exceeded", "status": "RESOURCE_EXHAUSTED"}}
+        worksheet.batch_update.side_effect = [gspread.exceptions.APIError(quota), {}, {}, {}]
+
+        with patch("utils.load.time.sleep") as mock_sleep:
+            result = sync_to_gsheet(df, "sheet-key", "google-sheets-api.json", chunk_size=1000)
+
+        # 2501 baris (header + data) = 3 request, ditambah 1 retry setelah 429
+        self.assertEqual(worksheet.batch_update.call_count, 4)
+        mock_sleep.assert_called_once()
+        worksheet.resize.assert_called_once_with(rows=2501, cols=26)
+        self.assertEqual(result["changed_rows"], 2501)
+        self.assertIsInstance(worksheet.batch_update.call_args.args[0][0]["values"][0][1], int)
+
+
+    @patch("utils.load.Credentials.from_service_account_file")
+    @patch("utils.load.gspread.authorize")
+    def test_sync_to_gsheet_ignores_crawl_timestamps(self, mock_authorize, mock_creds):
+        crawls = []
+        for _ in range(2):
+            with FakeFashionStudio(pages=2, cards=3) as server, patch("utils.extract.BASE_URL", server.url), \
+                    patch("utils.extract.open", create=True):
+                crawls.append(transform_data(scrape_all_pages(max_pages=None)))
+        self.assertNotEqual(crawls[0]["timestamp"].tolist(), crawls[1]["timestamp"].tolist())
+
+        worksheet = self._mock_worksheet(mock_authorize, [])
+        self.assertEqual(sync_to_gsheet(crawls[0], "sheet-key", "google-sheets-api.json")["changed_rows"], 7)
+        written = worksheet.batch_update.call_args.args[0][0]["values"]
+
+        # Produk sama dari crawl berikutnya: tidak ada baris yang dikirim ulang
+        worksheet = self._mock_worksheet(mock_authorize, written)
+        result = sync_to_gsheet(crawls[1], "sheet-key", "google-sheets-api.json")
+        worksheet.batch_update.assert_not_called()
+        self.assertEqual(result["changed_rows"], 0)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,61 @@
+import json
+import os
+import tempfile
+import unittest
+import pandas as pd
+from utils.metrics import METRICS, Metrics
+from utils.transform import transform_data
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_timer_and_rows_per_second(self):
+        metrics = Metrics()
+        metrics.observe("load.csv", 0.5)
+        metrics.observe("load.csv", 1.5)
+        metrics.increment("load.csv.rows", 100)
+
+        timing = metrics.report()["timings"]["load.csv"]
+        self.assertEqual(timing["count"], 2)
+        self.assertAlmostEqual(timing["total_seconds"], 2.0)
+        self.assertAlmostEqual(timing["max_seconds"], 1.5)
+        self.assertAlmostEqual(timing["rows_per_second"], 50.0)
+
+    def test_stage_records_peak_memory(self):
+        metrics = Metrics()
+        with metrics.stage("extract"):
+            pass
+        report = metrics.report()
+        self.assertIn("stage.extract", report["timings"])
+        if report["peak_rss_bytes"] is not None:
+            self.assertGreater(report["gauges"]["stage.extract.peak_rss_bytes"], 0)
+
+    def test_json_and_prometheus_output(self):
+        metrics = Metrics()
+        with metrics.timer("extract.fetch"):
+            pass
+        metrics.increment("extract.fetch.bytes", 2048)
+
+        path = os.path.join(tempfile.mkdtemp(), "report.json")
+        metrics.write_json(path)
+        with open(path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["counters"]["extract.fetch.bytes"], 2048)
+
+        text = metrics.to_prometheus()
+        self.assertIn('etl_step_seconds_count{step="extract.fetch"} 1', text)
+        self.assertIn('etl_events_total{name="extract.fetch.bytes"} 2048', text)
+        self.assertTrue(text.endswith("\n"))
+
+    def test_transform_reports_sub_steps(self):
+        METRICS.reset()
+        transform_data(pd.DataFrame({
+            "Title": ["T-shirt"], "Price": ["$1.00"], "Rating": ["4.5 / 5"], "Colors": ["3 Colors"],
+            "Size": ["Size: M"], "Gender": ["Gender: Men"], "timestamp": ["t"]
+        }))
+        timings = METRICS.report()["timings"]
+        for step in ["transform", "transform.filter", "transform.fields", "transform.finalize"]:
+            self.assertIn(step, timings)
+
+
+if __name__ == '__main__':
+    unittest.main()
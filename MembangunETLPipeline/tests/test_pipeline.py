@@ -0,0 +1,57 @@
+import unittest
+import pandas as pd
+from utils.pipeline import run_streaming_pipeline
+from utils.transform import transform_data
+
+
+def make_batch(page, rows=2):
+    return pd.DataFrame({
+        "Title": [f"Item {page}-{i}" for i in range(rows)],
+        "Price": ["$10.00"] * rows,
+        "Rating": ["⭐ 4.5 / 5"] * rows,
+        "Colors": ["3 Colors"] * rows,
+        "Size": ["Size: M"] * rows,
+        "Gender": ["Gender: Men"] * rows,
+        "timestamp": ["2025-05-14 10:00:00"] * rows
+    })
+
+
+class TestStreamingPipeline(unittest.TestCase):
+
+    def test_batches_reach_sinks_in_order(self):
+        loaded = []
+        raw = []
+        stats = run_streaming_pipeline(
+            (make_batch(page) for page in range(1, 6)),
+            transform_data,
+            sinks=[lambda batch, first: loaded.append((first, batch["Title"].tolist()))],
+            raw_sink=lambda batch, first: raw.append(first),
+            queue_size=1
+        )
+
+        self.assertEqual(stats["batches"], 5)
+        self.assertEqual(stats["clean_rows"], 10)
+        self.assertEqual([first for first, _ in loaded], [True, False, False, False, False])
+        self.assertEqual(raw, [True, False, False, False, False])
+        self.assertEqual(loaded[2][1], ["Item 3-0", "Item 3-1"])
+
+    def test_extract_stops_when_sink_fails(self):
+        produced = []
+
+        def batches():
+            for page in range(1, 100):
+                produced.append(page)
+                yield make_batch(page)
+
+        def failing_sink(batch, first):
+            raise RuntimeError("sink down")
+
+        with self.assertRaises(RuntimeError):
+            run_streaming_pipeline(batches(), transform_data, sinks=[failing_sink], queue_size=1)
+
+        # Backpressure: extract tidak membaca seluruh sumber data
+        self.assertLess(len(produced), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+import unittest
+from utils.plugins import LazyImports, PluginRegistry
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestPlugins(unittest.TestCase):
+
+    def test_registry_imports_plugin_on_first_lookup(self):
+        registry = PluginRegistry({"json": "json:dumps", "missing": "not_installed_module:func"},
+                                  requires={"missing": "not_installed_module"})
+        self.assertEqual(list(registry), ["json"])
+        self.assertNotIn("missing", registry)
+        self.assertEqual(registry["json"]([1]), "[1]")
+        with self.assertRaises(KeyError):
+            registry["missing"]
+
+    def test_lazy_imports_resolve_on_access_and_optional_falls_back_to_none(self):
+        lazy = LazyImports("fake", {"dumps": "json:dumps", "missing": "not_installed_module"},
+                           optional=("missing",))
+        self.assertEqual(lazy("dumps")([1]), "[1]")
+        self.assertIsNone(lazy("missing"))
+        with self.assertRaises(AttributeError):
+            lazy("unknown")
+
+    def test_lazy_module_attributes_are_not_injected_into_globals(self):
+        import utils.load
+        self.assertIs(utils.load.psycopg2, sys.modules["psycopg2"])
+        self.assertNotIn("psycopg2", vars(utils.load))
+
+    def test_importing_pipeline_does_not_load_sink_libraries(self):
+        code = ("import sys, main; "
+                "print(sorted({m.split('.')[0] for m in sys.modules} & {'gspread', 'psycopg2', 'bs4', 'google', 'zstandard'}))")
+        result = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_DIR, capture_output=True,
+                                text=True, check=True)
+        self.assertEqual(result.stdout.strip(), "[]")
+
+
+if __name__ == '__main__':
+    unittest.main()
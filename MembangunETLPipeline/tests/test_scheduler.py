@@ -0,0 +1,85 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from functools import partial
+from unittest.mock import patch
+import pandas as pd
+from main import PipelineResources, daemon_run, main
+from utils.scheduler import CronSchedule, IntervalSchedule, PipelineDaemon, RunLock
+from tests.fake_server import FakeFashionStudio
+
+
+class TestCronSchedule(unittest.TestCase):
+
+    def test_next_after(self):
+        saturday = datetime(2026, 10, 17, 10, 7, 30)
+        self.assertEqual(CronSchedule("*/15 * * * *").next_after(saturday), datetime(2026, 10, 17, 10, 15))
+        self.assertEqual(CronSchedule("0 3 * * *").next_after(saturday), datetime(2026, 10, 18, 3, 0))
+        self.assertEqual(CronSchedule("30 8 * * 1-5").next_after(saturday), datetime(2026, 10, 19, 8, 30))
+        self.assertEqual(CronSchedule("0 12 29 2 *").next_after(saturday), datetime(2028, 2, 29, 12, 0))
+
+    def test_invalid_expression(self):
+        for expression in ("* * * *", "61 * * * *", "*/0 * * * *"):
+            with self.assertRaises(ValueError):
+                CronSchedule(expression)
+
+
+class TestPipelineDaemon(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp_dir)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_lock_prevents_overlapping_runs(self):
+        holder = RunLock("pipeline.lock")
+        self.assertTrue(holder.acquire())
+        daemon = PipelineDaemon(lambda: True, IntervalSchedule(60), lock=RunLock("pipeline.lock"), max_runs=1)
+        daemon.serve()
+        holder.release()
+        self.assertEqual([entry["status"] for entry in daemon.history], ["skipped"])
+        self.assertEqual(daemon.runs, 0)
+
+    def test_scheduled_runs_reuse_warm_resources(self):
+        with FakeFashionStudio(pages=3) as server, patch("utils.extract.BASE_URL", server.url), \
+                PipelineResources("http", "parsed.sqlite", "crawl.sqlite") as resources:
+            daemon = PipelineDaemon(partial(main, sinks=("csv",), resources=resources), IntervalSchedule(0.01),
+                                    lock=RunLock("pipeline.lock"), max_runs=2, history_path="history.jsonl")
+            daemon.serve()
+
+        self.assertEqual(daemon.runs, 2)
+        with open("history.jsonl", encoding="utf-8") as f:
+            history = [json.loads(line) for line in f]
+        self.assertEqual([entry["status"] for entry in history], ["ok", "ok"])
+        # Run kedua hanya mendapat 304 karena cache respons tetap hidup di proses yang sama
+        self.assertEqual((resources.cache.hits, resources.cache.misses), (3, 3))
+        self.assertEqual(history[1]["counters"]["cdc.inserted"], 0)
+
+    def test_resume_applies_only_to_first_daemon_run(self):
+        with FakeFashionStudio(pages=3) as server, patch("utils.extract.BASE_URL", server.url), \
+                PipelineResources("http", "parsed.sqlite", "crawl.sqlite") as resources:
+            def run(**kwargs):
+                result = main(sinks=("csv",), cdc_index_path=None, **kwargs)
+                # Katalog berubah setelah run pertama selesai
+                server.cards = 3
+                return result
+
+            daemon = PipelineDaemon(daemon_run(run, resources, resume=True), IntervalSchedule(0.01),
+                                    lock=RunLock("pipeline.lock"), max_runs=2)
+            daemon.serve()
+
+        self.assertEqual([entry["status"] for entry in daemon.history], ["ok", "ok"])
+        # Run kedua crawl ulang, bukan melanjutkan jurnal crawl pertama yang sudah selesai
+        self.assertEqual(len(server.requests), 6)
+        self.assertEqual(len(pd.read_csv("products.csv")), 9)
+
+
+if __name__ == '__main__':
+    unittest.main()
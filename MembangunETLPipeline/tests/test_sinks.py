@@ -0,0 +1,86 @@
+import threading
+import time
+import unittest
+import pandas as pd
+from utils.sinks import Sink, run_sinks
+
+
+class TestRunSinks(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({"Title": ["T-shirt", "Hoodie"], "Price": [1.0, 2.0]})
+
+    def test_sinks_run_concurrently(self):
+        def slow(df):
+            time.sleep(0.3)
+            return True
+
+        start = time.perf_counter()
+        results = run_sinks(self.df, [Sink("a", slow), Sink("b", slow), Sink("c", slow)])
+        elapsed = time.perf_counter() - start
+
+        self.assertTrue(all(result.ok for result in results))
+        self.assertLess(elapsed, 0.8)
+        self.assertEqual([result.rows for result in results], [2, 2, 2])
+
+    def test_failure_is_isolated_per_sink(self):
+        def broken(df):
+            raise RuntimeError("DB Error")
+
+        results = run_sinks(self.df, [
+            Sink("broken", broken),
+            Sink("falsy", lambda df: None),
+            Sink("csv", lambda df: True),
+        ])
+
+        self.assertEqual([result.ok for result in results], [False, False, True])
+        self.assertIn("DB Error", results[0].error)
+        self.assertIn("None", results[1].error)
+        self.assertIsNone(results[2].error)
+
+    def test_retry_after_error(self):
+        calls = []
+
+        def flaky(df):
+            calls.append(1)
+            if len(calls) == 1:
+                raise ConnectionError("quota exceeded")
+            return "https://docs.google.com/spreadsheets/d/test-url"
+
+        result = run_sinks(self.df, [Sink("gsheet", flaky, timeout=1, retries=1, backoff=0)])[0]
+
+        self.assertTrue(result.ok)
+        self.assertEqual(result.attempts, 2)
+        self.assertEqual(result.value, "https://docs.google.com/spreadsheets/d/test-url")
+
+    def test_timed_out_attempt_is_not_retried(self):
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def slow(df):
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.5)
+            with lock:
+                running.pop()
+            return True
+
+        result = run_sinks(self.df, [Sink("postgresql", slow, timeout=0.2, retries=2, backoff=0)])[0]
+        time.sleep(0.5)
+
+        self.assertFalse(result.ok)
+        self.assertEqual(result.attempts, 1)
+        self.assertIn("outcome unknown", result.error)
+        self.assertEqual(max(peak), 1)
+        self.assertEqual(len(peak), 1)
+
+    def test_timeout_without_retry_reports_error(self):
+        result = run_sinks(self.df, [Sink("slow", lambda df: time.sleep(1) or True, timeout=0.05)])[0]
+        self.assertFalse(result.ok)
+        self.assertIn("TimeoutError", result.error)
+
+
+if __name__ == '__main__':
+    unittest.main()
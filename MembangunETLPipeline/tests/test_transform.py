@@ -1,6 +1,7 @@
 import unittest
 import pandas as pd
-from utils.transform import transform_data
+from utils.metrics import METRICS
+from utils.transform import product_keys, standard_dtypes, transform_data, transform_with_quarantine
 
 class TestTransform(unittest.TestCase):
 
@@ -36,12 +37,105 @@ class TestTransform(unittest.TestCase):
         self.assertEqual(df_cleaned.iloc[0]["Size"], "M")
         self.assertEqual(df_cleaned.iloc[0]["Gender"], "Women")
 
+    def test_single_pass_matches_step_by_step_rules(self):
+        raw = pd.DataFrame({
+            "Title": ["A", "A", "B", "C", None, "D", "E"],
+            "Price": ["$1.50", "$1.50", "$", "$2.00", "$3.00", "PRICE UNAVAILABLE", "$4.00"],
+            "Rating": ["⭐ 4.5 / 5", "⭐ 4.5 / 5", "⭐ 3.0 / 5", "⭐ Not Rated", "⭐ 4.0 / 5", "⭐ 4.0 / 5", "⭐ 5 / 5"],
+            "Colors": ["3 Colors", "3 Colors", "No Colors", "5 Colors", "1 Colors", "2 Colors", "8 Colors"],
+            "Size": ["Size: M", "Size: M", "Size: L", "Size:  XL ", "Size: S", "Size: S", "Size: S"],
+            "Gender": ["Gender: Men", "Gender: Men", "Gender: Women", "Gender: Unisex", "Gender: Men", "Gender: Men", "Gender: Men"],
+            "timestamp": ["t"] * 7
+        })
+
+        df_cleaned = transform_data(raw)
+
+        # Duplikat, Title kosong, harga kosong, dan harga tidak tersedia dibuang
+        self.assertEqual(df_cleaned.index.tolist(), [0, 3, 6])
+        self.assertEqual(df_cleaned["Price"].tolist(), [1.5 * 16000, 2.0 * 16000, 4.0 * 16000])
+        self.assertTrue(pd.isna(df_cleaned.loc[3, "Rating"]))
+        self.assertTrue(pd.isna(df_cleaned.loc[6, "Rating"]))
+        self.assertEqual(df_cleaned["Colors"].tolist(), [3, 5, 8])
+        self.assertEqual(df_cleaned.loc[3, "Size"], "XL")
+        self.assertEqual(list(df_cleaned.columns), list(raw.columns))
+        self.assertEqual(df_cleaned.dtypes.astype(str).tolist(),
+                         ["object", "float64", "float64", "int64", "object", "object", "object"])
+
+    def test_failing_rows_are_quarantined_with_reason(self):
+        raw = pd.DataFrame({
+            "Title": ["A", "Unknown Product", "B", "C", "D", "E", "F", "G", "A"],
+            "Price": ["$1.00", "$2.00", "$0.00", "$3.00", "$4.00", "$5.00", "$6.00", "$", "$1.00"],
+            "Rating": ["⭐ 4.5 / 5", "⭐ 4.0 / 5", "⭐ 4.0 / 5", "⭐ 7.5 / 5", "⭐ 4.0 / 5", "⭐ 4.0 / 5",
+                       "⭐ 4.0 / 5", "⭐ 4.0 / 5", "⭐ 4.5 / 5"],
+            "Colors": ["3 Colors", "3 Colors", "3 Colors", "3 Colors", "Many Colors", "3 Colors", "3 Colors",
+                       "3 Colors", "3 Colors"],
+            "Size": ["Size: M", "Size: M", "Size: M", "Size: M", "Size: M", "Size: XXXL", "Size: M", "Size: M",
+                     "Size: M"],
+            "Gender": ["Gender: Men", "Gender: Men", "Gender: Men", "Gender: Men", "Gender: Men", "Gender: Men",
+                       "Gender: Kids", "Gender: Men", "Gender: Men"],
+            "timestamp": ["t"] * 9
+        })
+
+        METRICS.reset()
+        # Colors tanpa angka tidak lagi menggagalkan seluruh batch
+        cleaned, quarantined = transform_with_quarantine(raw)
+
+        self.assertEqual(cleaned.index.tolist(), [0])
+        self.assertEqual(quarantined.index.tolist(), list(range(1, 9)))
+        self.assertEqual(quarantined["reason"].tolist(), [
+            "invalid_marker", "price_out_of_range", "rating_out_of_range", "colors_invalid",
+            "size_not_allowed", "gender_not_allowed", "price_missing", "duplicate"])
+        # Baris karantina disimpan dengan nilai mentahnya
+        self.assertEqual(quarantined.loc[4, "Colors"], "Many Colors")
+        counters = METRICS.report()["counters"]
+        self.assertEqual(counters["validate.quarantined"], 8)
+        self.assertEqual(counters["validate.size_not_allowed"], 1)
+        self.assertEqual(counters["validate.missing_value"], 0)
+
+    def test_unparseable_price_is_quarantined(self):
+        raw = pd.concat([self.raw_data.iloc[:1]] * 3, ignore_index=True)
+        raw["Price"] = ["$100.00", "$1.2.3", "$."]
+
+        cleaned, quarantined = transform_with_quarantine(raw)
+
+        self.assertEqual(cleaned["Price"].tolist(), [1600000.0])
+        self.assertEqual(quarantined["reason"].tolist(), ["price_unparseable"] * 2)
+        self.assertEqual(quarantined["Price"].tolist(), ["$1.2.3", "$."])
+
+    def test_crawl_metadata_stays_out_of_cleaned_data(self):
+        raw = pd.concat([self.raw_data, self.raw_data.iloc[:1]], ignore_index=True)
+        raw["page"] = [1, 1, 2]
+        raw["crawl_id"] = "crawl-1"
+        # Setiap halaman punya timestamp fetch sendiri
+        raw.loc[2, "timestamp"] = "2025-05-14 10:05:00"
+
+        cleaned, quarantined = transform_with_quarantine(raw)
+
+        self.assertEqual(list(cleaned.columns), list(self.raw_data.columns))
+        # Produk yang sama di halaman lain tetap terdeteksi duplikat
+        self.assertEqual(quarantined["reason"].tolist(), ["invalid_marker", "duplicate"])
+        self.assertEqual(quarantined["page"].tolist(), [1, 2])
+
     def test_transform_handles_missing_columns(self):
         bad_df = pd.DataFrame({"Foo": [1], "Bar": [2]})
         with self.assertRaises(ValueError) as context:
             transform_data(bad_df)
         self.assertIn("Missing required column", str(context.exception))
 
+    def test_compact_mode_round_trips_to_standard_schema(self):
+        raw = pd.concat([self.raw_data.iloc[[0]]] * 3, ignore_index=True)
+        raw["Title"] = ["T-shirt", "Hoodie", "Pants"]
+        raw["timestamp"] = ["2025-05-24T09:19:31.123456"] * 3
+        standard = transform_data(raw)
+        compact = transform_data(raw, compact=True)
+
+        self.assertEqual(compact["Size"].dtype, "category")
+        self.assertEqual(compact["Gender"].dtype, "category")
+        self.assertEqual(compact["Colors"].dtype, "int8")
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(compact["timestamp"]))
+        pd.testing.assert_frame_equal(standard_dtypes(compact), standard)
+        pd.testing.assert_series_equal(product_keys(compact), product_keys(standard))
+
 
 if __name__ == '__main__':
     unittest.main()
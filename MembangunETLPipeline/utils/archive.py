@@ -0,0 +1,178 @@
+"""
+Module arsip HTML mentah: setiap halaman yang di-fetch ditulis sebagai satu
+frame terkompresi ke file append-only, dengan index offset per crawl dan
+halaman, sehingga crawl lama bisa di-parse ulang tanpa jaringan
+"""
+
+import logging
+import mmap
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from utils.metrics import METRICS
+from utils.plugins import is_installed
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ARCHIVE_PATH = os.path.join(".cache", "pages.archive")
+
+CODEC_ZSTD = "zstd"
+CODEC_ZLIB = "zlib"
+DEFAULT_CODEC = CODEC_ZSTD if is_installed("zstandard") else CODEC_ZLIB
+
+
+def new_crawl_id() -> str:
+    """ID crawl yang urut secara leksikografis sesuai waktu mulai (UTC)."""
+    return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+
+
+class PageArchive:
+    """
+    Arsip halaman HTML. Data ada di `path` (frame terkompresi yang hanya
+    ditambahkan di akhir file), index offset-nya di `path`.idx (SQLite).
+    Baris index baru ditulis setelah frame-nya selesai di-flush, jadi frame
+    yang terpotong karena proses mati tidak pernah terbaca. Pembacaan memakai
+    mmap, sehingga replay tidak menyalin file ke memori.
+
+    Setiap frame dikompres sendiri-sendiri (zstd jika terpasang, selain itu
+    zlib) dan codec-nya dicatat di index, agar arsip lama tetap terbaca
+    meski codec default berubah.
+    """
+
+    def __init__(self, path: str = DEFAULT_ARCHIVE_PATH, codec: str = DEFAULT_CODEC):
+        # zstandard opsional (arsip memakai zlib jika tidak ada) dan baru di-import di sini,
+        # bukan saat modul ini ikut ter-import lewat extract
+        try:
+            import zstandard
+        except ImportError:
+            zstandard = None
+        if codec == CODEC_ZSTD and zstandard is None:
+            raise ImportError("zstandard belum terpasang, jalankan: pip install zstandard")
+        self.path = path
+        self.codec = codec
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._data = open(path, "ab")
+        self._map: Optional[mmap.mmap] = None
+        self._reader = None
+        self._compressor = zstandard.ZstdCompressor(level=3) if codec == CODEC_ZSTD else None
+        self._decompressor = zstandard.ZstdDecompressor() if zstandard is not None else None
+
+        self._conn = sqlite3.connect(f"{path}.idx", check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS archive_pages (
+                crawl_id TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                raw_length INTEGER NOT NULL,
+                codec TEXT NOT NULL,
+                PRIMARY KEY (crawl_id, page)
+            )
+        """)
+        self._conn.commit()
+
+    def _compress(self, raw: bytes) -> bytes:
+        if self.codec == CODEC_ZSTD:
+            return self._compressor.compress(raw)
+        return zlib.compress(raw, 6)
+
+    def _decompress(self, frame: bytes, codec: str) -> bytes:
+        if codec == CODEC_ZSTD:
+            if self._decompressor is None:
+                raise ImportError("Arsip ini memakai zstd, jalankan: pip install zstandard")
+            return self._decompressor.decompress(frame)
+        return zlib.decompress(frame)
+
+    def append(self, crawl_id: str, page: int, html_content: str) -> None:
+        raw = html_content.encode("utf-8")
+        with self._lock:
+            frame = self._compress(raw)
+            offset = self._data.seek(0, os.SEEK_END)
+            self._data.write(frame)
+            self._data.flush()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO archive_pages "
+                "(crawl_id, page, fetched_at, offset, length, raw_length, codec) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (crawl_id, page, time.time(), offset, len(frame), len(raw), self.codec)
+            )
+            self._conn.commit()
+        METRICS.increment("archive.raw_bytes", len(raw))
+        METRICS.increment("archive.bytes", len(frame))
+
+    def crawls(self) -> List[Dict]:
+        """Ringkasan setiap crawl di arsip, urut dari yang paling lama."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT crawl_id, COUNT(*), MIN(fetched_at), SUM(length), SUM(raw_length) "
+                "FROM archive_pages GROUP BY crawl_id ORDER BY crawl_id"
+            ).fetchall()
+        return [{"crawl_id": crawl_id, "pages": pages, "started_at": started_at,
+                 "bytes": size, "raw_bytes": raw_size}
+                for crawl_id, pages, started_at, size, raw_size in rows]
+
+    def latest_crawl(self) -> Optional[str]:
+        crawls = self.crawls()
+        return crawls[-1]["crawl_id"] if crawls else None
+
+    def fetch_times(self, crawl_id: str) -> Dict[int, float]:
+        """Waktu fetch (epoch detik) setiap halaman dalam satu crawl."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT page, fetched_at FROM archive_pages WHERE crawl_id = ?", (crawl_id,)
+            ).fetchall()
+        return dict(rows)
+
+    def _view(self, end: int) -> mmap.mmap:
+        # Dipetakan ulang jika file sudah bertambah sejak mmap terakhir
+        if self._map is None or len(self._map) < end:
+            if self._map is not None:
+                self._map.close()
+                self._reader.close()
+            self._reader = open(self.path, "rb")
+            self._map = mmap.mmap(self._reader.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def _read_frame(self, offset: int, length: int, codec: str) -> str:
+        # Frame didekompres langsung dari memoryview mmap, tanpa salinan bytes terkompresi
+        with self._lock:
+            view = memoryview(self._view(offset + length))
+            try:
+                raw = self._decompress(view[offset:offset + length], codec)
+            finally:
+                view.release()
+        return raw.decode("utf-8")
+
+    def read(self, crawl_id: str, page: int) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT offset, length, codec FROM archive_pages WHERE crawl_id = ? AND page = ?", (crawl_id, page)
+            ).fetchone()
+        return self._read_frame(*row) if row else None
+
+    def iter_pages(self, crawl_id: Optional[str] = None) -> Iterator[Tuple[int, str]]:
+        """(page, html) dari satu crawl (default yang terbaru), urut nomor halaman."""
+        crawl_id = crawl_id or self.latest_crawl()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT page, offset, length, codec FROM archive_pages WHERE crawl_id = ? ORDER BY page",
+                (crawl_id,)
+            ).fetchall()
+        for page, offset, length, codec in rows:
+            yield page, self._read_frame(offset, length, codec)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._reader.close()
+                self._map = None
+            self._data.close()
+            self._conn.close()
@@ -0,0 +1,177 @@
+"""
+Module cache untuk hasil fetch dan parsing halaman Fashion Studio
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HTTP_CACHE_DIR = os.path.join(".cache", "http")
+DEFAULT_TTL = 24 * 60 * 60  # detik
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+DEFAULT_PARSE_CACHE_PATH = os.path.join(".cache", "parsed.sqlite")
+DEFAULT_MAX_ENTRIES = 1000
+
+
+class ResponseCache:
+    """
+    Cache respons HTTP di disk, satu file JSON per URL berisi body beserta
+    ETag/Last-Modified. Entri yang lebih tua dari ttl dibuang, dan total
+    ukuran dibatasi max_bytes dengan membuang entri yang paling lama tidak dipakai.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_HTTP_CACHE_DIR, ttl: float = DEFAULT_TTL,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, url: str) -> Optional[Dict]:
+        path = self._path(url)
+        with self._lock:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                return None
+
+            if time.time() - entry["stored_at"] > self.ttl:
+                os.remove(path)
+                return None
+
+            # mtime dipakai sebagai penanda LRU
+            os.utime(path)
+            return entry
+
+    def conditional_headers(self, entry: Optional[Dict]) -> Dict[str, str]:
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(self, url: str, body: str, etag: Optional[str] = None,
+            last_modified: Optional[str] = None) -> None:
+        self.misses += 1
+        entry = {
+            "url": url,
+            "body": body,
+            "etag": etag,
+            "last_modified": last_modified,
+            "stored_at": time.time(),
+        }
+        path = self._path(url)
+        with self._lock:
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+            self._evict()
+
+    def revalidated(self, url: str, entry: Dict) -> str:
+        """Dipanggil saat server membalas 304: perpanjang umur entri dan kembalikan body."""
+        self.hits += 1
+        entry["stored_at"] = time.time()
+        path = self._path(url)
+        with self._lock:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+        return entry["body"]
+
+    def _evict(self) -> None:
+        files = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            stat = os.stat(path)
+            files.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        files.sort()
+        while total > self.max_bytes and files:
+            _, size, path = files.pop(0)
+            os.remove(path)
+            total -= size
+            logger.info(f"Evicted cached response {path}")
+
+
+class ParseCache:
+    """
+    Cache hasil parsing per halaman di SQLite. Kunci berupa hash SHA-256 dari
+    HTML, nilainya kolom produk (tanpa timestamp) yang di-pickle dan
+    dikompres. Jumlah entri dibatasi max_entries dengan kebijakan LRU.
+    """
+
+    def __init__(self, path: str = DEFAULT_PARSE_CACHE_PATH, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS parsed_pages (
+                html_hash TEXT PRIMARY KEY,
+                products BLOB NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    @staticmethod
+    def key(html_content: str) -> str:
+        return hashlib.sha256(html_content.encode("utf-8")).hexdigest()
+
+    def get(self, html_content: str) -> Optional[Dict[str, list]]:
+        key = self.key(html_content)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT products FROM parsed_pages WHERE html_hash = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE parsed_pages SET last_used = ? WHERE html_hash = ?", (time.time(), key))
+            self._conn.commit()
+            self.hits += 1
+        return pickle.loads(zlib.decompress(row[0]))
+
+    def put(self, html_content: str, products: Dict[str, list]) -> None:
+        blob = zlib.compress(pickle.dumps(products, protocol=pickle.HIGHEST_PROTOCOL))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO parsed_pages (html_hash, products, last_used) VALUES (?, ?, ?)",
+                (self.key(html_content), blob, time.time())
+            )
+            self._conn.execute("""
+                DELETE FROM parsed_pages WHERE html_hash NOT IN (
+                    SELECT html_hash FROM parsed_pages ORDER BY last_used DESC LIMIT ?
+                )
+            """, (self.max_entries,))
+            self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
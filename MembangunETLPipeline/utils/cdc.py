@@ -0,0 +1,102 @@
+"""
+Module change-data-capture: bandingkan hasil transform dengan run sebelumnya
+dan hasilkan hanya baris inserted, updated, dan deleted
+"""
+
+import logging
+import os
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.metrics import METRICS
+from utils.transform import product_key_hashes
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = os.path.join(".cache", "snapshot_index.npz")
+
+# Kolom yang dianggap "isi" produk; perubahan di sini berarti updated
+VALUE_COLUMNS = ["Price", "Rating"]
+
+CHANGE_INSERTED = "inserted"
+CHANGE_UPDATED = "updated"
+CHANGE_DELETED = "deleted"
+
+
+def value_hashes(df: pd.DataFrame) -> np.ndarray:
+    return pd.util.hash_pandas_object(df[VALUE_COLUMNS], index=False).to_numpy()
+
+
+def load_index(path: str = DEFAULT_INDEX_PATH) -> Tuple[np.ndarray, np.ndarray]:
+    """Index run sebelumnya: (hash kunci, hash nilai), masing-masing uint64. Kosong jika belum ada."""
+    if not os.path.exists(path):
+        return np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.uint64)
+    with np.load(path) as data:
+        return data["keys"], data["values"]
+
+
+def save_index(keys: np.ndarray, values: np.ndarray, path: str = DEFAULT_INDEX_PATH) -> None:
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Ditulis ke file sementara dulu agar index lama tidak rusak jika proses mati di tengah
+    tmp_path = f"{path}.tmp.npz"
+    np.savez(tmp_path, keys=keys, values=values)
+    os.replace(tmp_path, path)
+
+
+def diff_snapshot(df: pd.DataFrame, prev_keys: np.ndarray,
+                  prev_values: np.ndarray) -> Tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+    """
+    Bandingkan df dengan index sebelumnya lewat hash join (linear). Hasilnya
+    DataFrame perubahan dengan kolom product_key dan change, beserta index
+    baru untuk run berikutnya. Baris deleted hanya berisi product_key karena
+    index tidak menyimpan isi baris.
+    """
+    keys = product_key_hashes(df)
+    values = value_hashes(df)
+
+    # Satu baris per produk, sama seperti load PostgreSQL: ambil yang terakhir
+    unique = ~pd.Series(keys).duplicated(keep="last").to_numpy()
+    if not unique.all():
+        df, keys, values = df[unique], keys[unique], values[unique]
+
+    positions = pd.Index(prev_keys).get_indexer(keys)
+    seen = positions >= 0
+    inserted = ~seen
+    updated = np.zeros(len(keys), dtype=bool)
+    updated[seen] = prev_values[positions[seen]] != values[seen]
+
+    deleted = np.ones(len(prev_keys), dtype=bool)
+    deleted[positions[seen]] = False
+
+    mask = inserted | updated
+    changed = df[mask].assign(
+        product_key=pd.Series(keys[mask]).map('{:016x}'.format).to_numpy(),
+        change=np.where(inserted[mask], CHANGE_INSERTED, CHANGE_UPDATED),
+    )
+    removed = pd.DataFrame({
+        "product_key": pd.Series(prev_keys[deleted]).map('{:016x}'.format),
+        "change": CHANGE_DELETED,
+    })
+    changes = pd.concat([changed, removed], ignore_index=True) if len(removed) else changed.reset_index(drop=True)
+    return changes, keys, values
+
+
+@METRICS.timed("cdc")
+def capture_changes(df: pd.DataFrame, index_path: str = DEFAULT_INDEX_PATH,
+                    update_index: bool = True) -> pd.DataFrame:
+    """Diff df terhadap run sebelumnya di index_path, lalu simpan index run ini."""
+    prev_keys, prev_values = load_index(index_path)
+    changes, keys, values = diff_snapshot(df, prev_keys, prev_values)
+    if update_index:
+        save_index(keys, values, index_path)
+
+    counts = changes["change"].value_counts()
+    for change in (CHANGE_INSERTED, CHANGE_UPDATED, CHANGE_DELETED):
+        METRICS.increment(f"cdc.{change}", int(counts.get(change, 0)))
+    METRICS.increment("cdc.rows", len(df))
+    logger.info(f"Changes since previous run: {counts.get(CHANGE_INSERTED, 0)} inserted, "
+                f"{counts.get(CHANGE_UPDATED, 0)} updated, {counts.get(CHANGE_DELETED, 0)} deleted")
+    return changes
@@ -0,0 +1,105 @@
+"""
+Module checkpoint crawl: jurnal SQLite berisi status dan hasil setiap halaman
+agar crawl yang terputus bisa dilanjutkan tanpa mengulang dari halaman 1
+"""
+
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOURNAL_PATH = os.path.join(".cache", "crawl.sqlite")
+
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+
+class CrawlJournal:
+    """
+    Jurnal crawl per halaman. Setiap halaman yang selesai langsung di-commit
+    bersama batch kolom produknya (di-pickle dan dikompres); halaman yang gagal
+    setelah retry dicatat dengan pesan error-nya.
+    """
+
+    def __init__(self, path: str = DEFAULT_JOURNAL_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS crawl_pages (
+                page INTEGER PRIMARY KEY,
+                status TEXT NOT NULL,
+                products BLOB,
+                error TEXT,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS crawl_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def _record(self, page: int, status: str, products: Optional[bytes], error: Optional[str]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO crawl_pages (page, status, products, error, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (page, status, products, error, time.time())
+            )
+            self._conn.commit()
+
+    def record_done(self, page: int, products: Dict[str, list]) -> None:
+        blob = zlib.compress(pickle.dumps(products, protocol=pickle.HIGHEST_PROTOCOL))
+        self._record(page, STATUS_DONE, blob, None)
+
+    def record_failed(self, page: int, error: str = "fetch failed") -> None:
+        self._record(page, STATUS_FAILED, None, error)
+
+    def completed(self, max_pages: Optional[int] = None) -> Dict[int, Dict[str, list]]:
+        """Halaman yang sudah selesai beserta produknya, urut nomor halaman."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT page, products FROM crawl_pages WHERE status = ? ORDER BY page", (STATUS_DONE,)
+            ).fetchall()
+        return {
+            page: pickle.loads(zlib.decompress(blob))
+            for page, blob in rows
+            if max_pages is None or page <= max_pages
+        }
+
+    def failed(self) -> Dict[int, str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT page, error FROM crawl_pages WHERE status = ? ORDER BY page", (STATUS_FAILED,)
+            ).fetchall()
+        return dict(rows)
+
+    def get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM crawl_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value) -> None:
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO crawl_meta (key, value) VALUES (?, ?)", (key, str(value)))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM crawl_pages")
+            self._conn.execute("DELETE FROM crawl_meta")
+            self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
@@ -3,24 +3,57 @@ Module untuk melakukan ekstraksi data dari website Fashion Studio
 """
 
 import logging
+import multiprocessing
+import random
+import re
+import threading
 import time
-from datetime import datetime
-from typing import Dict, List, Optional, Union
-
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import partial
+from itertools import chain, count, islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+import numpy as np
 import pandas as pd
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 
-# Konfigurasi logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from utils.archive import PageArchive, new_crawl_id
+from utils.cache import ParseCache, ResponseCache
+from utils.checkpoint import CrawlJournal
+from utils.metrics import METRICS
+from utils.plugins import PluginRegistry
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 logger = logging.getLogger(__name__)
 
 # URL target untuk scraping
 BASE_URL = "https://fashion-studio.dicoding.dev"
 
+# Batas default untuk mode concurrent
+DEFAULT_REQUESTS_PER_SECOND = 5.0
+DEFAULT_MAX_PER_HOST = 4
+
+# Batas default controller fetch adaptif
+DEFAULT_FAILURE_THRESHOLD = 5
+
+# Crawl tanpa jumlah halaman pasti berhenti setelah sekian halaman kosong/404 berturut-turut
+DEFAULT_EMPTY_PAGE_LIMIT = 2
+
+# Pagination situs: "Page 1 of 50" dan tautan /pageN
+PAGE_COUNT_PATTERN = re.compile(r"Page\s+\d+\s+of\s+(\d+)", re.IGNORECASE)
+PAGE_LINK_PATTERN = re.compile(r"""href=["'][^"']*/page(\d+)/?["']""")
+CARD_MARKER = "collection-card"
+
+# Worker parsing tidak di-fork dari proses yang thread fetch-nya sedang jalan:
+# lock (METRICS, logging) yang tersalin saat dipegang thread lain bisa membuat
+# worker deadlock. forkserver tidak tersedia di Windows, di sana memakai spawn.
+PARSE_POOL_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
 
 def create_session() -> requests.Session:
     try:
@@ -36,136 +69,791 @@ def create_session() -> requests.Session:
         raise
 
 
-def get_page_content(session: requests.Session, page: int = 1) -> Optional[str]:
+def page_url(page: int) -> str:
+    return BASE_URL if page == 1 else f"{BASE_URL}/page{page}"
+
+
+def discover_pages(html_content: str) -> Tuple[Optional[int], int]:
+    """
+    Baca pagination halaman pertama. Hasilnya (jumlah halaman pasti dari
+    "Page x of N" atau None, nomor halaman tertinggi yang ditautkan).
+    """
+    match = PAGE_COUNT_PATTERN.search(html_content)
+    total = int(match.group(1)) if match else None
+    linked = max((int(page) for page in PAGE_LINK_PATTERN.findall(html_content)), default=1)
+    return total, linked
+
+
+class RateLimiter:
+    """Membatasi jumlah request global per detik untuk semua worker."""
+
+    def __init__(self, requests_per_second: Optional[float]):
+        self.interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class HostLimiter:
+    """Membatasi jumlah request yang berjalan bersamaan per host."""
+
+    def __init__(self, max_per_host: int):
+        self.max_per_host = max_per_host
+        self._lock = threading.Lock()
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+
+    def get(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._semaphores[host]
+
+
+class AdaptiveRateLimiter(RateLimiter):
+    """
+    Rate limiter AIMD: rate naik sebesar increase setiap respons sehat, dan
+    dikali decrease saat error atau latency melonjak melewati latency_factor
+    kali rata-rata. requests_per_second=None berarti tanpa batas (pause tetap berlaku).
+
+    requests_per_second adalah batas kesopanan dari pemanggil, jadi secara
+    default juga menjadi batas atas adaptasi: AIMD hanya menurunkan rate dan
+    memulihkannya sampai batas itu. max_rate yang lebih tinggi harus diminta
+    secara eksplisit.
+    """
+
+    def __init__(self, requests_per_second: Optional[float] = DEFAULT_REQUESTS_PER_SECOND,
+                 min_rate: float = 0.5, max_rate: Optional[float] = None,
+                 increase: float = 0.5, decrease: float = 0.5, latency_factor: float = 2.0):
+        super().__init__(requests_per_second)
+        self.rate = requests_per_second
+        self.min_rate = min_rate
+        self.max_rate = max_rate or requests_per_second
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.latency: Optional[float] = None  # rata-rata bergerak (EWMA)
+
+    def _set_rate(self, rate: float) -> None:
+        self.rate = min(self.max_rate, max(self.min_rate, rate))
+        self.interval = 1.0 / self.rate
+        METRICS.set_gauge("extract.requests_per_second", self.rate)
+
+    def on_success(self, latency: float) -> None:
+        with self._lock:
+            slow = self.latency is not None and latency > self.latency * self.latency_factor
+            self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+            if self.rate is not None:
+                self._set_rate(self.rate * self.decrease if slow else self.rate + self.increase)
+
+    def on_error(self) -> None:
+        with self._lock:
+            if self.rate is not None:
+                self._set_rate(self.rate * self.decrease)
+
+    def pause(self, seconds: float) -> None:
+        """Tahan semua request berikutnya selama seconds (dipakai untuk Retry-After)."""
+        with self._lock:
+            self._next_slot = max(self._next_slot, time.monotonic() + seconds)
+
+
+class CircuitBreaker:
+    """
+    Terbuka setelah failure_threshold kegagalan berturut-turut. Selama terbuka
+    request ditolak; setelah reset_timeout satu request percobaan diizinkan.
+    """
+
+    def __init__(self, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                # Half-open: izinkan satu percobaan, buka lagi jika masih gagal
+                self.opened_at = None
+                self.failures = self.failure_threshold - 1
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold and self.opened_at is None:
+                self.opened_at = time.monotonic()
+                METRICS.increment("extract.circuit_open")
+                logger.error(f"Circuit breaker opened after {self.failures} consecutive failures")
+
+
+class FetchError(Exception):
+    """Fetch gagal; status dan retry_after diisi jika server membalas dengan error HTTP."""
+
+    def __init__(self, message: str, status: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        # 4xx selain 408/429 tidak akan berubah jika diulang
+        return self.status is None or self.status >= 500 or self.status in (408, 429)
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def get_page_content(session: requests.Session, page: int = 1,
+                     cache: Optional[ResponseCache] = None, raise_on_error: bool = False) -> Optional[str]:
     try:
-        url = BASE_URL if page == 1 else f"{BASE_URL}/page{page}"
+        url = page_url(page)
+        entry = cache.get(url) if cache else None
+        headers = cache.conditional_headers(entry) if cache else {}
+
         logger.info(f"Attempting to fetch: {url}")
-        response = session.get(url, timeout=10)
+        with METRICS.timer("extract.fetch"):
+            response = session.get(url, timeout=10, headers=headers)
+        METRICS.increment("extract.fetch.bytes", len(response.content))
+        if response.status_code == 304 and entry:
+            logger.info(f"Page {page} not modified, using cached copy")
+            METRICS.increment("extract.fetch.not_modified")
+            return cache.revalidated(url, entry)
+
         response.raise_for_status()
         logger.info(f"Successfully fetched page {page}, status code: {response.status_code}")
+        if cache:
+            cache.put(url, response.text, response.headers.get("ETag"), response.headers.get("Last-Modified"))
         return response.text
     except requests.RequestException as e:
         logger.error(f"Error fetching page {page}: {e}")
+        METRICS.increment("extract.fetch.errors")
+        if raise_on_error:
+            response = e.response
+            if response is None:
+                raise FetchError(str(e)) from e
+            raise FetchError(str(e), status=response.status_code,
+                             retry_after=parse_retry_after(response.headers.get("Retry-After"))) from e
         return None
 
 
-def parse_product_card(card) -> Dict[str, Union[str, float]]:
-    product = {}
-    product["timestamp"] = datetime.now().isoformat()
+# Urutan kolom hasil parsing satu kartu, dan kolom batch per halaman
+CARD_FIELDS = ("Title", "Rating", "Colors", "Size", "Gender", "Price")
+PRODUCT_FIELDS = ("timestamp",) + CARD_FIELDS
+BATCH_FIELDS = PRODUCT_FIELDS + ("page", "crawl_id")
+
+# Hasil parsing satu halaman dalam bentuk kolom: nama kolom -> list nilai
+Columns = Dict[str, list]
+
+
+def columns_from_rows(rows: List[Tuple]) -> Columns:
+    """Ubah tuple per kartu (urutan CARD_FIELDS) menjadi satu list per kolom."""
+    if not rows:
+        return {field: [] for field in CARD_FIELDS}
+    return {field: list(values) for field, values in zip(CARD_FIELDS, zip(*rows))}
+
+
+def parse_card_values(card) -> Tuple[str, ...]:
+    """Nilai satu kartu produk (BeautifulSoup) sesuai urutan CARD_FIELDS."""
+    title, price = "Unknown Product", "Price Unavailable"
+    rating, colors, size, gender = "Invalid Rating", "Unknown", "Unknown", "Unknown"
 
     try:
         product_details = card.select_one(".product-details")
         if product_details:
             title_element = product_details.select_one("h3")
-            product["Title"] = title_element.text.strip() if title_element else "Unknown Product"
-
-            product["Rating"] = "Invalid Rating"
-            product["Colors"] = "Unknown"
-            product["Size"] = "Unknown"
-            product["Gender"] = "Unknown"
+            if title_element:
+                title = title_element.text.strip()
 
             # Ambil semua <p> tag
-            info_elements = product_details.find_all("p")
-            for info in info_elements:
+            for info in product_details.find_all("p"):
                 info_text = info.text.strip()
                 if "Rating:" in info_text:
-                    product["Rating"] = info_text.split("Rating:")[-1].strip()
+                    rating = info_text.split("Rating:")[-1].strip()
                 elif "Color" in info_text:
-                    product["Colors"] = info_text
+                    colors = info_text
                 elif "Size:" in info_text:
-                    product["Size"] = info_text.split("Size:")[-1].strip()
+                    size = info_text.split("Size:")[-1].strip()
                 elif "Gender:" in info_text:
-                    product["Gender"] = info_text.split("Gender:")[-1].strip()
+                    gender = info_text.split("Gender:")[-1].strip()
 
             # Ambil harga dari .price-container .price
             price_element = card.select_one(".price-container .price")
             if price_element:
-                product["Price"] = price_element.text.strip()
-            else:
-                product["Price"] = "Price Unavailable"
-
+                price = price_element.text.strip()
         else:
             logger.warning("Could not find product-details.")
-            product["Title"] = "Unknown Product"
-            product["Price"] = "Price Unavailable"
-            product["Rating"] = "Invalid Rating"
-            product["Colors"] = "Unknown"
-            product["Size"] = "Unknown"
-            product["Gender"] = "Unknown"
 
     except Exception as e:
         logger.error(f"Error parsing product card: {e}")
-        product["Title"] = product.get("Title", "Unknown Product")
-        product["Price"] = product.get("Price", "Price Unavailable")
-        product["Rating"] = product.get("Rating", "Invalid Rating")
-        product["Colors"] = product.get("Colors", "Unknown")
-        product["Size"] = product.get("Size", "Unknown")
-        product["Gender"] = product.get("Gender", "Unknown")
 
-    return product
+    return title, rating, colors, size, gender, price
 
 
+def parse_product_card(card) -> Dict[str, Union[str, float]]:
+    return dict(zip(PRODUCT_FIELDS, (datetime.now().isoformat(),) + parse_card_values(card)))
 
-def extract_products_from_page(html_content: str) -> List[Dict[str, Union[str, float]]]:
-    try:
-        soup = BeautifulSoup(html_content, 'html.parser')
-        product_cards = soup.select(".collection-card")
-        logger.info(f"Found {len(product_cards)} product cards on page")
 
-        products = []
-        for card in product_cards:
-            product = parse_product_card(card)
-            products.append(product)
+def _extract_columns_bs4(html_content: str) -> Columns:
+    # BeautifulSoup baru di-import saat backend bs4 benar-benar dipakai
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html_content, 'html.parser')
+    return columns_from_rows([parse_card_values(card) for card in soup.select(".collection-card")])
+
+
+# Backend parser yang tersedia; BeautifulSoup selalu ada sebagai fallback.
+# Modul backend (dan library-nya) baru di-import saat backend itu dipilih.
+PARSER_BACKENDS = PluginRegistry(
+    {"bs4": f"{__name__}:_extract_columns_bs4", "lxml": "utils.parsers:extract_columns_lxml"},
+    requires={"lxml": "lxml"},
+)
+
+DEFAULT_PARSER_BACKEND = "lxml" if "lxml" in PARSER_BACKENDS else "bs4"
+
+
+def get_parser_backend(name: str) -> Callable[[str], Columns]:
+    if name not in PARSER_BACKENDS:
+        logger.warning(f"Parser backend '{name}' is not available, falling back to bs4")
+        return PARSER_BACKENDS["bs4"]
+    return PARSER_BACKENDS[name]
+
+
+def _columns_from_products(products: List[Dict[str, Union[str, float]]]) -> Columns:
+    # Format lama cache parse dan jurnal: list dict produk
+    return columns_from_rows([tuple(product.get(field) for field in CARD_FIELDS) for product in products])
+
+
+def _from_parse_cache(html_content: str, parse_cache: Optional[ParseCache]) -> Optional[Columns]:
+    cached = parse_cache.get(html_content) if parse_cache else None
+    if cached is None:
+        return None
+    if isinstance(cached, list):
+        cached = _columns_from_products(cached)
+
+    # Halaman tidak berubah: parsing dilewati, timestamp diisi saat batch halaman dibuat
+    logger.info(f"Parse cache hit, reused {len(cached['Title'])} products")
+    return cached
 
-        return products
-    except Exception as e:
-        logger.error(f"Error parsing HTML content: {e}")
-        return []
 
+def _to_parse_cache(html_content: str, columns: Columns, parse_cache: Optional[ParseCache]) -> None:
+    if parse_cache:
+        parse_cache.put(html_content, columns)
 
-def scrape_all_pages(max_pages: int = 50) -> pd.DataFrame:
-    all_products = []
-    session = create_session()
+
+@METRICS.timed("extract.parse")
+def extract_page_columns(html_content: str,
+                         parse_cache: Optional[ParseCache] = None,
+                         backend: str = DEFAULT_PARSER_BACKEND) -> Columns:
+    """Kartu produk satu halaman dalam bentuk kolom CARD_FIELDS, tanpa timestamp."""
+    cached = _from_parse_cache(html_content, parse_cache)
+    if cached is not None:
+        METRICS.increment("extract.parse.rows", len(cached["Title"]))
+        return cached
 
     try:
-        for page in range(1, max_pages + 1):
-            logger.info(f"Scraping page {page} of {max_pages}")
-            html_content = get_page_content(session, page)
+        columns = get_parser_backend(backend)(html_content)
+        logger.info(f"Found {len(columns['Title'])} product cards on page")
+        METRICS.increment("extract.parse.rows", len(columns["Title"]))
+        _to_parse_cache(html_content, columns, parse_cache)
+        return columns
+    except Exception as e:
+        logger.error(f"Error parsing HTML content: {e}")
+        return columns_from_rows([])
+
+
+def extract_products_from_page(html_content: str,
+                               parse_cache: Optional[ParseCache] = None,
+                               backend: str = DEFAULT_PARSER_BACKEND) -> List[Dict[str, Union[str, float]]]:
+    """Versi baris dari extract_page_columns: satu dict per produk, timestamp sama untuk satu halaman."""
+    columns = extract_page_columns(html_content, parse_cache, backend)
+    timestamp = datetime.now().isoformat()
+    return [dict(zip(PRODUCT_FIELDS, (timestamp,) + values))
+            for values in zip(*(columns[field] for field in CARD_FIELDS))]
+
+
+def make_page_batch(columns: Columns, page: int, crawl_id: Optional[str],
+                    timestamp: Optional[str] = None) -> Columns:
+    """
+    Batch kolom BATCH_FIELDS untuk satu halaman. Timestamp (default waktu
+    sekarang), nomor halaman, dan crawl ID sama untuk semua baris, jadi
+    cukup diisi dengan satu nilai yang diulang.
+    """
+    n = len(columns["Title"])
+    batch = {"timestamp": [timestamp or datetime.now().isoformat()] * n}
+    for field in CARD_FIELDS:
+        batch[field] = columns[field]
+    batch["page"] = [page] * n
+    batch["crawl_id"] = [crawl_id] * n
+    return batch
+
+
+def frame_from_batches(batches: Iterable[Columns]) -> pd.DataFrame:
+    """Satu DataFrame dari batch-batch halaman, disusun per kolom (bukan per baris dict)."""
+    batches = [batch for batch in batches if batch["Title"]]
+    if not batches:
+        return pd.DataFrame()
 
+    # Array kolom dialokasikan sekali dengan ukuran akhir lalu diisi per halaman,
+    # dan dipakai DataFrame tanpa disalin lagi
+    total = sum(len(batch["Title"]) for batch in batches)
+    columns = {field: np.empty(total, dtype=np.int64 if field == "page" else object) for field in BATCH_FIELDS}
+    start = 0
+    for batch in batches:
+        end = start + len(batch["Title"])
+        for field in BATCH_FIELDS:
+            columns[field][start:end] = batch[field]
+        start = end
+    return pd.DataFrame(columns, copy=False)
+
+
+class FetchController:
+    """
+    Menggabungkan rate limiter AIMD dan circuit breaker untuk satu crawl.
+    Satu instance dipakai bersama oleh semua worker.
+    """
+
+    def __init__(self, limiter: Optional[AdaptiveRateLimiter] = None, breaker: Optional[CircuitBreaker] = None,
+                 backoff_base: float = 0.5, max_backoff: float = 30.0):
+        self.limiter = limiter or AdaptiveRateLimiter()
+        self.breaker = breaker or CircuitBreaker()
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+
+    def backoff(self, attempt: int) -> float:
+        # Backoff eksponensial dengan jitter agar worker tidak retry bersamaan
+        delay = min(self.max_backoff, self.backoff_base * 2 ** attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def fetch(self, session: requests.Session, page: int, cache: Optional[ResponseCache] = None) -> str:
+        """Satu percobaan fetch; melempar FetchError jika gagal atau CircuitOpenError jika situs dianggap mati."""
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"Circuit breaker open, skipping page {page}")
+
+        self.limiter.acquire()
+        start = time.monotonic()
+        try:
+            html_content = get_page_content(session, page, cache=cache, raise_on_error=True)
             if not html_content:
-                logger.warning(f"Failed to get content from page {page}")
-                for retry in range(3):
-                    logger.info(f"Retrying page {page} (attempt {retry+1}/3)")
-                    time.sleep(2)
-                    html_content = get_page_content(session, page)
-                    if html_content:
-                        break
-
-                if not html_content:
-                    logger.error(f"Failed to get content from page {page} after retries")
-                    continue
-
-            if page == 1:
-                with open(f"debug_page_{page}.html", "w", encoding="utf-8") as f:
-                    f.write(html_content)
-
-            products = extract_products_from_page(html_content)
-            all_products.extend(products)
-            logger.info(f"Found {len(products)} products on page {page}")
-            time.sleep(1)
+                raise FetchError(f"Empty response for page {page}")
+        except FetchError as e:
+            if e.retryable:
+                self.limiter.on_error()
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            if e.retry_after is not None:
+                logger.warning(f"Server asked to wait {e.retry_after:.1f}s before retrying")
+                self.limiter.pause(e.retry_after)
+            raise
+
+        self.limiter.on_success(time.monotonic() - start)
+        self.breaker.record_success()
+        return html_content
+
+
+def fetch_page_with_retry(session: requests.Session, page: int, retries: int = 3,
+                          cache: Optional[ResponseCache] = None,
+                          controller: Optional[FetchController] = None) -> Optional[str]:
+    controller = controller or FetchController()
+
+    for attempt in range(retries + 1):
+        if attempt:
+            logger.info(f"Retrying page {page} (attempt {attempt}/{retries})")
+            METRICS.increment("extract.fetch.retries")
+        try:
+            return controller.fetch(session, page, cache)
+        except FetchError as e:
+            logger.warning(f"Failed to get content from page {page}: {e}")
+            if not e.retryable:
+                return None
+            # Jeda Retry-After sudah ditangani limiter.pause() pada acquire berikutnya
+            if attempt < retries and e.retry_after is None:
+                time.sleep(controller.backoff(attempt))
+
+    logger.error(f"Failed to get content from page {page} after retries")
+    return None
+
+
+def _fetch_limited(session: requests.Session, page: int, controller: FetchController,
+                   host_limiter: HostLimiter, cache: Optional[ResponseCache]) -> Optional[str]:
+    with host_limiter.get(page_url(page)):
+        return fetch_page_with_retry(session, page, cache=cache, controller=controller)
+
+
+ParseFunc = Callable[[str], Columns]
+
+
+def _write_debug_page(page: int, html_content: str) -> None:
+    if page == 1:
+        with open(f"debug_page_{page}.html", "w", encoding="utf-8") as f:
+            f.write(html_content)
+
+
+def _handle_page(page: int, html_content: Optional[str],
+                 parse: ParseFunc = extract_page_columns) -> Columns:
+    if not html_content:
+        return columns_from_rows([])
+
+    _write_debug_page(page, html_content)
+    columns = parse(html_content)
+    logger.info(f"Found {len(columns['Title'])} products on page {page}")
+    return columns
+
+
+# Iterator fetch menghasilkan (page, html); html None berarti halaman gagal setelah retry atau 404
+def _iter_serial(session: requests.Session, pages: Iterable[int], last_page: Optional[int],
+                 controller: FetchController,
+                 cache: Optional[ResponseCache]) -> Iterator[Tuple[int, Optional[str]]]:
+    # Jeda antar halaman diatur oleh rate limiter adaptif di controller
+    for page in pages:
+        logger.info(f"Scraping page {page} of {last_page or '?'}")
+        yield page, fetch_page_with_retry(session, page, cache=cache, controller=controller)
+
+
+def _iter_concurrent(session: requests.Session, pages: Iterable[int], concurrency: int,
+                     controller: FetchController, max_per_host: int,
+                     cache: Optional[ResponseCache]) -> Iterator[Tuple[int, Optional[str]]]:
+    # Session yang dipakai ulang antar run (mode daemon) sudah punya pool yang cukup;
+    # memasang adapter baru akan membuang koneksi keep-alive-nya
+    if getattr(session.get_adapter(BASE_URL), "_pool_maxsize", 0) < concurrency:
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+    host_limiter = HostLimiter(max_per_host)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        # Jumlah halaman yang sedang diproses dibatasi agar memori tetap kecil
+        pending = deque()
+        pages = iter(pages)
+        for page in islice(pages, concurrency * 2):
+            pending.append((page, executor.submit(_fetch_limited, session, page, controller, host_limiter, cache)))
+
+        # Hasil diproses sesuai urutan halaman, bukan urutan selesai
+        while pending:
+            page, future = pending.popleft()
+            for next_page in islice(pages, 1):
+                pending.append((next_page, executor.submit(
+                    _fetch_limited, session, next_page, controller, host_limiter, cache)))
+            yield page, future.result()
+
+
+def _until_end_of_catalog(fetched: Iterable[Tuple[int, Optional[str]]], known_pages: int,
+                          limit: int = DEFAULT_EMPTY_PAGE_LIMIT) -> Iterator[Tuple[int, Optional[str]]]:
+    # Halaman kosong/404 ditahan dulu: jika berturut-turut sampai limit, itu akhir katalog
+    # dan tidak diteruskan (tidak dicatat gagal); jika masih ada halaman berisi, diteruskan
+    streak = []
+    for page, html_content in fetched:
+        if page <= known_pages or (html_content and CARD_MARKER in html_content):
+            yield from streak
+            streak.clear()
+            yield page, html_content
+            continue
+
+        streak.append((page, html_content))
+        if len(streak) >= limit:
+            logger.info(f"End of catalog detected after page {streak[0][0] - 1}")
+            return
+    yield from streak
+
+
+def _skip_failed(fetched: Iterable[Tuple[int, Optional[str]]],
+                 journal: Optional[CrawlJournal]) -> Iterator[Tuple[int, str]]:
+    for page, html_content in fetched:
+        if html_content:
+            yield page, html_content
+        elif journal:
+            journal.record_failed(page)
+
+
+def _archive_fetched(fetched: Iterable[Tuple[int, str]], archive: Optional[PageArchive],
+                     crawl_id: str) -> Iterator[Tuple[int, str]]:
+    for page, html_content in fetched:
+        if archive:
+            archive.append(crawl_id, page, html_content)
+        yield page, html_content
+
+
+def _merge_journaled(batches: Iterable[Tuple[int, Columns]],
+                     completed: Dict[int, Columns]) -> Iterator[Tuple[int, Columns]]:
+    # Gabungkan halaman dari jurnal dengan halaman baru tanpa merusak urutan
+    done = deque(sorted(completed.items()))
+    for page, batch in batches:
+        while done and done[0][0] < page:
+            yield done.popleft()
+        yield page, batch
+    yield from done
+
+
+def _journaled_batch(entry: Union[Columns, List[Dict]], page: int, crawl_id: str) -> Columns:
+    # Jurnal dari versi lama menyimpan list dict produk, bukan batch kolom
+    if isinstance(entry, dict):
+        return entry
+    timestamp = entry[0].get("timestamp") if entry else None
+    return make_page_batch(_columns_from_products(entry), page, crawl_id, timestamp)
+
+
+def _parse_pages_to_columns(htmls: List[str], backend: str) -> List[Columns]:
+    # Dijalankan di worker process: kolom berisi string saja, jadi pickle kecil
+    return [extract_page_columns(html_content, backend=backend) for html_content in htmls]
+
+
+def parse_pages_in_processes(pages: Iterable[Tuple[int, str]], workers: int, chunksize: int = 1,
+                             backend: str = DEFAULT_PARSER_BACKEND,
+                             parse_cache: Optional[ParseCache] = None) -> Iterator[Tuple[int, Columns]]:
+    """
+    Parse (page, html) di ProcessPoolExecutor, chunksize halaman per task,
+    dan kembalikan hasilnya sesuai urutan input.
+    """
+    with ProcessPoolExecutor(max_workers=workers,
+                             mp_context=multiprocessing.get_context(PARSE_POOL_START_METHOD)) as executor:
+        pending = deque()
+        chunk: List[Tuple[int, str]] = []
+
+        def flush():
+            if chunk:
+                htmls = [html_content for _, html_content in chunk]
+                pending.append((list(chunk), executor.submit(_parse_pages_to_columns, htmls, backend), False))
+                chunk.clear()
+
+        def drain(limit):
+            while len(pending) > limit:
+                items, future, from_cache = pending.popleft()
+                for (page, html_content), columns in zip(items, future.result()):
+                    if not from_cache:
+                        _to_parse_cache(html_content, columns, parse_cache)
+                    logger.info(f"Found {len(columns['Title'])} products on page {page}")
+                    yield page, columns
+
+        for page, html_content in pages:
+            _write_debug_page(page, html_content)
+            cached = _from_parse_cache(html_content, parse_cache)
+            if cached is not None:
+                # Urutan tetap dijaga: chunk sebelumnya dikirim dulu
+                flush()
+                done = Future()
+                done.set_result([cached])
+                pending.append(([(page, html_content)], done, True))
+            else:
+                chunk.append((page, html_content))
+                if len(chunk) >= chunksize:
+                    flush()
+            yield from drain(workers * 2)
+
+        flush()
+        yield from drain(0)
+
+
+def _parse_fetched(fetched: Iterable[Tuple[int, str]], parse_cache: Optional[ParseCache],
+                   parser_backend: str, parse_workers: int, parse_chunksize: int) -> Iterator[Tuple[int, Columns]]:
+    if parse_workers > 1:
+        logger.info(f"Parsing pages with {parse_workers} worker processes")
+        return parse_pages_in_processes(fetched, parse_workers, parse_chunksize, parser_backend, parse_cache)
+    parse = partial(extract_page_columns, parse_cache=parse_cache, backend=parser_backend)
+    return ((page, _handle_page(page, html_content, parse)) for page, html_content in fetched)
+
+
+def iter_pages(max_pages: Optional[int] = 50, concurrency: int = 1,
+               requests_per_second: Optional[float] = DEFAULT_REQUESTS_PER_SECOND,
+               max_per_host: int = DEFAULT_MAX_PER_HOST,
+               cache: Optional[ResponseCache] = None,
+               parse_cache: Optional[ParseCache] = None,
+               parser_backend: str = DEFAULT_PARSER_BACKEND,
+               parse_workers: int = 0, parse_chunksize: int = 1,
+               journal: Optional[CrawlJournal] = None,
+               resume: bool = False,
+               controller: Optional[FetchController] = None,
+               session: Optional[requests.Session] = None,
+               archive: Optional[PageArchive] = None) -> Iterator[Tuple[int, Columns]]:
+    """
+    Hasilkan (page, batch) sesuai urutan halaman; batch berisi kolom
+    BATCH_FIELDS (lihat make_page_batch). Dengan journal, setiap
+    halaman dicatat begitu selesai; resume=True hanya mengambil ulang halaman
+    yang belum ada atau gagal, sisanya dibaca dari jurnal. Crawl berhenti
+    dengan CircuitOpenError jika circuit breaker controller terbuka.
+    Session dari pemanggil dipakai apa adanya dan tidak ditutup. Dengan
+    archive, HTML setiap halaman yang berhasil di-fetch ikut diarsipkan
+    dengan crawl ID yang sama.
+    """
+    controller = controller or FetchController(AdaptiveRateLimiter(requests_per_second))
+    completed: Dict[int, Columns] = {}
+    total = crawl_id = None
+    if journal and resume:
+        crawl_id = journal.get_meta("crawl_id")
+        total = journal.get_meta("page_count")
+        total = int(total) if total else None
+    elif journal:
+        journal.clear()
+    crawl_id = crawl_id or new_crawl_id()
+    if journal:
+        journal.set_meta("crawl_id", crawl_id)
+        if resume:
+            completed = {page: _journaled_batch(entry, page, crawl_id)
+                         for page, entry in journal.completed(max_pages).items()}
+            logger.info(f"Resuming crawl {crawl_id}: {len(completed)} pages already in journal")
+
+    own_session = session is None
+    session = session or create_session()
+    try:
+        # Halaman 1 diambil lebih dulu agar jumlah halaman dari pagination menentukan jadwal fetch
+        first = []
+        linked = 1
+        if total is None and 1 not in completed:
+            html_content = fetch_page_with_retry(session, 1, cache=cache, controller=controller)
+            first = [(1, html_content)]
+            if html_content:
+                total, linked = discover_pages(html_content)
+            if total and journal:
+                journal.set_meta("page_count", total)
+
+        limits = [limit for limit in (total, max_pages) if limit]
+        last_page = min(limits) if limits else None
+        if total:
+            logger.info(f"Catalog has {total} pages")
+            if max_pages and total > max_pages:
+                logger.warning(f"Only scraping the first {max_pages} of {total} pages")
+        # Halaman 1 tetap dijadwalkan jika jumlah halaman sudah ada di jurnal tapi halaman 1 belum selesai
+        start = 2 if first else 1
+        todo = (page for page in (range(start, last_page + 1) if last_page else count(start))
+                if page not in completed)
+
+        if concurrency > 1:
+            logger.info(f"Scraping up to {last_page or 'unknown number of'} pages with {concurrency} workers")
+            fetched = _iter_concurrent(session, todo, concurrency, controller, max_per_host, cache)
+        else:
+            fetched = _iter_serial(session, todo, last_page, controller, cache)
+        fetched = chain(first, fetched)
+        if total is None:
+            # Jumlah halaman tidak diketahui: berhenti di akhir katalog yang terdeteksi
+            fetched = _until_end_of_catalog(fetched, linked)
+        fetched = _skip_failed(fetched, journal)
+        if archive:
+            logger.info(f"Archiving raw pages to {archive.path} as crawl {crawl_id}")
+            fetched = _archive_fetched(fetched, archive, crawl_id)
+
+        parsed = _parse_fetched(fetched, parse_cache, parser_backend, parse_workers, parse_chunksize)
+        batches = ((page, make_page_batch(columns, page, crawl_id)) for page, columns in parsed)
+        for page, batch in _merge_journaled(batches, completed):
+            if journal and page not in completed:
+                journal.record_done(page, batch)
+            yield page, batch
+    finally:
+        if own_session:
+            session.close()
+        if cache:
+            logger.info(f"Response cache: {cache.hits} hits (304), {cache.misses} full downloads")
+        if parse_cache:
+            logger.info(f"Parse cache: {parse_cache.hits} hits, {parse_cache.misses} misses")
+        if journal and journal.failed():
+            logger.warning(f"Pages {sorted(journal.failed())} failed, they will be refetched on resume")
+
+
+def iter_page_batches(max_pages: Optional[int] = 50, concurrency: int = 1,
+                      requests_per_second: Optional[float] = DEFAULT_REQUESTS_PER_SECOND,
+                      max_per_host: int = DEFAULT_MAX_PER_HOST,
+                      cache: Optional[ResponseCache] = None,
+                      parse_cache: Optional[ParseCache] = None,
+                      parser_backend: str = DEFAULT_PARSER_BACKEND,
+                      parse_workers: int = 0, parse_chunksize: int = 1,
+                      journal: Optional[CrawlJournal] = None, resume: bool = False,
+                      controller: Optional[FetchController] = None,
+                      session: Optional[requests.Session] = None,
+                      archive: Optional[PageArchive] = None) -> Iterator[pd.DataFrame]:
+    """Menghasilkan satu DataFrame per halaman, sesuai urutan halaman."""
+    for _, batch in iter_pages(max_pages, concurrency, requests_per_second, max_per_host,
+                               cache, parse_cache, parser_backend, parse_workers, parse_chunksize,
+                               journal, resume, controller, session, archive):
+        if batch["Title"]:
+            yield pd.DataFrame(batch)
+
+
+def scrape_all_pages(max_pages: Optional[int] = 50, concurrency: int = 1,
+                     requests_per_second: Optional[float] = DEFAULT_REQUESTS_PER_SECOND,
+                     max_per_host: int = DEFAULT_MAX_PER_HOST,
+                     cache: Optional[ResponseCache] = None,
+                     parse_cache: Optional[ParseCache] = None,
+                     parser_backend: str = DEFAULT_PARSER_BACKEND,
+                     parse_workers: int = 0, parse_chunksize: int = 1,
+                     journal: Optional[CrawlJournal] = None, resume: bool = False,
+                     controller: Optional[FetchController] = None,
+                     session: Optional[requests.Session] = None,
+                     archive: Optional[PageArchive] = None) -> pd.DataFrame:
+    batches = []
 
+    try:
+        for _, batch in iter_pages(max_pages, concurrency, requests_per_second, max_per_host,
+                                   cache, parse_cache, parser_backend, parse_workers, parse_chunksize,
+                                   journal, resume, controller, session, archive):
+            batches.append(batch)
     except Exception as e:
         logger.error(f"Error scraping all pages: {e}")
-    finally:
-        session.close()
 
-    if all_products:
-        df = pd.DataFrame(all_products)
+    df = frame_from_batches(batches)
+    if len(df):
         logger.info(f"Total products scraped: {len(df)}")
-        return df
     else:
         logger.warning("No products were scraped!")
-        return pd.DataFrame()
+    return df
+
+
+def replay_pages(archive: PageArchive, crawl_id: Optional[str] = None,
+                 parser_backend: str = DEFAULT_PARSER_BACKEND,
+                 parse_workers: int = 0, parse_chunksize: int = 1) -> Iterator[Tuple[int, Columns]]:
+    """
+    Parse ulang halaman dari arsip (default crawl terbaru) tanpa jaringan,
+    lewat jalur parsing yang sama dengan crawl biasa. Batch memakai crawl ID
+    arsip dan waktu fetch asli setiap halaman sebagai timestamp. Parse cache
+    sengaja tidak dipakai: kuncinya hanya hash HTML, jadi setelah parser
+    berubah cache akan mengembalikan hasil parser lama.
+    """
+    crawl_id = crawl_id or archive.latest_crawl()
+    if crawl_id is None:
+        logger.warning(f"Archive {archive.path} is empty")
+        return
+    logger.info(f"Replaying crawl {crawl_id} from {archive.path}")
+    fetched_at = archive.fetch_times(crawl_id)
+    for page, columns in _parse_fetched(archive.iter_pages(crawl_id), None, parser_backend,
+                                        parse_workers, parse_chunksize):
+        yield page, make_page_batch(columns, page, crawl_id, datetime.fromtimestamp(fetched_at[page]).isoformat())
+
+
+def replay_all_pages(archive: PageArchive, crawl_id: Optional[str] = None,
+                     parser_backend: str = DEFAULT_PARSER_BACKEND,
+                     parse_workers: int = 0, parse_chunksize: int = 1) -> pd.DataFrame:
+    """Versi replay dari scrape_all_pages: satu DataFrame untuk seluruh crawl di arsip."""
+    df = frame_from_batches(batch for _, batch in replay_pages(archive, crawl_id, parser_backend,
+                                                                parse_workers, parse_chunksize))
+    logger.info(f"Total products replayed: {len(df)}")
+    return df
 
 
 def main():
@@ -180,4 +868,5 @@ def main():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
     main()
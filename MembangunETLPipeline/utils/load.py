@@ -1,15 +1,107 @@
 import pandas as pd
+import io
 import os
 import logging
-import gspread
-from gspread_dataframe import set_with_dataframe
-from google.oauth2.service_account import Credentials
-import psycopg2
+import random
+import time
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+import numpy as np
+from utils.metrics import METRICS
+from utils.plugins import LazyImports
+from utils.transform import product_keys, standard_dtypes
+
+if TYPE_CHECKING:
+    import gspread
+
+# Library sink di-import di dalam fungsi sink-nya; run yang hanya menulis CSV
+# tidak perlu memuat gspread, google-auth, psycopg2, atau pyarrow.
+# utils.load.gspread/psycopg2/Credentials tetap bisa diakses (dan di-patch test) lewat __getattr__.
+__getattr__ = LazyImports(__name__, {
+    "gspread": "gspread",
+    "Credentials": "google.oauth2.service_account:Credentials",
+    "psycopg2": "psycopg2",
+})
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def load_to_csv(df: pd.DataFrame, output_path: str = "products.csv", raise_on_error=False):
+# Urutan kolom DataFrame dan kolom tabel products harus sama
+PRODUCT_COLUMNS = ["Title", "Price", "Rating", "Colors", "Size", "Gender", "timestamp", "product_key"]
+TABLE_COLUMNS = "title, price, rating, colors, size, gender, timestamp, product_key"
+DEFAULT_CHUNK_SIZE = 10000
+
+# Google Sheets: jumlah baris per request batch_update dan status yang layak di-retry
+DEFAULT_GSHEET_CHUNK_ROWS = 1000
+GSHEET_RETRY_STATUS = (429, 500, 503)
+# Kolom yang berubah di setiap crawl meski produknya sama; tidak dipakai saat mencari baris yang berubah
+GSHEET_VOLATILE_COLUMNS = ("timestamp", "page", "crawl_id")
+GSHEET_SCOPES = [
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive"
+]
+
+# Tipe kolom numerik hasil transform_data yang disimpan di schema Parquet/Arrow
+ARROW_NUMERIC_TYPES = {
+    "Price": "float64",
+    "Rating": "float64",
+    "Colors": "int64",
+}
+
+CREATE_PRODUCTS_SQL = """
+    CREATE TABLE IF NOT EXISTS products (
+        id SERIAL PRIMARY KEY,
+        title TEXT,
+        price FLOAT,
+        rating FLOAT,
+        colors INTEGER,
+        size TEXT,
+        gender TEXT,
+        timestamp TEXT,
+        product_key TEXT
+    );
+    ALTER TABLE products ADD COLUMN IF NOT EXISTS product_key TEXT;
+    CREATE UNIQUE INDEX IF NOT EXISTS products_product_key_idx ON products (product_key);
+"""
+
+STAGE_COLUMNS_SQL = """(
+        title TEXT,
+        price FLOAT,
+        rating FLOAT,
+        colors INTEGER,
+        size TEXT,
+        gender TEXT,
+        timestamp TEXT,
+        product_key TEXT
+    )"""
+# Stage table hidup selama koneksi agar statement upsert bisa di-PREPARE sekali
+CREATE_SESSION_STAGE_SQL = f"CREATE TEMP TABLE IF NOT EXISTS products_stage {STAGE_COLUMNS_SQL}"
+
+# Hanya baris baru atau yang harga/rating-nya berubah yang ditulis ulang
+UPSERT_SQL = f"""
+    WITH upserted AS (
+        INSERT INTO products ({TABLE_COLUMNS})
+        SELECT {TABLE_COLUMNS} FROM products_stage
+        ON CONFLICT (product_key) DO UPDATE SET
+            price = EXCLUDED.price,
+            rating = EXCLUDED.rating,
+            timestamp = EXCLUDED.timestamp
+        WHERE (products.price, products.rating) IS DISTINCT FROM (EXCLUDED.price, EXCLUDED.rating)
+        RETURNING (xmax = 0) AS inserted
+    )
+    SELECT COUNT(*) FILTER (WHERE inserted), COUNT(*) FILTER (WHERE NOT inserted) FROM upserted
+"""
+PREPARE_UPSERT_SQL = f"PREPARE products_upsert AS {UPSERT_SQL}"
+
+# Load snapshot: produk yang tidak ada lagi di batch (hilang dari katalog) dihapus
+DELETE_MISSING_SQL = """
+    DELETE FROM products
+    WHERE NOT EXISTS (SELECT 1 FROM products_stage WHERE products_stage.product_key = products.product_key)
+"""
+
+@METRICS.timed("load.csv")
+def load_to_csv(df: pd.DataFrame, output_path: str = "products.csv", raise_on_error=False, append=False):
     if not isinstance(df, pd.DataFrame):
         logger.error("Gagal menyimpan data: Input harus berupa pandas DataFrame.")
         if raise_on_error:
@@ -17,7 +109,13 @@ def load_to_csv(df: pd.DataFrame, output_path: str = "products.csv", raise_on_er
         return False
 
     try:
-        df.to_csv(output_path, index=False)
+        df = standard_dtypes(df)
+        if append and os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+            # Mode streaming: tambahkan batch tanpa menulis header lagi
+            df.to_csv(output_path, mode="a", header=False, index=False)
+        else:
+            df.to_csv(output_path, index=False)
+        METRICS.increment("load.csv.rows", len(df))
         logger.info(f"Data berhasil disimpan ke {output_path}")
         logger.info(f"Kolom yang disimpan: {list(df.columns)}")
         return True
@@ -27,24 +125,88 @@ def load_to_csv(df: pd.DataFrame, output_path: str = "products.csv", raise_on_er
             raise
         return False
 
-def load_to_gsheet(df: pd.DataFrame, sheet_name: str, json_keyfile: str):
+def _pyarrow():
+    # pyarrow opsional, hanya dibutuhkan untuk Parquet/Arrow
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("pyarrow belum terpasang, jalankan: pip install pyarrow") from None
+    return pa, pq
+
+def _to_arrow_table(df: pd.DataFrame):
+    pa, _ = _pyarrow()
+    table = pa.Table.from_pandas(standard_dtypes(df), preserve_index=False)
+    # Kolom yang sudah numerik (data bersih) disamakan dengan dtype dari transform_data;
+    # data mentah yang masih berupa string dibiarkan apa adanya
+    fields = []
+    for field in table.schema:
+        target = ARROW_NUMERIC_TYPES.get(field.name)
+        if target and (pa.types.is_integer(field.type) or pa.types.is_floating(field.type)):
+            field = field.with_type(pa.type_for_alias(target))
+        fields.append(field)
+    return table.cast(pa.schema(fields, metadata=table.schema.metadata))
+
+@METRICS.timed("load.parquet")
+def load_to_parquet(df: pd.DataFrame, output_path: str = "products.parquet", raise_on_error=False):
+    if not isinstance(df, pd.DataFrame):
+        logger.error("Gagal menyimpan data: Input harus berupa pandas DataFrame.")
+        if raise_on_error:
+            raise ValueError("Input harus berupa pandas DataFrame.")
+        return False
+
+    try:
+        pa, pq = _pyarrow()
+        table = _to_arrow_table(df)
+        if output_path.endswith((".arrow", ".feather")):
+            # Format Arrow IPC bisa dibaca lewat memory-map tanpa dekompresi
+            with pa.OSFile(output_path, "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+        else:
+            pq.write_table(table, output_path)
+        METRICS.increment("load.parquet.rows", len(df))
+        logger.info(f"Data berhasil disimpan ke {output_path}")
+        return True
+    except Exception as e:
+        logger.error(f"Gagal menyimpan data: {e}")
+        if raise_on_error:
+            raise
+        return False
+
+def read_intermediate(path: str) -> pd.DataFrame:
+    """Baca file antar-tahap (.csv, .parquet, .arrow/.feather) kembali menjadi DataFrame."""
+    if not path.endswith((".parquet", ".arrow", ".feather")):
+        return pd.read_csv(path)
+    pa, pq = _pyarrow()
+    if path.endswith(".parquet"):
+        return pq.read_table(path, memory_map=True).to_pandas()
+    with pa.memory_map(path, "r") as source:
+        return pa.ipc.open_file(source).read_all().to_pandas()
+
+def write_intermediate(df: pd.DataFrame, path: str) -> bool:
+    """Tulis file antar-tahap; format ditentukan dari ekstensi path."""
+    if path.endswith((".parquet", ".arrow", ".feather")):
+        return load_to_parquet(df, output_path=path, raise_on_error=True)
+    return load_to_csv(df, output_path=path, raise_on_error=True)
+
+@METRICS.timed("load.gsheet")
+def load_to_gsheet(df: pd.DataFrame, sheet_name: str, json_keyfile: str, client=None):
     if not isinstance(df, pd.DataFrame):
         logger.error("Gagal menyimpan ke Google Sheets: Input bukan DataFrame")
         return None
 
     try:
-        scope = [
-            "https://www.googleapis.com/auth/spreadsheets",
-            "https://www.googleapis.com/auth/drive"
-        ]
-        credentials = Credentials.from_service_account_file(json_keyfile, scopes=scope)
-        client = gspread.authorize(credentials)
+        from gspread_dataframe import set_with_dataframe
+        df = standard_dtypes(df)
+        client = client or gsheet_client(json_keyfile)
 
         spreadsheet = client.create(sheet_name)
         spreadsheet.share(None, perm_type='anyone', role='writer')
 
         worksheet = spreadsheet.sheet1
         set_with_dataframe(worksheet, df)
+        METRICS.increment("load.gsheet.rows", len(df))
 
         logger.info(f"Data berhasil disimpan ke Google Sheets: {spreadsheet.url}")
         return spreadsheet.url
@@ -52,85 +214,371 @@ def load_to_gsheet(df: pd.DataFrame, sheet_name: str, json_keyfile: str):
         logger.error(f"Gagal menyimpan ke Google Sheets: {e}")
         return None
 
-def load_to_postgresql(df: pd.DataFrame, db_name: str, user: str, password: str, host: str, port: str):
+def gsheet_client(json_keyfile: str) -> "gspread.Client":
+    """Client gspread yang sudah diotorisasi; bisa dipakai ulang lewat argumen client."""
+    import gspread
+    from google.oauth2.service_account import Credentials
+    credentials = Credentials.from_service_account_file(json_keyfile, scopes=GSHEET_SCOPES)
+    return gspread.authorize(credentials)
+
+def _gsheet_call(func, *args, retries: int = 5, backoff: float = 1.0, **kwargs):
+    # Error kuota (429) dan gangguan sementara diulang dengan backoff eksponensial + jitter
+    import gspread
+    for attempt in range(retries + 1):
+        try:
+            METRICS.increment("load.gsheet.requests")
+            return func(*args, **kwargs)
+        except gspread.exceptions.APIError as e:
+            if e.code not in GSHEET_RETRY_STATUS or attempt == retries:
+                raise
+            delay = backoff * 2 ** attempt + random.uniform(0, backoff)
+            logger.warning(f"Google Sheets membalas {e.code}, coba lagi dalam {delay:.1f} detik")
+            METRICS.increment("load.gsheet.retries")
+            time.sleep(delay)
+
+def _cell_value(value):
+    # Nilai yang aman dikirim sebagai JSON; angka tetap angka agar bisa dibandingkan
+    if value is None or (isinstance(value, float) and np.isnan(value)) or value is pd.NaT:
+        return ""
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    if isinstance(value, (int, float, str)):
+        return value
+    return str(value)
+
+def _canonical_row(row, width: int, ignore=()) -> list:
+    # Sheets mengembalikan 1600000.0 sebagai 1600000, jadi angka dibandingkan sebagai float
+    cells = [float(v) if isinstance(v, (int, float)) and not isinstance(v, bool) else str(v) for v in row]
+    cells += [""] * (width - len(cells))
+    for i in ignore:
+        cells[i] = ""
+    return cells
+
+def _changed_blocks(current: list, values: list, width: int, ignore=()):
+    """
+    Blok baris berurutan (index awal, baris) yang berbeda dari isi sheet saat
+    ini. Kolom di posisi ignore tidak ikut dibandingkan, kecuali di header.
+    """
+    start = None
+    for i, row in enumerate(values):
+        old = current[i] if i < len(current) else []
+        skip = ignore if i else ()
+        if _canonical_row(old, width, skip) != _canonical_row(row, width, skip):
+            start = i if start is None else start
+        elif start is not None:
+            yield start, values[start:i]
+            start = None
+    if start is not None:
+        yield start, values[start:]
+
+def _a1_range(first_row: int, last_row: int, width: int) -> str:
+    from gspread.utils import rowcol_to_a1
+    return f"{rowcol_to_a1(first_row, 1)}:{rowcol_to_a1(last_row, width)}"
+
+@METRICS.timed("load.gsheet")
+def sync_to_gsheet(df: pd.DataFrame, spreadsheet_key: str, json_keyfile: str, worksheet_name: str = None,
+                   chunk_size: int = DEFAULT_GSHEET_CHUNK_ROWS, retries: int = 5, backoff: float = 1.0,
+                   client=None):
+    """
+    Tulis df ke spreadsheet yang sudah ada (dibuka dengan key). Isi sheet
+    dibaca sekali, lalu hanya blok baris yang berubah yang dikirim lewat
+    batch_update, maksimal chunk_size baris per request. Baris lama di luar
+    panjang df dikosongkan. Kolom GSHEET_VOLATILE_COLUMNS (timestamp crawl)
+    tidak membuat baris dianggap berubah; nilainya ikut terkirim hanya jika
+    kolom lain di baris itu berubah. Mengembalikan dict statistik, atau None jika gagal.
+    client dari gsheet_client() bisa dipakai ulang agar tidak diotorisasi setiap run.
+    """
+    if not isinstance(df, pd.DataFrame):
+        logger.error("Gagal menyimpan ke Google Sheets: Input bukan DataFrame")
+        return None
+
+    try:
+        from gspread.utils import ValueInputOption, ValueRenderOption
+        df = standard_dtypes(df)
+        client = client or gsheet_client(json_keyfile)
+        spreadsheet = _gsheet_call(client.open_by_key, spreadsheet_key, retries=retries, backoff=backoff)
+        worksheet = spreadsheet.worksheet(worksheet_name) if worksheet_name else spreadsheet.sheet1
+
+        current = _gsheet_call(worksheet.get_all_values, value_render_option=ValueRenderOption.unformatted,
+                               retries=retries, backoff=backoff)
+        values = [list(df.columns)] + [[_cell_value(v) for v in row] for row in df.itertuples(index=False)]
+        width = max([len(df.columns)] + [len(row) for row in current])
+        values = [row + [""] * (width - len(row)) for row in values]
+
+        if worksheet.row_count < len(values) or worksheet.col_count < width:
+            _gsheet_call(worksheet.resize, rows=max(worksheet.row_count, len(values)),
+                         cols=max(worksheet.col_count, width), retries=retries, backoff=backoff)
+
+        batch, batch_rows, changed = [], 0, 0
+        volatile = [i for i, col in enumerate(df.columns) if col in GSHEET_VOLATILE_COLUMNS]
+        for start, rows in _changed_blocks(current, values, width, volatile):
+            for offset in range(0, len(rows), chunk_size):
+                part = rows[offset:offset + chunk_size]
+                first_row = start + offset + 1
+                batch.append({"range": _a1_range(first_row, first_row + len(part) - 1, width), "values": part})
+                batch_rows += len(part)
+                changed += len(part)
+                if batch_rows >= chunk_size:
+                    _gsheet_call(worksheet.batch_update, batch, value_input_option=ValueInputOption.raw,
+                                 retries=retries, backoff=backoff)
+                    batch, batch_rows = [], 0
+        if batch:
+            _gsheet_call(worksheet.batch_update, batch, value_input_option=ValueInputOption.raw,
+                         retries=retries, backoff=backoff)
+
+        cleared = max(0, len(current) - len(values))
+        if cleared:
+            _gsheet_call(worksheet.batch_clear, [_a1_range(len(values) + 1, len(current), width)],
+                         retries=retries, backoff=backoff)
+
+        METRICS.increment("load.gsheet.rows", len(df))
+        METRICS.increment("load.gsheet.changed_rows", changed)
+        logger.info(f"Google Sheets diperbarui: {changed} baris berubah, {cleared} baris dikosongkan")
+        return {"url": spreadsheet.url, "changed_rows": changed, "cleared_rows": cleared}
+    except Exception as e:
+        logger.error(f"Gagal menyimpan ke Google Sheets: {e}")
+        return None
+
+def _prepare_rows(df: pd.DataFrame) -> pd.DataFrame:
+    rows = standard_dtypes(df).reindex(columns=PRODUCT_COLUMNS)
+
+    # Jika timestamp kosong, gunakan waktu sekarang
+    missing = rows["timestamp"].isna()
+    if missing.any():
+        rows.loc[missing, "timestamp"] = pd.to_datetime('now').strftime('%Y-%m-%d %H:%M:%S')
+
+    # Satu baris per produk; jika produk muncul lebih dari sekali, ambil yang terakhir
+    rows["product_key"] = product_keys(rows)
+    duplicated = rows.duplicated("product_key", keep="last")
+    if duplicated.any():
+        logger.warning(f"{int(duplicated.sum())} baris dengan product_key ganda dilewati")
+        rows = rows[~duplicated]
+    return rows
+
+def copy_dataframe(cursor, df: pd.DataFrame, table: str = "products", chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Kirim DataFrame ke tabel lewat COPY FROM STDIN, per potongan chunk_size baris."""
+    rows = _prepare_rows(df)
+    sql = f"COPY {table} ({TABLE_COLUMNS}) FROM STDIN WITH (FORMAT csv)"
+
+    for start in range(0, len(rows), chunk_size):
+        buffer = io.StringIO()
+        rows.iloc[start:start + chunk_size].to_csv(buffer, index=False, header=False)
+        buffer.seek(0)
+        cursor.copy_expert(sql, buffer)
+    return rows
+
+def upsert_dataframe(cursor, df: pd.DataFrame, chunk_size: int = DEFAULT_CHUNK_SIZE, snapshot: bool = False):
+    """
+    Stage batch di temp table lalu INSERT ... ON CONFLICT DO UPDATE ke products.
+    Stage table dan statement products_upsert harus sudah disiapkan
+    PostgresLoader untuk koneksi ini. snapshot=True berarti df berisi seluruh
+    katalog: produk di tabel yang tidak ada di df ikut dihapus (hasil "deleted").
+    """
+    # Stage table sesi masih berisi batch sebelumnya
+    cursor.execute("DELETE FROM products_stage")
+    staged = len(copy_dataframe(cursor, df, table="products_stage", chunk_size=chunk_size))
+
+    cursor.execute("EXECUTE products_upsert")
+    inserted, updated = cursor.fetchone()
+    result = {"inserted": inserted, "updated": updated, "unchanged": staged - inserted - updated}
+    if snapshot:
+        cursor.execute(DELETE_MISSING_SQL)
+        result["deleted"] = cursor.rowcount
+    return result
+
+def backfill_product_keys(cursor) -> int:
+    """
+    Isi product_key baris lama (dari sebelum kolom itu ada) dengan hash yang
+    sama seperti product_keys(), agar baris itu ikut di-upsert alih-alih
+    dihapus. Hash dihitung di pandas, jadi tidak bisa dikerjakan di SQL.
+    Baris yang key-nya sudah dipakai baris lain dibiarkan NULL.
+    """
+    cursor.execute("SELECT id, title, size, gender, colors FROM products WHERE product_key IS NULL ORDER BY id")
+    legacy = pd.DataFrame(list(cursor), columns=["id", "Title", "Size", "Gender", "Colors"])
+    if legacy.empty:
+        return 0
+
+    # Colors NULL tidak boleh membuat kolomnya float ("3.0" berbeda hash dengan "3")
+    legacy["product_key"] = product_keys(legacy.astype({"Colors": "Int64"}))
+    cursor.execute("SELECT product_key FROM products WHERE product_key = ANY(%s)",
+                   (legacy["product_key"].tolist(),))
+    taken = {key for key, in cursor}
+    # Produk yang tercatat lebih dari sekali: key diberikan ke baris terbaru
+    backfill = ~legacy["product_key"].isin(taken) & ~legacy.duplicated("product_key", keep="last")
+    cursor.executemany("UPDATE products SET product_key = %s WHERE id = %s",
+                       list(zip(legacy.loc[backfill, "product_key"], legacy.loc[backfill, "id"].tolist())))
+
+    filled = int(backfill.sum())
+    logger.info(f"product_key diisi untuk {filled} baris lama")
+    if filled < len(legacy):
+        logger.warning(f"{len(legacy) - filled} baris lama dibiarkan tanpa product_key karena produknya sudah ada")
+    return filled
+
+class PostgresLoader:
+    """
+    Loader PostgreSQL yang dipakai ulang untuk banyak batch. Koneksi diambil
+    dari psycopg2.pool.ThreadedConnectionPool (dibuka saat pertama dipakai),
+    schema dibuat sekali per loader, dan statement upsert di-PREPARE sekali
+    per koneksi. Dipakai sebagai context manager agar pool selalu ditutup.
+    """
+
+    def __init__(self, db_name: str, user: str, password: str, host: str = "localhost", port: str = "5432",
+                 min_connections: int = 1, max_connections: int = 4, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.dsn = dict(dbname=db_name, user=user, password=password, host=host, port=port)
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+        self.chunk_size = chunk_size
+        self._pool = None
+        self._lock = threading.Lock()
+        self._schema_ready = False
+        # Koneksi yang sudah punya stage table dan products_upsert. Disimpan sebagai weakref,
+        # bukan id(): koneksi yang ditutup pool hilang sendiri dan id-nya bisa dipakai koneksi baru
+        self._prepared = weakref.WeakSet()
+
+    @classmethod
+    def from_env(cls, **kwargs) -> "PostgresLoader":
+        """Kredensial dari variabel lingkungan libpq: PGDATABASE, PGUSER, PGPASSWORD, PGHOST, PGPORT."""
+        return cls(
+            db_name=os.environ.get("PGDATABASE", "etl_fashion"),
+            user=os.environ.get("PGUSER", "postgres"),
+            password=os.environ.get("PGPASSWORD", ""),
+            host=os.environ.get("PGHOST", "localhost"),
+            port=os.environ.get("PGPORT", "5432"),
+            **kwargs
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.closeall()
+                self._pool = None
+                self._prepared.clear()
+
+    @contextmanager
+    def connection(self):
+        with self._lock:
+            if self._pool is None:
+                from psycopg2.pool import ThreadedConnectionPool
+                self._pool = ThreadedConnectionPool(
+                    self.min_connections, self.max_connections, **self.dsn)
+            pool = self._pool
+
+        conn = pool.getconn()
+        ok = False
+        try:
+            yield conn
+            ok = True
+        finally:
+            if not ok:
+                try:
+                    conn.rollback()
+                except Exception:
+                    pass
+            # Koneksi yang gagal atau sudah tertutup dibuang dari pool, bukan dipakai ulang
+            broken = not ok or bool(conn.closed)
+            if broken:
+                self._prepared.discard(conn)
+            pool.putconn(conn, close=broken)
+
+    @METRICS.timed("load.postgresql")
+    def load(self, df: pd.DataFrame, mode: str = "replace", truncate: bool = True, snapshot: bool = False):
+        """
+        mode="replace" mengosongkan tabel (jika truncate) lalu memuat ulang semua baris.
+        mode="upsert" hanya menulis produk baru/berubah dan mengembalikan jumlah
+        baris inserted/updated/unchanged. Tanpa snapshot, upsert hanya menambah
+        dan memperbarui; dengan snapshot=True (df berisi seluruh katalog) produk
+        yang tidak ada di df dihapus dan jumlahnya dilaporkan sebagai deleted.
+        """
+        if mode not in ("replace", "upsert"):
+            raise ValueError(f"Mode load PostgreSQL tidak dikenal: {mode}")
+
+        if not isinstance(df, pd.DataFrame):
+            logger.error("Gagal menyimpan ke PostgreSQL: Input bukan DataFrame")
+            return False
+
+        try:
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                if not self._schema_ready:
+                    cursor.execute(CREATE_PRODUCTS_SQL)
+                    backfill_product_keys(cursor)
+
+                if mode == "upsert":
+                    prepare = conn not in self._prepared
+                    if prepare:
+                        cursor.execute(CREATE_SESSION_STAGE_SQL)
+                        cursor.execute(PREPARE_UPSERT_SQL)
+                    result = upsert_dataframe(cursor, df, chunk_size=self.chunk_size, snapshot=snapshot)
+                else:
+                    # Untuk batch lanjutan pada mode streaming, data lama tidak dihapus
+                    if truncate:
+                        cursor.execute("TRUNCATE TABLE products RESTART IDENTITY")
+
+                    # Semua chunk dikirim dalam satu transaksi
+                    copy_dataframe(cursor, df, chunk_size=self.chunk_size)
+                    result = True
+
+                conn.commit()
+                cursor.close()
+                self._schema_ready = True
+                if mode == "upsert" and prepare:
+                    self._prepared.add(conn)
+
+            METRICS.increment("load.postgresql.rows", len(df))
+            if mode == "upsert":
+                logger.info(f"Data berhasil disimpan ke PostgreSQL (upsert): {result}")
+            else:
+                logger.info("Data berhasil disimpan ke PostgreSQL.")
+            return result
+        except Exception as e:
+            logger.error(f"Gagal menyimpan ke PostgreSQL: {e}")
+            return False
+
+def load_to_postgresql(df: pd.DataFrame, db_name: str, user: str, password: str, host: str, port: str,
+                       truncate: bool = True, chunk_size: int = DEFAULT_CHUNK_SIZE, mode: str = "replace",
+                       snapshot: bool = False):
+    """
+    Load sekali jalan lewat PostgresLoader dengan satu koneksi. Untuk banyak
+    batch, pakai PostgresLoader langsung agar koneksi dan schema dipakai ulang.
+    """
+    if mode not in ("replace", "upsert"):
+        raise ValueError(f"Mode load PostgreSQL tidak dikenal: {mode}")
+
     if not isinstance(df, pd.DataFrame):
         logger.error("Gagal menyimpan ke PostgreSQL: Input bukan DataFrame")
         return False
 
     try:
-        conn = psycopg2.connect(
-            dbname=db_name,
-            user=user,
-            password=password,
-            host=host,
-            port=port
-        )
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS products (
-                id SERIAL PRIMARY KEY,
-                title TEXT,
-                price FLOAT,
-                rating FLOAT,
-                colors INTEGER,
-                size TEXT,
-                gender TEXT,
-                timestamp TEXT
-            )
-        """)
-
-        cursor.execute("TRUNCATE TABLE products RESTART IDENTITY")
-
-        for _, row in df.iterrows():
-            timestamp_value = row.get("timestamp")
-
-            # Jika timestamp kosong, gunakan waktu sekarang
-            if pd.isna(timestamp_value):
-                timestamp_value = pd.to_datetime('now').strftime('%Y-%m-%d %H:%M:%S')  # Format timestamp sekarang
-
-            cursor.execute("""
-                INSERT INTO products (title, price, rating, colors, size, gender, timestamp)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """, (
-                row.get("Title"),
-                row.get("Price"),
-                row.get("Rating"),
-                row.get("Colors"),
-                row.get("Size"),
-                row.get("Gender"),
-                timestamp_value
-            ))
-
-        conn.commit()
-        cursor.close()
-        conn.close()
-
-        logger.info("Data berhasil disimpan ke PostgreSQL.")
-        return True
+        with PostgresLoader(db_name, user, password, host, port, max_connections=1, chunk_size=chunk_size) as loader:
+            return loader.load(df, mode=mode, truncate=truncate, snapshot=snapshot)
     except Exception as e:
         logger.error(f"Gagal menyimpan ke PostgreSQL: {e}")
         return False
     
 if __name__ == "__main__":
-    input_path = "cleaned_products.csv"
+    logging.basicConfig(level=logging.INFO)
+    # File Arrow/Parquet dipakai lebih dulu karena tidak perlu parsing teks ulang
+    candidates = ["cleaned_products.arrow", "cleaned_products.parquet", "cleaned_products.csv"]
+    input_path = next((path for path in candidates if os.path.exists(path)), None)
     json_key = "google-sheets-api.json"
 
-    if not os.path.exists(input_path):
-        logger.error(f"File '{input_path}' tidak ditemukan.")
+    if input_path is None:
+        logger.error(f"File {candidates} tidak ditemukan.")
     else:
-        df = pd.read_csv(input_path)
+        df = read_intermediate(input_path)
 
         load_to_csv(df)
         url = load_to_gsheet(df, "ETL-Fashion-Studio", json_key)
         if url:
             logger.info(f"Google Sheets URL: {url}")
 
-        load_to_postgresql(
-            df,
-            db_name="etl_fashion",
-            user="postgres",
-            password="new_password",
-            host="localhost",
-            port="5432"
-        )
+        with PostgresLoader.from_env() as loader:
+            loader.load(df)
@@ -0,0 +1,152 @@
+"""
+Module instrumentasi pipeline: waktu per tahap, counter, dan peak memori
+"""
+
+import functools
+import json
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Optional
+
+try:
+    import resource
+except ImportError:  # Windows tidak punya modul resource
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+
+def peak_rss_bytes() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux melaporkan KiB, macOS melaporkan byte
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Metrics:
+    """
+    Registry metrik sederhana yang aman dipakai dari banyak thread.
+    Timing disimpan sebagai count/total/max per nama, counter sebagai jumlah,
+    dan gauge sebagai nilai terakhir.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.started_at = datetime.now()
+            self._started = time.perf_counter()
+            self.timings: Dict[str, Dict[str, float]] = {}
+            self.counters: Dict[str, float] = {}
+            self.gauges: Dict[str, float] = {}
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            timing = self.timings.setdefault(name, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+            timing["count"] += 1
+            timing["total_seconds"] += seconds
+            timing["max_seconds"] = max(timing["max_seconds"], seconds)
+
+    def increment(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        with self._lock:
+            self.gauges[name] = value
+
+    @contextmanager
+    def timer(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def timed(self, name: str):
+        """Decorator versi timer() untuk satu fungsi."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @contextmanager
+    def stage(self, name: str):
+        """Timer untuk satu tahap besar, sekaligus mencatat peak RSS setelah tahap selesai."""
+        with self.timer(f"stage.{name}"):
+            yield
+        rss = peak_rss_bytes()
+        if rss is not None:
+            self.set_gauge(f"stage.{name}.peak_rss_bytes", rss)
+
+    def report(self) -> Dict:
+        with self._lock:
+            timings = {}
+            for name, timing in self.timings.items():
+                entry = dict(timing)
+                rows = self.counters.get(f"{name}.rows")
+                if rows is not None and timing["total_seconds"] > 0:
+                    entry["rows_per_second"] = rows / timing["total_seconds"]
+                timings[name] = entry
+
+            return {
+                "started_at": self.started_at.isoformat(),
+                "duration_seconds": time.perf_counter() - self._started,
+                "peak_rss_bytes": peak_rss_bytes(),
+                "timings": timings,
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+            }
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+        logger.info(f"Run report written to {path}")
+
+    def to_prometheus(self, prefix: str = "etl") -> str:
+        report = self.report()
+        lines = [
+            f"# TYPE {prefix}_run_duration_seconds gauge",
+            f"{prefix}_run_duration_seconds {report['duration_seconds']}",
+        ]
+        if report["peak_rss_bytes"] is not None:
+            lines += [
+                f"# TYPE {prefix}_peak_rss_bytes gauge",
+                f"{prefix}_peak_rss_bytes {report['peak_rss_bytes']}",
+            ]
+
+        lines.append(f"# TYPE {prefix}_step_seconds summary")
+        for name, timing in sorted(report["timings"].items()):
+            lines.append(f'{prefix}_step_seconds_sum{{step="{name}"}} {timing["total_seconds"]}')
+            lines.append(f'{prefix}_step_seconds_count{{step="{name}"}} {timing["count"]}')
+        lines.append(f"# TYPE {prefix}_step_max_seconds gauge")
+        for name, timing in sorted(report["timings"].items()):
+            lines.append(f'{prefix}_step_max_seconds{{step="{name}"}} {timing["max_seconds"]}')
+
+        lines.append(f"# TYPE {prefix}_events_total counter")
+        for name, value in sorted(report["counters"].items()):
+            lines.append(f'{prefix}_events_total{{name="{name}"}} {value}')
+
+        lines.append(f"# TYPE {prefix}_gauge gauge")
+        for name, value in sorted(report["gauges"].items()):
+            lines.append(f'{prefix}_gauge{{name="{name}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        logger.info(f"Prometheus metrics written to {path}")
+
+
+# Registry global yang dipakai extract, transform, dan load
+METRICS = Metrics()
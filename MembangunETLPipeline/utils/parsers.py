@@ -0,0 +1,82 @@
+"""
+Backend parser HTML alternatif (lxml) untuk kartu produk Fashion Studio.
+Hasilnya harus sama persis dengan parse_product_card versi BeautifulSoup.
+"""
+
+import logging
+from typing import Tuple
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+except ImportError:  # lxml opsional, extract akan kembali ke BeautifulSoup
+    etree = lxml_html = None
+
+from utils.extract import Columns, columns_from_rows
+
+logger = logging.getLogger(__name__)
+
+HAS_LXML = lxml_html is not None
+
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# XPath yang setara dengan selector CSS di parse_product_card
+CARD_XPATH = f"//*[{_has_class('collection-card')}]"
+DETAILS_XPATH = f".//*[{_has_class('product-details')}]"
+PRICE_XPATH = f".//*[{_has_class('price-container')}]//*[{_has_class('price')}]"
+
+# Dikompilasi sekali; element.xpath(str) mengompilasi ulang ekspresinya di setiap panggilan
+if HAS_LXML:
+    _CARDS, _DETAILS, _PRICE = etree.XPath(CARD_XPATH), etree.XPath(DETAILS_XPATH), etree.XPath(PRICE_XPATH)
+    _TITLE, _INFO = etree.XPath(".//h3"), etree.XPath(".//p")
+
+
+def _first(element, xpath: "etree.XPath"):
+    found = xpath(element)
+    return found[0] if found else None
+
+
+def parse_card_values_lxml(card) -> Tuple[str, ...]:
+    """Nilai satu kartu produk (lxml) sesuai urutan CARD_FIELDS."""
+    title, price = "Unknown Product", "Price Unavailable"
+    rating, colors, size, gender = "Invalid Rating", "Unknown", "Unknown", "Unknown"
+
+    try:
+        product_details = _first(card, _DETAILS)
+        if product_details is not None:
+            title_element = _first(product_details, _TITLE)
+            if title_element is not None:
+                title = title_element.text_content().strip()
+
+            for info in _INFO(product_details):
+                info_text = info.text_content().strip()
+                if "Rating:" in info_text:
+                    rating = info_text.split("Rating:")[-1].strip()
+                elif "Color" in info_text:
+                    colors = info_text
+                elif "Size:" in info_text:
+                    size = info_text.split("Size:")[-1].strip()
+                elif "Gender:" in info_text:
+                    gender = info_text.split("Gender:")[-1].strip()
+
+            price_element = _first(card, _PRICE)
+            if price_element is not None:
+                price = price_element.text_content().strip()
+        else:
+            logger.warning("Could not find product-details.")
+
+    except Exception as e:
+        logger.error(f"Error parsing product card: {e}")
+
+    return title, rating, colors, size, gender, price
+
+
+def extract_columns_lxml(html_content: str) -> Columns:
+    """Kartu produk satu halaman dalam bentuk kolom (nama kolom -> list nilai)."""
+    if not html_content.strip():
+        return columns_from_rows([])
+    return columns_from_rows([parse_card_values_lxml(card)
+                              for card in _CARDS(lxml_html.document_fromstring(html_content))])
@@ -0,0 +1,130 @@
+"""
+Module untuk menjalankan pipeline ETL secara streaming (per batch)
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Penanda akhir stream di dalam queue
+_END = object()
+
+# Sink menerima batch dan flag apakah ini batch pertama (untuk overwrite/truncate)
+BatchSink = Callable[[pd.DataFrame, bool], object]
+
+
+def _put(q: queue.Queue, item, stop: threading.Event) -> bool:
+    # Blok selama queue penuh (backpressure), kecuali pipeline dihentikan
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(q: queue.Queue, stop: threading.Event):
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return _END
+
+
+def run_streaming_pipeline(batches: Iterable[pd.DataFrame],
+                           transform: Callable[[pd.DataFrame], pd.DataFrame],
+                           sinks: List[BatchSink],
+                           raw_sink: Optional[BatchSink] = None,
+                           queue_size: int = 4) -> Dict[str, float]:
+    """
+    Menjalankan extract, transform, dan load sebagai tiga thread yang
+    dihubungkan queue berukuran terbatas, sehingga memori hanya bergantung
+    pada ukuran batch. Catatan: drop_duplicates di transform_data hanya
+    berlaku di dalam satu batch.
+    """
+    raw_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    clean_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    errors: List[BaseException] = []
+    stats = {"batches": 0, "raw_rows": 0, "clean_rows": 0, "first_load_seconds": None}
+    started = time.monotonic()
+
+    def extract_stage():
+        try:
+            for batch in batches:
+                if not _put(raw_queue, batch, stop):
+                    break
+        except Exception as e:
+            logger.error(f"Extract stage failed: {e}")
+            errors.append(e)
+            stop.set()
+        finally:
+            close = getattr(batches, "close", None)
+            if close is not None:
+                close()
+            _put(raw_queue, _END, stop)
+
+    def transform_stage():
+        first = True
+        try:
+            while True:
+                batch = _get(raw_queue, stop)
+                if batch is _END:
+                    break
+                stats["raw_rows"] += len(batch)
+                if raw_sink is not None:
+                    raw_sink(batch, first)
+                cleaned = transform(batch)
+                first = False
+                if not _put(clean_queue, cleaned, stop):
+                    break
+        except Exception as e:
+            logger.error(f"Transform stage failed: {e}")
+            errors.append(e)
+            stop.set()
+        finally:
+            _put(clean_queue, _END, stop)
+
+    threads = [
+        threading.Thread(target=extract_stage, name="etl-extract", daemon=True),
+        threading.Thread(target=transform_stage, name="etl-transform", daemon=True),
+    ]
+    for thread in threads:
+        thread.start()
+
+    # Tahap load berjalan di thread pemanggil
+    first = True
+    try:
+        while True:
+            cleaned = _get(clean_queue, stop)
+            if cleaned is _END:
+                break
+            for sink in sinks:
+                sink(cleaned, first)
+            if first:
+                stats["first_load_seconds"] = time.monotonic() - started
+                logger.info(f"First batch loaded after {stats['first_load_seconds']:.2f}s")
+            first = False
+            stats["batches"] += 1
+            stats["clean_rows"] += len(cleaned)
+    except Exception as e:
+        logger.error(f"Load stage failed: {e}")
+        errors.append(e)
+        stop.set()
+    finally:
+        for thread in threads:
+            thread.join()
+
+    if errors:
+        raise errors[0]
+
+    logger.info(f"Streaming pipeline finished: {stats['batches']} batches, {stats['clean_rows']} rows loaded")
+    return stats
@@ -0,0 +1,91 @@
+"""
+Module plugin: import library berat (sink dan backend parser) baru saat
+benar-benar dipakai, agar run yang hanya butuh extract + CSV tidak ikut
+membayar waktu import gspread, google-auth, psycopg2, pyarrow, dan lxml
+"""
+
+import importlib
+import importlib.util
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+
+def resolve(spec: str) -> Any:
+    """'paket.modul' mengembalikan modulnya, 'paket.modul:nama' mengembalikan atribut di modul itu."""
+    module_name, _, attr = spec.partition(":")
+    module = importlib.import_module(module_name)
+    return getattr(module, attr) if attr else module
+
+
+def is_installed(module_name: str) -> bool:
+    """Cek modul tanpa meng-import-nya (hanya paket induknya yang ikut di-import)."""
+    try:
+        return importlib.util.find_spec(module_name) is not None
+    except ImportError:
+        return False
+
+
+class LazyImports:
+    """
+    __getattr__ modul (PEP 562): atribut seperti utils.load.psycopg2 di-import
+    saat diakses dari luar modul, sehingga patch("utils.load.gspread.authorize")
+    tetap bekerja seperti import biasa. Nilainya tidak disimpan ke globals
+    modul; fungsi di dalam modul meng-import library-nya sendiri secara lokal.
+
+    Nama di optional bernilai None jika library-nya tidak terpasang.
+    """
+
+    def __init__(self, module_name: str, specs: Dict[str, str], optional: Iterable[str] = ()):
+        self._module_name = module_name
+        self._specs = specs
+        self._optional = set(optional)
+
+    def __call__(self, name: str) -> Any:
+        if name not in self._specs:
+            raise AttributeError(f"module {self._module_name!r} has no attribute {name!r}")
+        try:
+            return resolve(self._specs[name])
+        except ImportError:
+            if name not in self._optional:
+                raise
+            return None
+
+
+class PluginRegistry(Mapping):
+    """
+    Registry nama plugin -> 'modul:atribut'. Modul plugin baru di-import saat
+    plugin itu diambil; plugin yang library-nya tidak terpasang tidak ikut
+    terdaftar saat iterasi maupun pengecekan `in`.
+    """
+
+    def __init__(self, specs: Optional[Dict[str, str]] = None, requires: Optional[Dict[str, str]] = None):
+        self._specs: Dict[str, str] = {}
+        self._requires: Dict[str, str] = {}
+        self._loaded: Dict[str, Any] = {}
+        for name, spec in (specs or {}).items():
+            self.register(name, spec, (requires or {}).get(name))
+
+    def register(self, name: str, spec: str, requires: Optional[str] = None) -> None:
+        self._specs[name] = spec
+        self._loaded.pop(name, None)
+        if requires:
+            self._requires[name] = requires
+
+    def available(self, name: str) -> bool:
+        return name in self._specs and (name not in self._requires or is_installed(self._requires[name]))
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in self._loaded:
+            if not self.available(name):
+                raise KeyError(name)
+            self._loaded[name] = resolve(self._specs[name])
+        return self._loaded[name]
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self.available(name)
+
+    def __iter__(self) -> Iterator[str]:
+        return (name for name in self._specs if self.available(name))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
@@ -0,0 +1,234 @@
+"""
+Module scheduler: menjalankan pipeline berulang kali dalam satu proses
+(interval atau ekspresi cron) tanpa run yang saling tumpang tindih
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from utils.metrics import METRICS
+
+try:
+    import fcntl
+except ImportError:  # Windows: hanya lock di dalam proses
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOCK_PATH = os.path.join(".cache", "pipeline.lock")
+
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+STATUS_SKIPPED = "skipped"
+
+# (nama, nilai minimum, nilai maksimum) untuk lima kolom cron; hari 7 sama dengan 0 (Minggu)
+CRON_FIELDS = [("minute", 0, 59), ("hour", 0, 23), ("day", 1, 31), ("month", 1, 12), ("weekday", 0, 7)]
+
+
+def _parse_cron_field(expr: str, low: int, high: int) -> Set[int]:
+    values = set()
+    for part in expr.split(","):
+        base, _, step = part.partition("/")
+        step = int(step) if step else 1
+        if base == "*":
+            start, end = low, high
+        elif "-" in base:
+            start, end = (int(v) for v in base.split("-", 1))
+        else:
+            start = int(base)
+            end = high if step > 1 else start
+        if step < 1 or start < low or end > high or start > end:
+            raise ValueError(f"Invalid cron field '{expr}' (allowed {low}-{high})")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    """
+    Ekspresi cron lima kolom: menit jam tanggal bulan hari (0 = Minggu,
+    7 juga Minggu). Mendukung *, daftar (1,15), rentang (1-5), dan step
+    (*/15). Seperti cron, jika tanggal dan hari sama-sama dibatasi, cukup
+    salah satunya yang cocok.
+    """
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != len(CRON_FIELDS):
+            raise ValueError(f"Cron expression must have 5 fields: '{expression}'")
+        self.expression = expression
+        parsed = [_parse_cron_field(expr, low, high) for expr, (_, low, high) in zip(fields, CRON_FIELDS)]
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        self.weekdays = {day % 7 for day in weekdays}
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+        self._sorted_hours = sorted(self.hours)
+        self._sorted_minutes = sorted(self.minutes)
+
+    def _day_matches(self, day: datetime) -> bool:
+        if day.month not in self.months:
+            return False
+        day_ok = day.day in self.days
+        weekday_ok = (day.isoweekday() % 7) in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, moment: datetime) -> datetime:
+        """Waktu cocok pertama yang lebih besar dari moment (resolusi menit)."""
+        start = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = start.replace(hour=0, minute=0)
+        # Dicari per hari lalu per jam/menit, bukan per menit, agar tetap cepat untuk jadwal jarang
+        for _ in range(366 * 5):
+            if self._day_matches(day):
+                for hour in self._sorted_hours:
+                    for minute in self._sorted_minutes:
+                        candidate = day.replace(hour=hour, minute=minute)
+                        if candidate >= start:
+                            return candidate
+            day += timedelta(days=1)
+        raise ValueError(f"Cron expression '{self.expression}' never matches")
+
+
+class IntervalSchedule:
+    """Run berikutnya dimulai `seconds` detik setelah run sebelumnya dimulai."""
+
+    def __init__(self, seconds: float):
+        if seconds <= 0:
+            raise ValueError("Interval must be positive")
+        self.seconds = seconds
+
+    def next_after(self, moment: datetime) -> datetime:
+        return moment + timedelta(seconds=self.seconds)
+
+
+class RunLock:
+    """
+    Lock file (flock) yang dipegang selama satu run, sehingga dua daemon
+    atau daemon dan run manual tidak menulis ke sink yang sama bersamaan.
+    """
+
+    def __init__(self, path: str = DEFAULT_LOCK_PATH):
+        self.path = path
+        self._thread_lock = threading.Lock()
+        self._file = None
+
+    def acquire(self) -> bool:
+        if not self._thread_lock.acquire(blocking=False):
+            return False
+        if fcntl is None:
+            return True
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._file = open(self.path, "a+")
+        try:
+            fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self._file.close()
+            self._file = None
+            self._thread_lock.release()
+            return False
+        self._file.seek(0)
+        self._file.truncate()
+        self._file.write(str(os.getpid()))
+        self._file.flush()
+        return True
+
+    def release(self) -> None:
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+        self._thread_lock.release()
+
+
+class PipelineDaemon:
+    """
+    Menjalankan run() sesuai schedule dalam satu proses yang hidup lama,
+    sehingga session HTTP, pool koneksi, dan cache yang dipegang run() tetap
+    hangat antar run. Metrik di-reset di awal setiap run; ringkasannya ditulis
+    ke report_path/prometheus_path (run terakhir) dan ditambahkan ke
+    history_path (satu baris JSON per run). Run yang terlambat karena run
+    sebelumnya belum selesai tidak dikejar, melainkan dilewati ke jadwal
+    berikutnya.
+    """
+
+    def __init__(self, run: Callable[[], Any], schedule, lock: Optional[RunLock] = None,
+                 run_immediately: bool = True, max_runs: Optional[int] = None,
+                 report_path: Optional[str] = None, prometheus_path: Optional[str] = None,
+                 history_path: Optional[str] = None):
+        self.run = run
+        self.schedule = schedule
+        self.lock = lock or RunLock()
+        self.run_immediately = run_immediately
+        self.max_runs = max_runs
+        self.report_path = report_path
+        self.prometheus_path = prometheus_path
+        self.history_path = history_path
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.history: List[Dict] = []
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run_once(self) -> Dict:
+        if not self.lock.acquire():
+            self.skipped += 1
+            logger.warning(f"Another pipeline run holds {self.lock.path}, skipping this run")
+            return self._record({"status": STATUS_SKIPPED, "started_at": datetime.now().isoformat()})
+
+        self.runs += 1
+        METRICS.reset()
+        start = time.perf_counter()
+        try:
+            status = STATUS_OK if self.run() is not False else STATUS_FAILED
+        except Exception as e:
+            logger.error(f"Pipeline run {self.runs} failed: {e}")
+            status = STATUS_FAILED
+        finally:
+            self.lock.release()
+        if status == STATUS_FAILED:
+            self.failures += 1
+        logger.info(f"Pipeline run {self.runs} finished ({status}) in {time.perf_counter() - start:.2f}s")
+
+        if self.report_path:
+            METRICS.write_json(self.report_path)
+        if self.prometheus_path:
+            METRICS.write_prometheus(self.prometheus_path)
+        return self._record(dict(METRICS.report(), status=status))
+
+    def _record(self, entry: Dict) -> Dict:
+        entry.update({"run": self.runs, "total_failures": self.failures, "total_skipped": self.skipped})
+        self.history.append(entry)
+        if self.history_path:
+            with open(self.history_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        return entry
+
+    def serve(self) -> None:
+        """Loop utama sampai stop() dipanggil atau max_runs tercapai."""
+        next_at = datetime.now() if self.run_immediately else self.schedule.next_after(datetime.now())
+        while not self._stop.is_set():
+            wait = (next_at - datetime.now()).total_seconds()
+            if wait > 0:
+                logger.info(f"Next pipeline run at {next_at.isoformat(timespec='seconds')}")
+                if self._stop.wait(wait):
+                    break
+
+            started = datetime.now()
+            self.run_once()
+            if self.max_runs is not None and self.runs + self.skipped >= self.max_runs:
+                break
+
+            next_at = self.schedule.next_after(started)
+            now = datetime.now()
+            if next_at <= now:
+                logger.warning("Run took longer than the schedule, skipping missed runs")
+                next_at = self.schedule.next_after(now)
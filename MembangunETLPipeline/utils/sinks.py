@@ -0,0 +1,111 @@
+"""
+Module orkestrasi load: menjalankan beberapa sink secara paralel dari
+DataFrame yang sama, dengan timeout dan retry per sink
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional
+
+import pandas as pd
+
+from utils.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Sink:
+    name: str
+    load: Callable[[pd.DataFrame], Any]  # nilai falsy dianggap gagal, sama seperti fungsi di utils.load
+    timeout: Optional[float] = None  # detik per percobaan; percobaan yang timeout tidak di-retry
+    retries: int = 0  # hanya untuk percobaan yang gagal dengan error atau nilai falsy
+    backoff: float = 1.0  # jeda sebelum retry ke-n = backoff * 2**(n-1)
+
+
+@dataclass
+class SinkResult:
+    name: str
+    ok: bool
+    rows: int
+    duration: float
+    attempts: int
+    error: Optional[str] = None
+    value: Any = None
+
+
+class SinkTimeout(TimeoutError):
+    """Percobaan sink melewati timeout dan mungkin masih berjalan di thread-nya."""
+
+
+def _call_with_timeout(func: Callable[[], Any], timeout: Optional[float]) -> Any:
+    # Thread daemon agar sink yang macet tidak menahan proses saat keluar
+    outcome = {}
+
+    def target():
+        try:
+            outcome["value"] = func()
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        raise SinkTimeout(f"timed out after {timeout}s")
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["value"]
+
+
+def _run_sink(sink: Sink, df: pd.DataFrame) -> SinkResult:
+    start = time.perf_counter()
+    error = None
+    value = None
+
+    for attempt in range(1, sink.retries + 2):
+        if attempt > 1:
+            delay = sink.backoff * 2 ** (attempt - 2)
+            logger.info(f"Retrying sink {sink.name} in {delay:.1f}s (attempt {attempt}/{sink.retries + 1})")
+            time.sleep(delay)
+        try:
+            value = _call_with_timeout(lambda: sink.load(df), sink.timeout)
+            if value:
+                METRICS.observe(f"sink.{sink.name}", time.perf_counter() - start)
+                return SinkResult(sink.name, True, len(df), time.perf_counter() - start, attempt, value=value)
+            error = f"sink returned {value!r}"
+        except SinkTimeout as e:
+            # Thread percobaan ini tidak bisa dihentikan; retry akan berjalan bersamaan
+            # dengannya (dua spreadsheet, dua TRUNCATE+COPY), jadi hasilnya dianggap tidak diketahui
+            error = f"TimeoutError: {e}, outcome unknown (not retried while it may still be running)"
+            logger.warning(f"Sink {sink.name} failed on attempt {attempt}: {error}")
+            break
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        logger.warning(f"Sink {sink.name} failed on attempt {attempt}: {error}")
+
+    METRICS.increment(f"sink.{sink.name}.failures")
+    return SinkResult(sink.name, False, 0, time.perf_counter() - start, attempt, error=error, value=value)
+
+
+def run_sinks(df: pd.DataFrame, sinks: List[Sink]) -> List[SinkResult]:
+    """
+    Jalankan semua sink bersamaan. Kegagalan satu sink tidak menghentikan
+    sink lain; hasil dikembalikan sesuai urutan sinks.
+    """
+    if not sinks:
+        return []
+
+    with ThreadPoolExecutor(max_workers=len(sinks), thread_name_prefix="etl-sink") as executor:
+        futures = [executor.submit(_run_sink, sink, df) for sink in sinks]
+        results = [future.result() for future in futures]
+
+    for result in results:
+        if result.ok:
+            logger.info(f"Sink {result.name}: {result.rows} rows in {result.duration:.2f}s")
+        else:
+            logger.error(f"Sink {result.name} failed after {result.attempts} attempt(s): {result.error}")
+    return results
@@ -1,61 +1,166 @@
+import numpy as np
 import pandas as pd
 import re
 import logging
+from typing import Dict, Tuple
+
+from utils.metrics import METRICS
+from utils.plugins import is_installed
+from utils.validate import (REASON_DUPLICATE, REASON_INVALID_MARKER, REASON_MISSING_VALUE, check_rules,
+                            first_failure, quarantine_report, split_quarantine)
 
 EXCHANGE_RATE = 16000  # $1 = Rp16.000
+KEY_COLUMNS = ['Title', 'Size', 'Gender', 'Colors']  # natural key sebuah produk
+# Metadata crawl dari batch extract (lihat extract.BATCH_FIELDS): hanya disimpan
+# di data mentah dan karantina, tidak ikut ke data bersih dan sink
+CRAWL_COLUMNS = ['page', 'crawl_id']
 logger = logging.getLogger(__name__)
 
-def transform_data(df: pd.DataFrame) -> pd.DataFrame:
-    try:
-        required_columns = ['Title', 'Price', 'Rating', 'Colors', 'Size', 'Gender']
-        for col in required_columns:
-            if col not in df.columns:
-                raise ValueError(f"Missing required column: {col}")
+def product_key_hashes(df: pd.DataFrame) -> np.ndarray:
+    """Hash uint64 dari isi kolom KEY_COLUMNS, satu per baris."""
+    combined = df[KEY_COLUMNS[0]].astype(str)
+    for col in KEY_COLUMNS[1:]:
+        combined = combined + '\x1f' + df[col].astype(str)
+    return pd.util.hash_pandas_object(combined, index=False).to_numpy()
 
-        # 1. Hapus baris dengan data invalid
-        df = df[
-            (df['Title'].str.lower() != 'unknown product') &
-            (df['Price'].str.lower() != 'price unavailable') &
-            (df['Rating'].str.lower() != 'invalid rating')
-        ].copy()
+def product_keys(df: pd.DataFrame) -> pd.Series:
+    """Hash isi kolom KEY_COLUMNS menjadi string hex 16 karakter per baris."""
+    return pd.Series(product_key_hashes(df), index=df.index).map('{:016x}'.format)
 
-        # 2. Hapus baris kosong/null
-        df.dropna(inplace=True)
+# Regex dikompilasi sekali dan dipakai untuk semua kolom numerik
+PRICE_PATTERN = re.compile(r'[^0-9.]')
+RATING_PATTERN = re.compile(r'(\d+\.\d+)')
+COLORS_PATTERN = re.compile(r'(\d+)')
 
-        # 3. Hapus duplikat
-        df.drop_duplicates(inplace=True)
+# Penanda data invalid dari situs, dibandingkan tanpa membedakan huruf besar/kecil
+INVALID_MARKERS = {'Title': 'unknown product', 'Price': 'price unavailable', 'Rating': 'invalid rating'}
 
-        # 4. Bersihkan kolom Price → float64 (dalam Rupiah)
-        df['Price'] = df['Price'].astype(str).str.replace(r'[^0-9.]', '', regex=True)
-        df = df[df['Price'] != '']  # Hapus baris yang kosong setelah pembersihan
-        df['Price'] = df['Price'].astype(float) * EXCHANGE_RATE
+def _row_failures(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    # Mask pelanggaran yang bisa dicek dari nilai mentah, sebelum field dibersihkan
+    marker = np.zeros(len(df), dtype=bool)
+    for col, invalid in INVALID_MARKERS.items():
+        marker |= df[col].astype(str).str.lower().eq(invalid).to_numpy()
+    return {
+        REASON_INVALID_MARKER: marker,
+        REASON_MISSING_VALUE: ~df.notna().all(axis=1).to_numpy(),
+        # Baris duplikat selalu sama-sama valid/invalid, jadi duplicated() boleh dihitung di awal.
+        # timestamp diabaikan: waktu crawl berbeda per halaman meski produknya sama
+        REASON_DUPLICATE: df.duplicated(subset=[col for col in df.columns if col != 'timestamp']).to_numpy(),
+    }
 
-        # 5. Bersihkan kolom Rating → float64
-        df['Rating'] = df['Rating'].astype(str).str.extract(r'(\d+\.\d+)')
-        df['Rating'] = df['Rating'].astype(float)
+def _unique_strings(series: pd.Series) -> Tuple[np.ndarray, pd.Index]:
+    # Nilai hasil scraping banyak berulang (rating, warna, ukuran, harga): operasi
+    # string cukup dijalankan sekali per nilai unik, lalu disebar lewat kode factorize
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    return codes, pd.Index(uniques, dtype=object).astype(str)
 
-        # 6. Bersihkan kolom Colors → int64
-        df['Colors'] = df['Colors'].astype(str).str.extract(r'(\d+)')
-        df['Colors'] = df['Colors'].astype(int)
+@METRICS.timed("transform.fields")
+def _clean_fields(df: pd.DataFrame):
+    # Price → float64 (dalam Rupiah); baris tanpa angka dibuang, teks yang tidak bisa diparse jadi NaN
+    codes, uniques = _unique_strings(df['Price'])
+    cleaned = uniques.str.replace(PRICE_PATTERN, '', regex=True)
+    has_price = np.asarray(cleaned != '')[codes]
+    price = pd.to_numeric(cleaned, errors='coerce').to_numpy(dtype="float64")[codes] * EXCHANGE_RATE
 
-        # 7. Bersihkan kolom Size → object
-        df['Size'] = df['Size'].astype(str).str.replace("Size:", "").str.strip()
+    # Rating → float64 (NaN jika tidak ada angka desimal)
+    codes, uniques = _unique_strings(df['Rating'])
+    rating = uniques.str.extract(RATING_PATTERN, expand=False).astype("float64").to_numpy()[codes]
 
-        # 8. Bersihkan kolom Gender → object
-        df['Gender'] = df['Gender'].astype(str).str.replace("Gender:", "").str.strip()
+    # Colors → int64; -1 menandai nilai tanpa angka, dikarantina oleh validasi
+    codes, uniques = _unique_strings(df['Colors'])
+    colors = uniques.str.extract(COLORS_PATTERN, expand=False).astype("float64").fillna(-1).to_numpy()
+    colors = colors.astype("int64")[codes]
 
-        # 9. Pastikan tipe data akhir sesuai ketentuan
-        df = df.astype({
-            "Title": "object",
-            "Price": "float64",
-            "Rating": "float64",
-            "Colors": "int64",
-            "Size": "object",
-            "Gender": "object"
-        })
+    codes, uniques = _unique_strings(df['Size'])
+    size = uniques.str.replace("Size:", "", regex=False).str.strip().to_numpy(dtype=object)[codes]
+    codes, uniques = _unique_strings(df['Gender'])
+    gender = uniques.str.replace("Gender:", "", regex=False).str.strip().to_numpy(dtype=object)[codes]
 
-        return df
+    return price, rating, colors, size, gender, has_price
+
+# Title disimpan sebagai string Arrow jika pyarrow terpasang, selain itu tetap object.
+# Dicek tanpa import agar pyarrow baru dimuat saat mode compact dipakai.
+COMPACT_TITLE_DTYPE = "string[pyarrow]" if is_installed("pyarrow") else object
+
+def compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Versi hemat memori dari frame hasil transform: Size/Gender category, Title
+    string Arrow, Colors integer terkecil, dan timestamp datetime64 (nilai yang
+    tidak bisa diparse menjadi NaT).
+    """
+    changes = {
+        "Title": df["Title"].astype(COMPACT_TITLE_DTYPE),
+        "Size": df["Size"].astype("category"),
+        "Gender": df["Gender"].astype("category"),
+        "Colors": pd.to_numeric(df["Colors"], downcast="integer"),
+    }
+    if "timestamp" in df.columns:
+        changes["timestamp"] = pd.to_datetime(df["timestamp"], format="ISO8601", errors="coerce")
+    return df.assign(**changes)
+
+def standard_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Kembalikan frame compact ke schema standar transform_data (string object,
+    Colors int64, timestamp string ISO). Frame standar dikembalikan apa adanya.
+    """
+    changes = {}
+    for col in ("Title", "Size", "Gender"):
+        if col in df.columns and df[col].dtype != object:
+            changes[col] = df[col].astype(object)
+    if "Colors" in df.columns and df["Colors"].dtype.kind in "iu" and df["Colors"].dtype != np.int64:
+        changes["Colors"] = df["Colors"].astype("int64")
+    if "timestamp" in df.columns and pd.api.types.is_datetime64_any_dtype(df["timestamp"]):
+        changes["timestamp"] = df["timestamp"].map(lambda ts: None if ts is pd.NaT else ts.isoformat()).astype(object)
+    return df.assign(**changes) if changes else df
+
+@METRICS.timed("transform")
+def transform_with_quarantine(df: pd.DataFrame, compact: bool = False) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Seperti transform_data, tetapi juga mengembalikan baris mentah yang tidak
+    lolos beserta kolom reason (kode alasan di utils.validate). Jumlah per
+    alasan dicatat sebagai counter validate.<alasan>. Kolom CRAWL_COLUMNS
+    tetap ada di baris karantina, tetapi dibuang dari data bersih.
+    """
+    try:
+        required_columns = ['Title', 'Price', 'Rating', 'Colors', 'Size', 'Gender']
+        for col in required_columns:
+            if col not in df.columns:
+                raise ValueError(f"Missing required column: {col}")
+        raw = df
+        df = df.drop(columns=[col for col in CRAWL_COLUMNS if col in df.columns])
+
+        # 1-3. Data invalid, baris kosong/null, dan duplikat ditandai dengan satu mask
+        with METRICS.timer("transform.filter"):
+            codes = first_failure(_row_failures(df))
+            candidates = codes == 0
+            rows = df[candidates]
+
+        # 4-8. Price, Rating, Colors, Size, Gender dibersihkan dalam satu loop
+        price, rating, colors, size, gender, has_price = _clean_fields(rows)
+
+        # Aturan kualitas data dicek sekaligus atas kolom yang sudah dibersihkan
+        with METRICS.timer("transform.validate"):
+            codes[candidates] = first_failure(
+                check_rules(price, rating, colors, size, gender, has_price, EXCHANGE_RATE))
+            quarantine_report(codes)
+            passed, quarantined = split_quarantine(raw, codes)
+
+        # 9. Tulis kolom hasil dengan tipe data akhir sesuai ketentuan
+        with METRICS.timer("transform.finalize"):
+            df = rows.assign(Price=price, Rating=rating, Colors=colors, Size=size, Gender=gender)
+            passed = passed[candidates]
+            if not passed.all():
+                df = df[passed]
+            df = df.astype({"Title": "object"}, copy=False)
+            if compact:
+                df = compact_dtypes(df)
+
+        METRICS.increment("transform.rows", len(df))
+        return df, quarantined
 
     except Exception as e:
         logger.error(f"Error during data transformation: {e}")
         raise
+
+def transform_data(df: pd.DataFrame, compact: bool = False) -> pd.DataFrame:
+    return transform_with_quarantine(df, compact)[0]
@@ -0,0 +1,93 @@
+"""
+Module validasi kualitas data: aturan dicek secara vektor atas seluruh
+kolom hasil parsing transform, dan baris yang melanggar dikarantina
+beserta kode alasannya, bukan dibuang diam-diam atau menggagalkan batch
+"""
+
+import logging
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+# Kode alasan karantina, urut sesuai prioritas: baris yang melanggar beberapa
+# aturan dicatat dengan alasan pertama yang dilanggarnya
+REASON_INVALID_MARKER = "invalid_marker"  # Unknown Product / Price Unavailable / Invalid Rating
+REASON_MISSING_VALUE = "missing_value"
+REASON_DUPLICATE = "duplicate"
+REASON_PRICE_MISSING = "price_missing"
+REASON_PRICE_UNPARSEABLE = "price_unparseable"  # ada angka tetapi bukan bilangan, mis. "$1.2.3"
+REASON_PRICE_RANGE = "price_out_of_range"
+REASON_RATING_RANGE = "rating_out_of_range"
+REASON_COLORS_INVALID = "colors_invalid"
+REASON_SIZE = "size_not_allowed"
+REASON_GENDER = "gender_not_allowed"
+
+REASONS = (REASON_INVALID_MARKER, REASON_MISSING_VALUE, REASON_DUPLICATE, REASON_PRICE_MISSING,
+           REASON_PRICE_UNPARSEABLE, REASON_PRICE_RANGE, REASON_RATING_RANGE, REASON_COLORS_INVALID, REASON_SIZE, REASON_GENDER)
+
+# Batas harga dalam dolar (sebelum konversi ke Rupiah): lebih dari 0, paling tinggi $10.000
+MIN_PRICE_USD = 0.0
+MAX_PRICE_USD = 10_000.0
+MAX_RATING = 5.0
+ALLOWED_SIZES = ("S", "M", "L", "XL", "XXL")
+ALLOWED_GENDERS = ("Men", "Women", "Unisex")
+
+# Kolom tambahan di file karantina
+REASON_COLUMN = "reason"
+
+
+def check_rules(price: np.ndarray, rating: np.ndarray, colors: np.ndarray, size: np.ndarray, gender: np.ndarray,
+                has_price: np.ndarray, exchange_rate: float, allowed_sizes: Iterable[str] = ALLOWED_SIZES,
+                allowed_genders: Iterable[str] = ALLOWED_GENDERS) -> Dict[str, np.ndarray]:
+    """
+    Mask pelanggaran per aturan (True berarti baris melanggar), masing-masing
+    satu operasi vektor atas seluruh kolom. Price dalam Rupiah (kurs
+    exchange_rate); Price NaN padahal has_price berarti teksnya tidak bisa
+    diparse. Rating NaN (belum dirating) lolos; Colors negatif menandai
+    nilai yang tidak bisa diparse.
+    """
+    with np.errstate(invalid="ignore"):
+        return {
+            REASON_PRICE_MISSING: ~has_price,
+            REASON_PRICE_UNPARSEABLE: has_price & np.isnan(price),
+            REASON_PRICE_RANGE: ~((price > MIN_PRICE_USD * exchange_rate) & (price <= MAX_PRICE_USD * exchange_rate)),
+            REASON_RATING_RANGE: (rating < 0) | (rating > MAX_RATING),
+            REASON_COLORS_INVALID: colors < 0,
+            REASON_SIZE: ~pd.Index(size).isin(list(allowed_sizes)),
+            REASON_GENDER: ~pd.Index(gender).isin(list(allowed_genders)),
+        }
+
+
+def first_failure(failures: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Kode per baris untuk aturan pertama yang dilanggar: posisi alasan di
+    REASONS ditambah 1, atau 0 jika lolos semua. Kode integer (bukan string)
+    agar penggabungan dan penghitungan tetap murah di jutaan baris.
+    """
+    codes = [REASONS.index(reason) + 1 for reason in failures]
+    return np.select(list(failures.values()), codes, default=0).astype(np.int8)
+
+
+def quarantine_report(codes: np.ndarray) -> Dict[str, int]:
+    """Jumlah baris karantina per aturan, dicatat juga sebagai counter validate.<alasan>."""
+    counts = dict(zip(REASONS, np.bincount(codes, minlength=len(REASONS) + 1)[1:].tolist()))
+    total = sum(counts.values())
+    for reason, count in counts.items():
+        METRICS.increment(f"validate.{reason}", count)
+    METRICS.increment("validate.quarantined", total)
+    if total:
+        summary = ", ".join(f"{reason}={count}" for reason, count in counts.items() if count)
+        logger.warning(f"Quarantined {total} rows: {summary}")
+    return counts
+
+
+def split_quarantine(df: pd.DataFrame, codes: np.ndarray) -> Tuple[np.ndarray, pd.DataFrame]:
+    """Mask baris yang lolos, dan baris mentah yang dikarantina beserta kolom reason."""
+    passed = codes == 0
+    reasons = np.array(REASONS, dtype=object)[codes[~passed] - 1]
+    return passed, df[~passed].assign(**{REASON_COLUMN: reasons})